@@ -0,0 +1,108 @@
+from datetime import date
+
+import pandas as pd
+
+# ---------------------------------------------------
+# ÖZET TABLOLARINDAN OKUMA
+# ---------------------------------------------------
+# talep_ozetleri ve personel_aylik_izin, talepler tetikleyicisiyle (migrasyon 10)
+# her değişiklikte artımlı güncellenir; buradaki sorgular talepler'e hiç dokunmaz.
+def ay_basi(gun):
+    return date(gun.year, gun.month, 1)
+
+
+def _kosullar(bas_ay, bit_ay, departmanlar, tipler, tablo):
+    kosul = [f"{tablo}.ay BETWEEN %s AND %s"]
+    params = [ay_basi(bas_ay), ay_basi(bit_ay)]
+    if departmanlar:
+        kosul.append(f"{tablo}.departman = ANY(%s)")
+        params.append(list(departmanlar))
+    if tipler and tablo == "o":
+        kosul.append("o.tip = ANY(%s)")
+        params.append(list(tipler))
+    return " AND ".join(kosul), params
+
+
+def ozet_verisi(havuz, bas_ay, bit_ay, departmanlar=None, tipler=None):
+    """(ay, departman, tip, durum) özet satırlarını döndürür."""
+    kosul, params = _kosullar(bas_ay, bit_ay, departmanlar, tipler, "o")
+    df = havuz.sorgu_df(f"""
+        SELECT o.ay, o.departman, o.tip, o.durum, o.talep_sayisi,
+               o.gun_toplami, o.karar_sayisi, o.karar_suresi_saat
+        FROM talep_ozetleri o
+        WHERE {kosul} AND o.talep_sayisi <> 0
+    """, params)
+    sayisal = ["gun_toplami", "karar_suresi_saat"]
+    df[sayisal] = df[sayisal].astype("float64")
+    return df
+
+
+def ozet_boyutlari(havuz):
+    """Filtre seçenekleri: (departmanlar, tipler, ilk ay, son ay)."""
+    with havuz.imlec() as c:
+        c.execute("""
+            SELECT array_agg(DISTINCT departman), array_agg(DISTINCT tip), min(ay), max(ay)
+            FROM talep_ozetleri WHERE talep_sayisi <> 0
+        """)
+        departmanlar, tipler, ilk, son = c.fetchone()
+    return sorted(departmanlar or []), sorted(tipler or []), ilk, son
+
+
+def en_cok_izin_alanlar(havuz, bas_ay, bit_ay, departmanlar=None, limit=10):
+    kosul, params = _kosullar(bas_ay, bit_ay, departmanlar, None, "k")
+    df = havuz.sorgu_df(f"""
+        SELECT k.sicil, p.ad_soyad, string_agg(DISTINCT k.departman, ', ') AS departman,
+               sum(k.gun) AS gun, sum(k.talep_sayisi) AS talep_sayisi
+        FROM personel_aylik_izin k
+        LEFT JOIN personellers p ON p.sicil = k.sicil
+        WHERE {kosul}
+        GROUP BY k.sicil, p.ad_soyad
+        HAVING sum(k.gun) > 0
+        ORDER BY gun DESC
+        LIMIT %s
+    """, params + [limit])
+    df["gun"] = df["gun"].astype("float64")
+    return df
+
+
+# ---------------------------------------------------
+# GÖSTERGELER
+# ---------------------------------------------------
+def metrikler(ozet):
+    onayli = ozet.loc[ozet["durum"] == "Onaylandı", "talep_sayisi"].sum()
+    reddedilen = ozet.loc[ozet["durum"] == "Reddedildi", "talep_sayisi"].sum()
+    karar = ozet["karar_sayisi"].sum()
+    return {
+        "talep": int(ozet["talep_sayisi"].sum()),
+        "onayli_gun": float(ozet.loc[ozet["durum"] == "Onaylandı", "gun_toplami"].sum()),
+        "bekleyen": int(ozet.loc[ozet["durum"] == "Beklemede", "talep_sayisi"].sum()),
+        "onay_orani": onayli / (onayli + reddedilen) if onayli + reddedilen else None,
+        "ort_karar_saat": ozet["karar_suresi_saat"].sum() / karar if karar else None,
+    }
+
+
+def departman_tablosu(ozet):
+    """Departman başına onaylı gün, talep sayısı, onay oranı ve ortalama karar süresi (saat)."""
+    if ozet.empty:
+        return pd.DataFrame()
+    g = ozet.assign(
+        onayli=ozet["talep_sayisi"].where(ozet["durum"] == "Onaylandı", 0),
+        reddedilen=ozet["talep_sayisi"].where(ozet["durum"] == "Reddedildi", 0),
+        onayli_gun=ozet["gun_toplami"].where(ozet["durum"] == "Onaylandı", 0.0),
+    ).groupby("departman")[["talep_sayisi", "onayli", "reddedilen", "onayli_gun",
+                            "karar_sayisi", "karar_suresi_saat"]].sum()
+
+    karar = (g["onayli"] + g["reddedilen"]).where(lambda x: x > 0)
+    g["onay_orani"] = g["onayli"] / karar
+    g["ort_karar_saat"] = g["karar_suresi_saat"] / g["karar_sayisi"].where(g["karar_sayisi"] > 0)
+    return g[["talep_sayisi", "onayli_gun", "onay_orani", "ort_karar_saat"]].sort_values(
+        "onayli_gun", ascending=False
+    )
+
+
+def aylik_gunler(ozet, boyut="departman"):
+    """Ay x `boyut` onaylı izin günü pivotu."""
+    onayli = ozet[ozet["durum"] == "Onaylandı"]
+    if onayli.empty:
+        return pd.DataFrame()
+    return onayli.pivot_table(index="ay", columns=boyut, values="gun_toplami", aggfunc="sum", fill_value=0)
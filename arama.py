@@ -0,0 +1,55 @@
+"""İK araması için ortak SQL parçaları (migrasyon 15).
+
+Aranan metin ve belgeler arama_metni() ile Türkçe harflerden ASCII'ye katlanıp küçültülür
+("Işık" = "isik" = "IŞIK"); eşleşme arama_vektoru() üzerindeki GIN indeksinde kelime ön ekiyle
+yapılır. pg_trgm kuruluysa adda yazım hatası da tolere edilir ("mehmte" -> "Mehmet").
+"""
+import functools
+import re
+
+# Migrasyon 15'teki indeks ifadeleriyle birebir aynı olmalı, yoksa indeks kullanılmaz.
+PERSONEL_BELGESI = "arama_vektoru({t}.ad_soyad, {t}.sicil, {t}.departman, {t}.email)"
+TALEP_BELGESI = "arama_vektoru({t}.ad_soyad, {t}.sicil, {t}.departman, {t}.neden)"
+
+# Yazarken arama bu kadar karakterden sonra başlar.
+EN_KISA_ARAMA = 2
+
+# SQL arama_metni() ile aynı eşleme.
+KATLAMA = str.maketrans("ÇĞİIÖŞÜÂÎÛçğıöşüâîû", "cgiiosuaiucgiosuaiu")
+
+
+def katla(metin):
+    return metin.translate(KATLAMA).lower()
+
+
+def kelimeler(metin):
+    return re.findall(r"\w+", katla(metin or ""))
+
+
+@functools.cache
+def trigram_var(havuz):
+    with havuz.imlec() as c:
+        c.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return c.fetchone() is not None
+
+
+def arama_kosulu(belge, ad, metin, bulanik=False):
+    """(WHERE koşulu, parametreler): tüm kelimeler belgede ön ek olarak geçmeli; bulanıksa ada benzerlik de yeter."""
+    kosul, params = f"{belge} @@ arama_sorgusu(%s)", [metin]
+    if bulanik:
+        kosul = f"({kosul} OR arama_metni(%s) <%% arama_metni({ad}))"
+        params.append(metin)
+    return kosul, params
+
+
+def skor_ifadesi(ad, metin, bulanik=False):
+    """(ifade, parametreler): büyük olan daha ilgili; yalnızca ad puanlanır, diğer alanlarda eşleşenler 0 alır.
+
+    Tüm belgeyi satır başına yeniden katlamak sıralamayı onlarca kat yavaşlattığından ad tek başına
+    puanlanır. Skor float8'dir; real olsaydı imleç olarak Python'a gidip gelirken eşitliği bozulurdu.
+    """
+    ifade, params = f"ts_rank(to_tsvector('simple', arama_metni({ad})), arama_sorgusu(%s))::float8", [metin]
+    if bulanik:
+        ifade = f"greatest({ifade}, word_similarity(arama_metni(%s), arama_metni({ad})))"
+        params.append(metin)
+    return ifade, params
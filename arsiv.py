@@ -0,0 +1,682 @@
+"""Talepler tablosunun yıllık bölümlemesi ve kapanmış yılların Parquet arşivi.
+
+talepler, izin başlangıç yılına göre RANGE bölümlüdür (talepler_2025, talepler_2026 ...).
+id ile yapılan güncelleme ve silmeler satırın baslangic değerini de verdiği için tek bölüme,
+çakışma denetimi tarih aralığıyla ilgili bölümlere iner. Onay kuyruğu ve izinlerim tarihle
+sınırlanmaz; her bölümün dar indeksine (bekleyen_onayci; sicil, sıra tarihi, id) iner.
+Kapanmış yıllar Parquet dosyasına yazılıp tablodan ayrılır; İK bu dosyaları Tüm Talepler
+sayfasından, personel kendi taleplerini İzinlerim'den görebilir.
+
+Komut satırı (zamanlanmış görev olarak günde bir kez yeterlidir):
+
+    python arsiv.py durum
+    python arsiv.py bolumle          # büyük tabloyu migrasyon 14'ten önce çevrimiçi taşır
+    python arsiv.py bakim            # gelecek yılların bölümlerini açar, kapanmış yılları arşivler
+    python arsiv.py arsivle --yil 2019 --yil 2020
+    python arsiv.py eskiyi-sil       # geçişten kalan talepler_eski tablosunu kaldırır
+"""
+import argparse
+import logging
+import os
+import re
+from datetime import date
+
+import pandas as pd
+from psycopg2 import sql
+
+from arama import katla, kelimeler
+
+log = logging.getLogger(__name__)
+
+ANA_TABLO = "talepler"
+GOLGE_TABLO = "talepler_bolumlu"
+ESKI_TABLO = "talepler_eski"
+ESITLEME = "talepler_golge_esitle"
+
+BOLUM_ADI = re.compile(r"^talepler_(\d{4})$")
+
+# Parquet'e yazılırken kolon tipleri; numeric kolonlar float olarak yazılır.
+PARQUET_TIPLERI = {
+    "smallint": "int32",
+    "integer": "int32",
+    "bigint": "int64",
+    "text": "string",
+    "date": "date32",
+    "numeric": "float64",
+    "timestamp with time zone": "timestamp",
+    "boolean": "bool",
+    # Yalnızca text[] (onay_zinciri).
+    "ARRAY": "string_list",
+}
+
+
+def ileri_yil():
+    # Bugünden sonra kaç yılın bölümü hazır tutulur.
+    return int(os.getenv("BOLUM_ILERI_YIL", "2"))
+
+
+def sakla_yil():
+    # Bu yıldan kaç yıl öncesine kadar tablo içinde tutulur.
+    return int(os.getenv("ARSIV_SAKLA_YIL", "2"))
+
+
+def acik_yil_baslangici(sakla=None):
+    """Tabloda tutulan (açık) yılların ilk günü; daha eski yıllar arşivlenebilir."""
+    return date(date.today().year - (sakla if sakla is not None else sakla_yil()), 1, 1)
+
+
+def arsiv_dizini():
+    return os.getenv("ARSIV_DIZINI", "arsiv")
+
+
+# ---------------------------------------------------
+# BÖLÜM YARDIMCILARI
+# ---------------------------------------------------
+def bolum_adi(yil):
+    return f"talepler_{yil}"
+
+
+def bolumlu_mu(c):
+    c.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", (ANA_TABLO,))
+    satir = c.fetchone()
+    return bool(satir and satir[0])
+
+
+def bolum_yillari(c, tablo=ANA_TABLO):
+    c.execute("""
+        SELECT k.relname
+        FROM pg_inherits i
+        JOIN pg_class k ON k.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+    """, (tablo,))
+    return sorted(int(m.group(1)) for (ad,) in c.fetchall() if (m := BOLUM_ADI.match(ad)))
+
+
+def yil_bolumu_ekle(c, yil, tablo=ANA_TABLO):
+    c.execute(
+        sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(
+            sql.Identifier(bolum_adi(yil)), sql.Identifier(tablo)
+        ),
+        (date(yil, 1, 1), date(yil + 1, 1, 1))
+    )
+
+
+def _kolonlar(c, tablo=ANA_TABLO):
+    # Üretilen kolonlar (donem) kopyalanmaz, hedefte yeniden hesaplanır.
+    c.execute("""
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+    """, (tablo,))
+    return c.fetchall()
+
+
+def _indeksler(c, tablo):
+    # Kısıt indeksleri (birincil anahtar, exclusion) hariç.
+    c.execute("""
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = to_regclass(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = x.indexrelid)
+        ORDER BY i.relname
+    """, (tablo,))
+    return c.fetchall()
+
+
+def bolumleri_hazirla(havuz, bas_yil=None, bit_yil=None):
+    """Eksik yıl bölümlerini açar, açılan yılları döndürür.
+
+    Varsayılan aralık en eski mevcut bölümden bu yıl + BOLUM_ILERI_YIL'a kadardır;
+    arşivlenmiş yıllar yeniden açılmaz. Varsayılan bölüm (DEFAULT) kullanılmaz:
+    aralık dışı bir tarih sessizce bir çöp bölüme düşmek yerine hata verir.
+    """
+    bugun = date.today().year
+    with havuz.imlec() as c:
+        if not bolumlu_mu(c):
+            return []
+        mevcut = set(bolum_yillari(c))
+        c.execute("SELECT yil FROM talepler_arsivi")
+        arsivli = {r[0] for r in c.fetchall()}
+
+        bas = bas_yil if bas_yil is not None else min(mevcut, default=bugun)
+        bit = bit_yil if bit_yil is not None else bugun + ileri_yil()
+        acilan = [y for y in range(bas, bit + 1) if y not in mevcut and y not in arsivli]
+        for yil in acilan:
+            yil_bolumu_ekle(c, yil)
+
+    if acilan:
+        log.info("talepler bölümleri açıldı: %s", acilan)
+    return acilan
+
+
+# ---------------------------------------------------
+# ÇEVRİMİÇİ GEÇİŞ (migrasyon 14)
+# ---------------------------------------------------
+# Bölümlü tabloda benzersiz anahtar bölüm kolonunu içermek zorundadır; (id, baslangic)
+# olur. Exclusion kısıtları bölümler arasında geçerli olmadığı için çakışma kuralı
+# her durumda tetikleyiciyle uygulanır; koşuldaki baslangic sınırı sonraki yılların
+# bölümlerini budar.
+CAKISMA_FONKSIYONU = """
+    CREATE OR REPLACE FUNCTION talepler_cakisma_denetle() RETURNS trigger AS $$
+    DECLARE
+        yeni_donem daterange;
+        cakisan INTEGER;
+    BEGIN
+        -- Üretilen kolonlar BEFORE tetikleyicisinde henüz hesaplanmamıştır.
+        IF NEW.baslangic IS NULL OR NEW.bitis IS NULL OR NEW.sicil IS NULL
+           OR NEW.baslangic > NEW.bitis OR NEW.durum IS NOT DISTINCT FROM 'Reddedildi' THEN
+            RETURN NEW;
+        END IF;
+        yeni_donem := daterange(NEW.baslangic, NEW.bitis, '[]');
+
+        PERFORM pg_advisory_xact_lock(hashtext('talepler_cakisma'), hashtext(NEW.sicil));
+        SELECT id INTO cakisan
+        FROM talepler
+        WHERE donem && yeni_donem
+          AND baslangic <= NEW.bitis
+          AND sicil = NEW.sicil
+          AND durum IS DISTINCT FROM 'Reddedildi'
+          AND id <> NEW.id
+        LIMIT 1;
+
+        IF cakisan IS NOT NULL THEN
+            RAISE EXCEPTION 'talep % ile çakışıyor', cakisan
+                USING ERRCODE = 'exclusion_violation', CONSTRAINT = 'talepler_donem_cakisma';
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+CAKISMA_TETIKLEYICISI = """
+    CREATE TRIGGER talepler_cakisma_denetle
+        BEFORE INSERT OR UPDATE OF sicil, baslangic, bitis, durum ON talepler
+        FOR EACH ROW EXECUTE FUNCTION talepler_cakisma_denetle()
+"""
+
+
+def cevrimici_bolumle(conn, parti=5000, kilit_bekleme="30s"):
+    """Bölümsüz talepler tablosunu uygulama çalışırken bölümlü tabloya taşır.
+
+    1. Aynı yapıda bölümlü bir gölge tablo açılır; eski tablodaki her değişiklik
+       bir tetikleyiciyle gölgeye yansıtılır (commit).
+    2. Mevcut satırlar id sırasıyla küçük partilerle kopyalanır (her parti commit).
+    3. Kısa bir ACCESS EXCLUSIVE kilidiyle sayılar doğrulanır, tablo adları, indeksler,
+       tetikleyiciler ve talepler satır tipini alan fonksiyonlar yeni tabloya geçirilir.
+       Bu son adım çağıranın işlemindedir.
+
+    Yarıda kesilirse yeniden çağrılabilir; eski tablo talepler_eski adıyla kalır.
+    Uygulama açılışında değil, python arsiv.py bolumle ile çalıştırılır.
+    """
+    with conn.cursor() as c:
+        if bolumlu_mu(c):
+            return
+        _bolumleme_on_kosullari(c)
+        c.execute("SELECT to_regclass(%s)", (GOLGE_TABLO,))
+        if c.fetchone()[0] is None:
+            _golge_tablo_kur(c)
+    conn.commit()
+
+    _gecmisi_kopyala(conn, parti)
+    _yer_degistir(conn, kilit_bekleme)
+
+
+def bolumlemeyi_bitir(conn, parti=5000, kilit_bekleme="30s"):
+    """Migrasyon 14 adımı; çağıranın işleminde çalışır, commit etmez.
+
+    Gölge tablo arsiv.py bolumle ile doldurulmuşsa yalnızca yer değiştirir. Gölge yoksa
+    ve tablo en çok bir parti ise (yeni kurulum) satırları aynı işlemde kopyalar; daha
+    büyük tabloda uygulama açılışı kopyalamayı beklemesin diye hata verir.
+    """
+    with conn.cursor() as c:
+        if bolumlu_mu(c):
+            return
+        _bolumleme_on_kosullari(c)
+        c.execute("SELECT to_regclass(%s)", (GOLGE_TABLO,))
+        if c.fetchone()[0] is None:
+            c.execute("SELECT count(*) FROM (SELECT 1 FROM talepler LIMIT %s) s", (parti + 1,))
+            if c.fetchone()[0] > parti:
+                raise RuntimeError(
+                    f"talepler {parti} satırdan büyük; bölümleme uygulama açılmadan önce "
+                    "python arsiv.py bolumle ile yapılmalı"
+                )
+            _golge_tablo_kur(c)
+            liste = ", ".join(k for k, _ in _kolonlar(c))
+            c.execute(f"INSERT INTO {GOLGE_TABLO} ({liste}) SELECT {liste} FROM talepler")
+    _yer_degistir(conn, kilit_bekleme)
+
+
+def _bolumleme_on_kosullari(c):
+    c.execute("SELECT id FROM talepler WHERE baslangic IS NULL ORDER BY id LIMIT 50")
+    bos = [r[0] for r in c.fetchall()]
+    if bos:
+        raise RuntimeError(
+            "Başlangıç tarihi boş talepler var, bölümlemeden önce düzeltilmeli: "
+            + ", ".join(f"#{i}" for i in bos)
+        )
+    c.execute("SELECT conname FROM pg_constraint WHERE confrelid = 'talepler'::regclass")
+    disaridan = [r[0] for r in c.fetchall()]
+    if disaridan:
+        raise RuntimeError(
+            "talepler.id'ye başvuran yabancı anahtarlar var, bölümlü tabloda id tek başına "
+            "benzersiz olmaz: " + ", ".join(disaridan)
+        )
+
+
+def _golge_tablo_kur(c):
+    c.execute(f"""
+        CREATE TABLE {GOLGE_TABLO} (LIKE talepler INCLUDING DEFAULTS INCLUDING GENERATED)
+            PARTITION BY RANGE (baslangic)
+    """)
+    c.execute(f"""
+        ALTER TABLE {GOLGE_TABLO}
+            ALTER COLUMN baslangic SET NOT NULL,
+            ADD CONSTRAINT {GOLGE_TABLO}_pkey PRIMARY KEY (id, baslangic)
+    """)
+
+    c.execute("SELECT extract(year FROM min(baslangic))::int, extract(year FROM max(baslangic))::int FROM talepler")
+    en_eski, en_yeni = c.fetchone()
+    bugun = date.today().year
+    for yil in range(min(en_eski or bugun, bugun), max(en_yeni or bugun, bugun + ileri_yil()) + 1):
+        yil_bolumu_ekle(c, yil, GOLGE_TABLO)
+
+    # İndeksler geçici "_yeni" adıyla açılır, yer değiştirmede asıl adlarını alır.
+    adlar = set()
+    for ad, tanim in _indeksler(c, ANA_TABLO):
+        adlar.add(ad)
+        c.execute(re.sub(
+            r"^CREATE (UNIQUE )?INDEX \S+ ON (ONLY )?\S+",
+            lambda m: f"CREATE {m.group(1) or ''}INDEX {ad}_yeni ON {GOLGE_TABLO}",
+            tanim
+        ))
+    # btree_gist kurulu sistemlerde çakışma exclusion kısıtının indeksini kullanıyordu.
+    if "talepler_donem_idx" not in adlar:
+        from migrasyon import CAKISMA_KOSULU
+        c.execute(f"CREATE INDEX talepler_donem_idx_yeni ON {GOLGE_TABLO} USING gist (donem) WHERE {CAKISMA_KOSULU}")
+
+    c.execute("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = 'talepler'::regclass AND contype IN ('f', 'c')
+    """)
+    for ad, tanim in c.fetchall():
+        c.execute(f"ALTER TABLE {GOLGE_TABLO} ADD CONSTRAINT {ad}_yeni {tanim}")
+
+    kolonlar = [k for k, _ in _kolonlar(c)]
+    liste = ", ".join(kolonlar)
+    degerler = ", ".join(f"NEW.{k}" for k in kolonlar)
+    c.execute(f"""
+        CREATE OR REPLACE FUNCTION {ESITLEME}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                TRUNCATE {GOLGE_TABLO};
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {GOLGE_TABLO} WHERE id = OLD.id AND baslangic = OLD.baslangic;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {GOLGE_TABLO} ({liste}) VALUES ({degerler});
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    c.execute(f"""
+        CREATE TRIGGER {ESITLEME}
+            AFTER INSERT OR UPDATE OR DELETE ON talepler
+            FOR EACH ROW EXECUTE FUNCTION {ESITLEME}()
+    """)
+    c.execute(f"""
+        CREATE TRIGGER {ESITLEME}_bosalt
+            AFTER TRUNCATE ON talepler
+            FOR EACH STATEMENT EXECUTE FUNCTION {ESITLEME}()
+    """)
+
+
+def _gecmisi_kopyala(conn, parti):
+    # Kopyalanan satırlar FOR SHARE ile kilitlenir; aynı anda güncellenen satır ya
+    # tetikleyiciyle ya da bu partiyle gelir, NOT EXISTS ikisinin çakışmasını önler.
+    with conn.cursor() as c:
+        c.execute("SELECT COALESCE(max(id), 0) FROM talepler")
+        hedef = c.fetchone()[0]
+        liste = ", ".join(k for k, _ in _kolonlar(c))
+    conn.commit()
+
+    son, tasinan = 0, 0
+    while True:
+        with conn.cursor() as c:
+            c.execute("""
+                SELECT id FROM talepler
+                WHERE id > %s AND id <= %s
+                ORDER BY id
+                LIMIT %s
+                FOR SHARE
+            """, (son, hedef, parti))
+            idler = [r[0] for r in c.fetchall()]
+            if not idler:
+                break
+            c.execute(f"""
+                INSERT INTO {GOLGE_TABLO} ({liste})
+                SELECT {liste} FROM talepler t
+                WHERE t.id = ANY(%s)
+                  AND NOT EXISTS (SELECT 1 FROM {GOLGE_TABLO} g WHERE g.id = t.id)
+            """, (idler,))
+            tasinan += c.rowcount
+        conn.commit()
+        son = idler[-1]
+
+    log.info("talepler bölümlü tabloya kopyalandı: %s satır", tasinan)
+    with conn.cursor() as c:
+        c.execute(f"ANALYZE {GOLGE_TABLO}")
+    conn.commit()
+
+
+def _yer_degistir(conn, kilit_bekleme):
+    with conn.cursor() as c:
+        # Kilit beklerken arkasındaki sorgular da bekler; uzun sürerse vazgeçilir, yeniden denenir.
+        c.execute("SELECT set_config('lock_timeout', %s, true)", (kilit_bekleme,))
+        c.execute("LOCK TABLE talepler IN ACCESS EXCLUSIVE MODE")
+
+        c.execute(f"SELECT (SELECT count(*) FROM talepler), (SELECT count(*) FROM {GOLGE_TABLO})")
+        eski, yeni = c.fetchone()
+        if eski != yeni:
+            raise RuntimeError(
+                f"Bölümlü tablo eşleşmiyor: talepler {eski}, {GOLGE_TABLO} {yeni} satır; "
+                "kopyalama python arsiv.py bolumle ile tamamlanmalı"
+            )
+
+        c.execute("""
+            SELECT tgname, pg_get_triggerdef(oid)
+            FROM pg_trigger
+            WHERE tgrelid = 'talepler'::regclass AND NOT tgisinternal
+        """)
+        tetikleyiciler = c.fetchall()
+        tasinacak = [(ad, tanim) for ad, tanim in tetikleyiciler
+                     if not ad.startswith(ESITLEME) and ad != "talepler_cakisma_denetle"]
+        c.execute("SELECT oid, pg_get_functiondef(oid) FROM pg_proc WHERE 'talepler'::regtype = ANY(proargtypes)")
+        fonksiyonlar = c.fetchall()
+        indeksler = [ad for ad, _ in _indeksler(c, GOLGE_TABLO)]
+        c.execute("SELECT pg_get_serial_sequence('talepler', 'id')")
+        dizi = c.fetchone()[0]
+
+        # Eski tablo etkisiz bırakılır: tetikleyicileri ve yabancı anahtarları kaldırılır.
+        for ad, _ in tetikleyiciler:
+            c.execute(sql.SQL("DROP TRIGGER {} ON talepler").format(sql.Identifier(ad)))
+        c.execute("ALTER TABLE talepler RENAME TO talepler_eski")
+        c.execute("SELECT conname FROM pg_constraint WHERE conrelid = 'talepler_eski'::regclass AND contype = 'f'")
+        for (ad,) in c.fetchall():
+            c.execute(sql.SQL("ALTER TABLE talepler_eski DROP CONSTRAINT {}").format(sql.Identifier(ad)))
+        c.execute("ALTER INDEX talepler_pkey RENAME TO talepler_eski_pkey")
+        for ad in indeksler:
+            asil = ad.removesuffix("_yeni")
+            c.execute(sql.SQL("ALTER INDEX IF EXISTS {} RENAME TO {}").format(
+                sql.Identifier(asil), sql.Identifier(f"{asil}_eski")))
+            c.execute(sql.SQL("ALTER INDEX {} RENAME TO {}").format(sql.Identifier(ad), sql.Identifier(asil)))
+
+        c.execute(f"ALTER TABLE {GOLGE_TABLO} RENAME TO talepler")
+        c.execute(f"ALTER INDEX {GOLGE_TABLO}_pkey RENAME TO talepler_pkey")
+        c.execute("SELECT conname FROM pg_constraint WHERE conrelid = 'talepler'::regclass AND conname LIKE '%\\_yeni'")
+        for (ad,) in c.fetchall():
+            c.execute(sql.SQL("ALTER TABLE talepler RENAME CONSTRAINT {} TO {}").format(
+                sql.Identifier(ad), sql.Identifier(ad.removesuffix("_yeni"))))
+        if dizi:
+            c.execute(f"ALTER SEQUENCE {dizi} OWNED BY talepler.id")
+
+        # talepler satır tipini alan fonksiyonlar (talep_ozeti_uygula) yeni tip için yeniden
+        # oluşturulur; eski imza artık talepler_eski tipini gösterir.
+        for oid, tanim in fonksiyonlar:
+            c.execute("SELECT %s::regprocedure::text", (oid,))
+            c.execute(f"DROP FUNCTION {c.fetchone()[0]}")
+            c.execute(tanim)
+
+        c.execute(CAKISMA_FONKSIYONU)
+        c.execute(CAKISMA_TETIKLEYICISI)
+        for _, tanim in tasinacak:
+            c.execute(tanim)
+        c.execute(f"DROP FUNCTION IF EXISTS {ESITLEME}()")
+
+
+def eski_tabloyu_sil(havuz):
+    with havuz.imlec() as c:
+        c.execute(f"DROP TABLE IF EXISTS {ESKI_TABLO}")
+
+
+# ---------------------------------------------------
+# ARŞİVLEME
+# ---------------------------------------------------
+def arsivlenmis_yillar(havuz):
+    return havuz.sorgu_df("SELECT yil, dosya, satir, bayt, arsivlendi FROM talepler_arsivi ORDER BY yil")
+
+
+def kapali_yillar(havuz, sakla=None):
+    """Arşivlenebilecek yıllar: son `sakla` yıldan eski ve bekleyen talebi olmayan bölümler."""
+    sinir = acik_yil_baslangici(sakla).year
+    kapali = []
+    with havuz.imlec() as c:
+        if not bolumlu_mu(c):
+            return []
+        for yil in bolum_yillari(c):
+            if yil >= sinir:
+                continue
+            c.execute(sql.SQL("SELECT 1 FROM {} WHERE durum = 'Beklemede' LIMIT 1").format(
+                sql.Identifier(bolum_adi(yil))))
+            if c.fetchone() is None:
+                kapali.append(yil)
+            else:
+                log.warning("%s yılında bekleyen talep var, arşivlenmedi", yil)
+    return kapali
+
+
+def _parquet_semasi(kolonlar):
+    import pyarrow as pa
+
+    tipler = {
+        "int32": pa.int32(), "int64": pa.int64(), "string": pa.string(), "date32": pa.date32(),
+        "float64": pa.float64(), "timestamp": pa.timestamp("us", tz="UTC"), "bool": pa.bool_(),
+        "string_list": pa.list_(pa.string()),
+    }
+    return pa.schema([(ad, tipler[PARQUET_TIPLERI.get(tip, "string")]) for ad, tip in kolonlar])
+
+
+def _bolum_izi(c, bolum):
+    """Bölümün satır sayısı ve (id, surum) özeti; her UPDATE surum'u artırır, değişen satır izi bozar."""
+    c.execute(sql.SQL("""
+        SELECT count(*), md5(COALESCE(string_agg(id::text || ':' || surum, ',' ORDER BY id), ''))
+        FROM {}
+    """).format(bolum))
+    return c.fetchone()
+
+
+def _bolumu_disa_aktar(conn, yil, gecici, parca):
+    """Bölümü tek bir REPEATABLE READ anlık görüntüsünden Parquet'e yazar; (satır, iz) döndürür.
+
+    Yalnızca ACCESS SHARE kilidi alınır, id ile yapılan güncelleme ve silmeler beklemez.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    bolum = sql.Identifier(bolum_adi(yil))
+    with conn.cursor() as c:
+        c.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        kolonlar = _kolonlar(c, bolum_adi(yil))
+        iz = _bolum_izi(c, bolum)
+
+    sema = _parquet_semasi(kolonlar)
+    secim = sql.SQL(", ").join(
+        sql.SQL("{}::float8").format(sql.Identifier(ad)) if tip == "numeric" else sql.Identifier(ad)
+        for ad, tip in kolonlar
+    )
+    yazilan = 0
+    with pq.ParquetWriter(gecici, sema, compression="zstd") as yazici:
+        with conn.cursor(name=f"arsiv_{yil}") as c:
+            c.itersize = parca
+            c.execute(sql.SQL("SELECT {} FROM {} ORDER BY id").format(secim, bolum))
+            while satirlar := c.fetchmany(parca):
+                df = pd.DataFrame(satirlar, columns=sema.names)
+                yazici.write_table(pa.Table.from_pandas(df, schema=sema, preserve_index=False))
+                yazilan += len(satirlar)
+    conn.commit()
+
+    okunan = pq.ParquetFile(gecici).metadata.num_rows
+    if not (yazilan == okunan == iz[0]):
+        raise RuntimeError(
+            f"{yil} arşivi doğrulanamadı: tabloda {iz[0]}, yazılan {yazilan}, dosyada {okunan} satır"
+        )
+    return yazilan, iz
+
+
+def yili_arsivle(havuz, yil, dizin=None, parca=20_000, kilit_bekleme="5s", deneme=3):
+    """Bir yılın bölümünü Parquet (zstd) dosyasına yazar, doğrular ve tablodan ayırıp siler.
+
+    Dışa aktarma kilitsiz bir anlık görüntüden yapılır, bölüme yazma serbesttir. Ardından
+    kısa bir işlemde talepler ACCESS EXCLUSIVE kilitlenir (önce ana tablo, uygulamanın
+    kilit sırasıyla aynı), bölümün izi yeniden alınır; dışa aktarmadan beri değişmişse
+    dosya atılıp en fazla `deneme` kez yeniden yazılır, değişmemişse bölüm ayrılıp silinir.
+    Satır tetikleyicileri çalışmadığından bakiye ve özet tabloları geçmişi korur.
+    Yazılan satır sayısını döndürür.
+    """
+    from degisiklik import KANAL
+
+    dizin = dizin or arsiv_dizini()
+    os.makedirs(dizin, exist_ok=True)
+    yol = os.path.join(dizin, f"{bolum_adi(yil)}.parquet")
+    gecici = yol + ".yaziliyor"
+    bolum = sql.Identifier(bolum_adi(yil))
+
+    try:
+        with havuz.baglanti() as conn:
+            for _ in range(deneme):
+                yazilan, iz = _bolumu_disa_aktar(conn, yil, gecici, parca)
+
+                with conn.cursor() as c:
+                    # Kilit beklerken arkasındaki sorgular da bekler; uzun sürerse vazgeçilir.
+                    c.execute("SELECT set_config('lock_timeout', %s, true)", (kilit_bekleme,))
+                    c.execute("LOCK TABLE talepler IN ACCESS EXCLUSIVE MODE")
+                    if _bolum_izi(c, bolum) == iz:
+                        break
+                conn.rollback()
+                log.info("%s bölümü dışa aktarma sırasında değişti, yeniden yazılıyor", yil)
+            else:
+                raise RuntimeError(f"{yil} bölümü {deneme} denemede de dışa aktarma sırasında değişti")
+
+            os.replace(gecici, yol)
+            with conn.cursor() as c:
+                c.execute(sql.SQL("ALTER TABLE talepler DETACH PARTITION {}").format(bolum))
+                c.execute(sql.SQL("DROP TABLE {}").format(bolum))
+                c.execute("""
+                    INSERT INTO talepler_arsivi (yil, dosya, satir, bayt)
+                    VALUES (%s, %s, %s, %s)
+                """, (yil, os.path.abspath(yol), yazilan, os.path.getsize(yol)))
+                # Sayım önbellekleri ve açık İK ekranları yenilensin.
+                c.execute("SELECT pg_notify(%s, '{\"tablo\": \"talepler\", \"hepsi\": true}')", (KANAL,))
+    except BaseException:
+        for dosya in (gecici, yol):
+            if os.path.exists(dosya):
+                os.remove(dosya)
+        raise
+
+    log.info("%s yılı arşivlendi: %s satır -> %s", yil, yazilan, yol)
+    return yazilan
+
+
+def bakim(havuz, dizin=None):
+    """Gelecek yılların bölümlerini açar ve kapanmış yılları arşivler; {yil: satır} döndürür."""
+    bolumleri_hazirla(havuz)
+    return {yil: yili_arsivle(havuz, yil, dizin) for yil in kapali_yillar(havuz)}
+
+
+def arsiv_oku(dosya, filtre):
+    """Arşiv dosyasından TalepFiltresi'ne uyan satırları DataFrame olarak okur.
+
+    Eşitlik koşulları Parquet satır gruplarına itilir, tarih ve personel koşulları pandas'ta uygulanır.
+    """
+    import pyarrow.parquet as pq
+
+    kosullar = [(k, "==", getattr(filtre, k)) for k in ("departman", "durum", "tip", "sicil") if getattr(filtre, k)]
+    df = pq.read_table(dosya, filters=kosullar or None).to_pandas()
+
+    if filtre.baslangic is not None:
+        df = df[df["bitis"] >= filtre.baslangic]
+    if filtre.bitis is not None:
+        df = df[df["baslangic"] <= filtre.bitis]
+    if filtre.personel:
+        df = df[(df["sicil"] == filtre.personel) | df["ad_soyad"].fillna("").str.startswith(filtre.personel)]
+    if filtre.arama:
+        # Tablodaki arama_sorgusu() ile aynı kural: her kelime belgede bir kelimenin başı olmalı.
+        belge = (df[["ad_soyad", "sicil", "departman", "neden"]].fillna("")
+                 .agg(" ".join, axis=1).map(katla))
+        maske = pd.Series(True, index=df.index)
+        for kelime in kelimeler(filtre.arama):
+            maske &= belge.str.contains(rf"\b{re.escape(kelime)}")
+        df = df[maske]
+    return df.sort_values("id").reset_index(drop=True)
+
+
+# ---------------------------------------------------
+# KOMUT SATIRI
+# ---------------------------------------------------
+def _durum_yaz(havuz):
+    with havuz.imlec() as c:
+        if not bolumlu_mu(c):
+            print("talepler bölümlü değil (migrasyon 14 uygulanmamış).")
+            return
+        for yil in bolum_yillari(c):
+            c.execute(sql.SQL("SELECT count(*), count(*) FILTER (WHERE durum = 'Beklemede') FROM {}").format(
+                sql.Identifier(bolum_adi(yil))))
+            adet, bekleyen = c.fetchone()
+            print(f"{bolum_adi(yil)}: {adet} talep, {bekleyen} bekleyen")
+        c.execute("SELECT to_regclass(%s)", (ESKI_TABLO,))
+        if c.fetchone()[0] is not None:
+            print(f"{ESKI_TABLO} duruyor (python arsiv.py eskiyi-sil ile kaldırılabilir)")
+
+    for k in arsivlenmis_yillar(havuz).itertuples():
+        print(f"arşiv {k.yil}: {k.satir} talep, {k.bayt / 1024:.0f} KB, {k.dosya}")
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from migrasyon import MIGRASYONLAR, migrasyonlari_uygula
+    from veritabani import BaglantiHavuzu
+
+    p = argparse.ArgumentParser(description="Talepler bölümleme ve arşiv bakımı")
+    alt = p.add_subparsers(dest="komut", required=True)
+    alt.add_parser("durum", help="bölümleri ve arşivlenmiş yılları listeler")
+    alt.add_parser("bolumle", help="talepler tablosunu çevrimiçi olarak bölümlü tabloya taşır")
+    b = alt.add_parser("bakim", help="eksik bölümleri açar, kapanmış yılları arşivler")
+    b.add_argument("--dizin")
+    a = alt.add_parser("arsivle", help="belirtilen (ya da kapanmış) yılları arşivler")
+    a.add_argument("--yil", type=int, action="append")
+    a.add_argument("--dizin")
+    alt.add_parser("eskiyi-sil", help="geçişten kalan talepler_eski tablosunu siler")
+    args = p.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    havuz = BaglantiHavuzu.ortamdan()
+    try:
+        if args.komut == "bolumle":
+            # Kopyalama 14'ten önceki şemaya göre yapılır; 14 ardından yalnızca arşiv tablosunu açar.
+            migrasyonlari_uygula(havuz, [m for m in MIGRASYONLAR if m[0] < 14])
+            with havuz.baglanti() as conn:
+                cevrimici_bolumle(conn)
+        migrasyonlari_uygula(havuz)
+
+        if args.komut == "durum":
+            _durum_yaz(havuz)
+        elif args.komut == "bakim":
+            print(bakim(havuz, args.dizin))
+        elif args.komut == "arsivle":
+            for yil in args.yil or kapali_yillar(havuz):
+                yili_arsivle(havuz, yil, args.dizin)
+        elif args.komut == "eskiyi-sil":
+            eski_tabloyu_sil(havuz)
+    finally:
+        havuz.kapat()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import psycopg2.extras
+
+# Cumartesi ve pazar (date.weekday() değerleri).
+HAFTA_SONU = (5, 6)
+
+TAKVIM_ILK_YIL = 2000
+TAKVIM_SON_YIL = 2100
+
+
+# ---------------------------------------------------
+# VARSAYILAN RESMİ TATİLLER
+# ---------------------------------------------------
+# (ay, gün, ad, yarım gün mü)
+SABIT_TATILLER = [
+    (1, 1, "Yılbaşı", False),
+    (4, 23, "Ulusal Egemenlik ve Çocuk Bayramı", False),
+    (5, 1, "Emek ve Dayanışma Günü", False),
+    (5, 19, "Atatürk'ü Anma, Gençlik ve Spor Bayramı", False),
+    (7, 15, "Demokrasi ve Millî Birlik Günü", False),
+    (8, 30, "Zafer Bayramı", False),
+    (10, 28, "Cumhuriyet Bayramı Arifesi", True),
+    (10, 29, "Cumhuriyet Bayramı", False),
+]
+
+# Dini bayramlar her yıl kayar; bilinen yılların ilk bayram günleri burada tutulur,
+# diğer yıllar İK ekranından girilir. Arife günü yarım gündür.
+DINI_BAYRAMLAR = {
+    2023: {"Ramazan Bayramı": date(2023, 4, 21), "Kurban Bayramı": date(2023, 6, 28)},
+    2024: {"Ramazan Bayramı": date(2024, 4, 10), "Kurban Bayramı": date(2024, 6, 16)},
+    2025: {"Ramazan Bayramı": date(2025, 3, 30), "Kurban Bayramı": date(2025, 6, 6)},
+    2026: {"Ramazan Bayramı": date(2026, 3, 20), "Kurban Bayramı": date(2026, 5, 27)},
+    2027: {"Ramazan Bayramı": date(2027, 3, 9), "Kurban Bayramı": date(2027, 5, 16)},
+}
+
+BAYRAM_SURELERI = {"Ramazan Bayramı": 3, "Kurban Bayramı": 4}
+
+
+def varsayilan_tatiller(yil):
+    """Yılın resmi tatillerini (tarih, ad, yarım_gün) listesi olarak döndürür."""
+    tatiller = [(date(yil, ay, gun), ad, yarim) for ay, gun, ad, yarim in SABIT_TATILLER]
+    for ad, ilk_gun in DINI_BAYRAMLAR.get(yil, {}).items():
+        tatiller.append((ilk_gun - timedelta(days=1), f"{ad} Arifesi", True))
+        for i in range(BAYRAM_SURELERI[ad]):
+            tatiller.append((ilk_gun + timedelta(days=i), f"{ad} {i + 1}. Gün", False))
+    return sorted(tatiller)
+
+
+# ---------------------------------------------------
+# İŞ GÜNÜ TAKVİMİ (ÖNEK TOPLAMLARI)
+# ---------------------------------------------------
+class IsTakvimi:
+    """Her gün için ağırlık (1 iş günü, 0.5 yarım gün, 0 tatil) ve bunların önek toplamı.
+
+    Herhangi bir [başlangıç, bitiş] aralığının iş günü sayısı iki dizi okumasıdır;
+    tarih dizileri için de aynı işlem vektörel yapılır.
+    """
+
+    def __init__(self, tatiller=(), hafta_sonu=HAFTA_SONU,
+                 ilk_yil=TAKVIM_ILK_YIL, son_yil=TAKVIM_SON_YIL):
+        self.ilk = np.datetime64(f"{ilk_yil}-01-01", "D")
+        gunler = np.arange(self.ilk, np.datetime64(f"{son_yil + 1}-01-01", "D"))
+
+        # 1970-01-01 perşembedir (weekday 3).
+        haftagunu = (gunler.astype("int64") + 3) % 7
+        agirlik = np.where(np.isin(haftagunu, hafta_sonu), 0.0, 1.0)
+
+        if tatiller:
+            tarihler = np.array([t for t, _ in tatiller], dtype="datetime64[D]")
+            degerler = np.array([0.5 if yarim else 0.0 for _, yarim in tatiller])
+            idx = (tarihler - self.ilk).astype("int64")
+            icinde = (idx >= 0) & (idx < len(agirlik))
+            idx, degerler = idx[icinde], degerler[icinde]
+            # Hafta sonuna denk gelen tatil zaten 0'dır, yarım gün onu artırmaz.
+            agirlik[idx] = np.minimum(agirlik[idx], degerler)
+
+        self._onek = np.concatenate(([0.0], np.cumsum(agirlik)))
+
+    def _indeks(self, tarihler):
+        t = np.asarray(tarihler, dtype="datetime64[D]")
+        if np.any(np.isnat(t)):
+            raise ValueError("Boş tarih")
+        i = (t - self.ilk).astype("int64")
+        if np.any(i < 0) or np.any(i >= len(self._onek) - 1):
+            raise ValueError("Tarih iş günü takviminin dışında")
+        return i
+
+    def is_gunu(self, baslangic, bitis):
+        """[baslangic, bitis] (iki uç dahil) aralığındaki iş günü; tekil tarih ya da dizi alır."""
+        b = self._indeks(baslangic)
+        e = self._indeks(bitis)
+        sonuc = np.where(e >= b, self._onek[e + 1] - self._onek[b], 0.0)
+        return float(sonuc) if sonuc.ndim == 0 else sonuc
+
+
+class TakvimDeposu:
+    """tatil_gunleri tablosundan kurulan IsTakvimi'nin süreç içi kopyası."""
+
+    def __init__(self, havuz, ttl=3600.0):
+        self._havuz = havuz
+        self.ttl = ttl
+        self._kilit = threading.Lock()
+        self._takvim = None
+        self._yuklenme = 0.0
+
+    @classmethod
+    def ortamdan(cls, havuz):
+        return cls(havuz, ttl=float(os.getenv("TAKVIM_CACHE_TTL", "3600")))
+
+    def takvim(self):
+        with self._kilit:
+            if self._takvim is None or time.monotonic() - self._yuklenme >= self.ttl:
+                with self._havuz.imlec() as c:
+                    self._takvim = takvim_yukle(c)
+                self._yuklenme = time.monotonic()
+            return self._takvim
+
+    def gecersiz_kil(self):
+        with self._kilit:
+            self._takvim = None
+
+
+def takvim_yukle(c):
+    c.execute("SELECT tarih, yarim_gun FROM tatil_gunleri")
+    return IsTakvimi(c.fetchall())
+
+
+# ---------------------------------------------------
+# TATİL TAKVİMİ YÖNETİMİ
+# ---------------------------------------------------
+def yil_tatilleri(havuz, yil):
+    return havuz.sorgu_df(
+        "SELECT tarih, ad, yarim_gun FROM tatil_gunleri "
+        "WHERE tarih >= %s AND tarih < %s ORDER BY tarih",
+        (date(yil, 1, 1), date(yil + 1, 1, 1))
+    )
+
+
+def tatilleri_kaydet(havuz, yil, tatiller):
+    """Yılın tatil listesini değiştirir ve o yıla dokunan taleplerin gün sayılarını yeniler.
+
+    Bakiyeler talepler tetikleyicisiyle yalnızca değişen talepler kadar güncellenir.
+    Güncellenen talep sayısını döndürür.
+    """
+    with havuz.imlec() as c:
+        c.execute(
+            "DELETE FROM tatil_gunleri WHERE tarih >= %s AND tarih < %s",
+            (date(yil, 1, 1), date(yil + 1, 1, 1))
+        )
+        kayitlar = [(t, ad, bool(yarim)) for t, ad, yarim in tatiller if t and t.year == yil]
+        if kayitlar:
+            psycopg2.extras.execute_values(
+                c,
+                "INSERT INTO tatil_gunleri (tarih, ad, yarim_gun) VALUES %s "
+                "ON CONFLICT (tarih) DO UPDATE SET ad = EXCLUDED.ad, yarim_gun = EXCLUDED.yarim_gun",
+                kayitlar
+            )
+        return gun_sayilarini_yenile(c, takvim_yukle(c), yil)
+
+
+def gun_sayilarini_yenile(c, takvim, yil):
+    c.execute(
+        "SELECT id, baslangic, bitis FROM talepler WHERE donem && daterange(%s, %s)",
+        (date(yil, 1, 1), date(yil + 1, 1, 1))
+    )
+    satirlar = c.fetchall()
+    if not satirlar:
+        return 0
+
+    idler, baslar, bitisler = zip(*satirlar)
+    gunler = takvim.is_gunu(list(baslar), list(bitisler))
+    degisen = psycopg2.extras.execute_values(
+        c,
+        "UPDATE talepler t SET gun_sayisi = v.gun FROM (VALUES %s) AS v(id, gun) "
+        "WHERE t.id = v.id AND t.gun_sayisi IS DISTINCT FROM v.gun::numeric RETURNING t.id",
+        list(zip(idler, gunler.tolist())),
+        page_size=1000,
+        fetch=True
+    )
+    return len(degisen)
+
+
+# ---------------------------------------------------
+# HAK KURALLARI VE BAKİYE
+# ---------------------------------------------------
+def hak_kurallari(havuz):
+    return havuz.sorgu_df("SELECT tip, kidem_yil, gun FROM izin_hak_kurallari ORDER BY tip, kidem_yil")
+
+
+def hak_kurallarini_kaydet(havuz, kurallar):
+    with havuz.imlec() as c:
+        c.execute("DELETE FROM izin_hak_kurallari")
+        kayitlar = [(tip, int(kidem), float(gun)) for tip, kidem, gun in kurallar if tip]
+        if kayitlar:
+            psycopg2.extras.execute_values(
+                c, "INSERT INTO izin_hak_kurallari (tip, kidem_yil, gun) VALUES %s", kayitlar
+            )
+
+
+def haklari_hesapla(kurallar, ise_giris, tip, yil):
+    """İşe giriş tarihleri dizisi için `yil` yılındaki `tip` hakkını döndürür.
+
+    Kıdem, o yılki işe giriş yıldönümünde tamamlanan yıldır; en büyük eşik kuralı geçerlidir.
+    İşe giriş tarihi olmayanlar NaN döner.
+    """
+    k = kurallar[kurallar["tip"] == tip].sort_values("kidem_yil")
+    giris = pd.to_datetime(pd.Series(ise_giris), errors="coerce")
+    kidem = (yil - giris.dt.year).to_numpy(dtype="float64")
+
+    if k.empty:
+        return np.where(np.isnan(kidem), np.nan, 0.0)
+
+    esikler = k["kidem_yil"].to_numpy(dtype="float64")
+    gunler = k["gun"].to_numpy(dtype="float64")
+    idx = np.searchsorted(esikler, np.nan_to_num(kidem, nan=-1.0), side="right") - 1
+    hak = np.where(idx >= 0, gunler[np.clip(idx, 0, None)], 0.0)
+    return np.where(np.isnan(kidem), np.nan, hak)
+
+
+def bakiye_tablosu(havuz, yil, sicil=None):
+    """Personel x hak kuralı olan izin türü için hak, kullanılan, bekleyen ve kalan günleri döndürür."""
+    kurallar = hak_kurallari(havuz)
+    kosul, params = "", [yil]
+    if sicil is not None:
+        kosul = "WHERE p.sicil = %s"
+        params.append(sicil)
+
+    df = havuz.sorgu_df(f"""
+        SELECT p.sicil, p.ad_soyad, p.departman, p.ise_giris, k.tip,
+               COALESCE(b.kullanilan, 0) AS kullanilan,
+               COALESCE(b.bekleyen, 0) AS bekleyen
+        FROM personellers p
+        CROSS JOIN (SELECT DISTINCT tip FROM izin_hak_kurallari) k
+        LEFT JOIN izin_bakiyeleri b
+               ON b.sicil = p.sicil AND b.tip = k.tip AND b.yil = %s
+        {kosul}
+        ORDER BY p.ad_soyad, k.tip
+    """, params)
+
+    df["hak"] = np.nan
+    for tip, grup in df.groupby("tip"):
+        df.loc[grup.index, "hak"] = haklari_hesapla(kurallar, grup["ise_giris"], tip, yil)
+    df[["kullanilan", "bekleyen"]] = df[["kullanilan", "bekleyen"]].astype("float64")
+    df["kalan"] = df["hak"] - df["kullanilan"]
+    return df
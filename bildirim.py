@@ -0,0 +1,523 @@
+import logging
+import os
+import threading
+import time
+
+import psycopg2.extras
+
+from olcum import olculu
+from onay_akisi import IK_ADIMI
+
+log = logging.getLogger(__name__)
+
+# Alıcı başına gönderim politikası; bildirim_tercihleri'nde kaydı olmayan alıcı anında alır.
+POLITIKALAR = {
+    "anlik": "Anında",
+    "saatlik": "Saatlik özet",
+    "gunluk": "Günlük özet",
+}
+
+# Özet e-postasında listelenen en fazla bekleyen talep sayısı.
+OZET_KUYRUK_SINIRI = 50
+
+
+# ---------------------------------------------------
+# BİLDİRİM KUYRUĞUNA EKLEME
+# ---------------------------------------------------
+# Çağıranın imleciyle yazılır; böylece bildirim, talepler değişikliğiyle
+# aynı işlemde kaydedilir ya da onunla birlikte geri alınır.
+def bildirim_ekle(c, alici, konu, icerik):
+    if not alici:
+        return
+    c.execute(
+        "INSERT INTO bildirim_kutusu (alici, konu, icerik) VALUES (%s, %s, %s)",
+        (alici, konu, icerik)
+    )
+
+
+def bildirimleri_ekle(c, kayitlar):
+    """(alici, konu, icerik) listesini tek INSERT ile kuyruğa yazar; alıcısız kayıtlar atlanır."""
+    kayitlar = [k for k in kayitlar if k[0]]
+    if kayitlar:
+        psycopg2.extras.execute_values(
+            c,
+            "INSERT INTO bildirim_kutusu (alici, konu, icerik) VALUES %s",
+            kayitlar,
+            page_size=500
+        )
+
+
+# ---------------------------------------------------
+# ALICI POLİTİKALARI
+# ---------------------------------------------------
+def politikalar(havuz):
+    return havuz.sorgu_df("SELECT alici, politika, guncellendi FROM bildirim_tercihleri ORDER BY alici")
+
+
+def politika_getir(havuz, alici):
+    with havuz.imlec() as c:
+        c.execute("SELECT politika FROM bildirim_tercihleri WHERE alici = %s", (alici,))
+        satir = c.fetchone()
+    return satir[0] if satir else "anlik"
+
+
+def politikalari_ayarla(havuz, kayitlar):
+    """(alici, politika) listesini yazar. 'anlik'a dönen alıcının bekleyen bildirimleri bir sonraki partide gider."""
+    kayitlar = [(a.strip(), p) for a, p in kayitlar if a and a.strip()]
+    bilinmeyen = {p for _, p in kayitlar} - set(POLITIKALAR)
+    if bilinmeyen:
+        raise ValueError(f"Bilinmeyen bildirim politikası: {', '.join(sorted(bilinmeyen))}")
+    if not kayitlar:
+        return
+    with havuz.imlec() as c:
+        psycopg2.extras.execute_values(c, """
+            INSERT INTO bildirim_tercihleri (alici, politika) VALUES %s
+            ON CONFLICT (alici) DO UPDATE SET politika = EXCLUDED.politika, guncellendi = now()
+        """, kayitlar)
+
+
+# ---------------------------------------------------
+# TESLİM İSTATİSTİKLERİ
+# ---------------------------------------------------
+# Politika alıcının bugünkü tercihidir; tercihi sonradan değişen alıcının eski kayıtları da yeni grupta sayılır.
+def teslim_istatistikleri(havuz, gun=7):
+    """Son `gun` gündeki bildirimlerin politika bazında teslim özeti.
+
+    'eposta' gerçekte gönderilen e-posta sayısıdır; özetlenen bildirimler tek e-posta sayılır.
+    """
+    return havuz.sorgu_df("""
+        SELECT COALESCE(t.politika, 'anlik') AS politika,
+               count(DISTINCT b.alici) AS alici,
+               count(*) AS bildirim,
+               count(*) FILTER (WHERE b.durum = 'gonderildi') AS gonderilen,
+               count(DISTINCT COALESCE(b.ozet_grubu, b.id)) FILTER (WHERE b.durum = 'gonderildi') AS eposta,
+               count(*) FILTER (WHERE b.durum = 'bekliyor') AS bekleyen,
+               count(*) FILTER (WHERE b.durum = 'olu') AS olu,
+               round((avg(extract(epoch FROM b.gonderildi - b.olusturuldu))
+                      FILTER (WHERE b.durum = 'gonderildi') / 60)::numeric, 1) AS ort_gecikme_dk
+        FROM bildirim_kutusu b
+        LEFT JOIN bildirim_tercihleri t ON t.alici = b.alici
+        WHERE b.olusturuldu >= now() - make_interval(days => %s)
+        GROUP BY 1
+        ORDER BY 1
+    """, (gun,))
+
+
+def gunluk_eposta_sayilari(havuz, gun=30):
+    """Gün başına gönderilen e-posta ve bildirim sayısı (SMTP gönderim sınırlarını izlemek için)."""
+    return havuz.sorgu_df("""
+        SELECT gonderildi::date AS gun,
+               count(DISTINCT COALESCE(ozet_grubu, id)) AS eposta,
+               count(*) AS bildirim
+        FROM bildirim_kutusu
+        WHERE durum = 'gonderildi' AND gonderildi >= now() - make_interval(days => %s)
+        GROUP BY 1
+        ORDER BY 1
+    """, (gun,))
+
+
+# ---------------------------------------------------
+# ÖZET E-POSTASI
+# ---------------------------------------------------
+def ozet_metni(c, alici, kayitlar):
+    """(konu, icerik). kayitlar: (id, konu, icerik, deneme, olusturuldu) listesi.
+
+    Alıcı bir onaycıysa, o anda sırası kendisinde olan talepler de listelenir (İK adımındakiler
+    rolü İK olan herkese).
+    """
+    c.execute("""
+        SELECT t.ad_soyad, t.tip, t.baslangic, t.bitis, t.gun_sayisi
+        FROM talepler t
+        WHERE t.durum = 'Beklemede'
+          AND (t.bekleyen_onayci = %s
+               OR t.bekleyen_onayci = %s AND EXISTS (
+                   SELECT 1 FROM personellers p WHERE p.email = %s AND p.rol = 'İK'))
+        ORDER BY t.baslangic, t.id
+        LIMIT %s
+    """, (alici, IK_ADIMI, alici, OZET_KUYRUK_SINIRI + 1))
+    bekleyenler = c.fetchall()
+
+    satirlar = [f"Son özetten bu yana {len(kayitlar)} bildirim:", ""]
+    for _, konu, icerik, _, olusturuldu in kayitlar:
+        satirlar.append(f"- {olusturuldu:%d.%m.%Y %H:%M} {konu}: {icerik}")
+
+    if bekleyenler:
+        satirlar += ["", "Onayınızı bekleyen talepler:", ""]
+        for ad_soyad, tip, bas, bit, gun in bekleyenler[:OZET_KUYRUK_SINIRI]:
+            gun = f" ({float(gun):g} iş günü)" if gun is not None else ""
+            satirlar.append(f"- {ad_soyad}: {tip}, {bas:%d.%m.%Y} - {bit:%d.%m.%Y}{gun}")
+        if len(bekleyenler) > OZET_KUYRUK_SINIRI:
+            satirlar.append("... ve daha fazlası. Tüm liste için İK İzin Paneli'ndeki Onay Bekleyenler sayfasına bakın.")
+
+    return f"İzin Bildirim Özeti ({len(kayitlar)})", "\n".join(satirlar)
+
+
+# ---------------------------------------------------
+# KALICI SMTP BAĞLANTISI
+# ---------------------------------------------------
+class SmtpBaglantisi:
+    def __init__(self, host, port, kullanici=None, sifre=None, gonderen=None,
+                 starttls=True, zaman_asimi=30.0, bosta_kalma=60.0):
+        self.host = host
+        self.port = port
+        self.kullanici = kullanici
+        self.sifre = sifre
+        self.gonderen = gonderen or kullanici
+        self.starttls = starttls
+        self.zaman_asimi = zaman_asimi
+        self.bosta_kalma = bosta_kalma
+        self._smtp = None
+        self._son_kullanim = 0.0
+
+    @classmethod
+    def ortamdan(cls):
+        return cls(
+            host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            kullanici=os.getenv("SMTP_MAIL"),
+            sifre=os.getenv("SMTP_SIFRE"),
+            gonderen=os.getenv("SMTP_GONDEREN") or os.getenv("SMTP_MAIL"),
+            starttls=os.getenv("SMTP_STARTTLS", "1") == "1",
+        )
+
+    def _ac(self):
+        import smtplib
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.zaman_asimi)
+        if self.starttls:
+            smtp.starttls()
+        if self.kullanici and self.sifre:
+            smtp.login(self.kullanici, self.sifre)
+        self._smtp = smtp
+
+    def _hazirla(self):
+        import smtplib
+        if self._smtp is not None and time.monotonic() - self._son_kullanim > self.bosta_kalma:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self.kapat()
+            except smtplib.SMTPException:
+                self.kapat()
+            except OSError:
+                self.kapat()
+        if self._smtp is None:
+            self._ac()
+
+    @olculu("smtp.gonder")
+    def gonder(self, alici, konu, icerik):
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart()
+        msg["From"] = self.gonderen
+        msg["To"] = alici
+        msg["Subject"] = konu
+        msg.attach(MIMEText(icerik, "plain"))
+
+        self._hazirla()
+        try:
+            self._smtp.sendmail(self.gonderen, alici, msg.as_string())
+        except smtplib.SMTPServerDisconnected:
+            # Sunucu boştaki bağlantıyı kapatmış olabilir; bir kez yeniden bağlan.
+            self._smtp = None
+            self._ac()
+            self._smtp.sendmail(self.gonderen, alici, msg.as_string())
+        self._son_kullanim = time.monotonic()
+
+    def bosta_ise_kapat(self):
+        if self._smtp is not None and time.monotonic() - self._son_kullanim > self.bosta_kalma:
+            self.kapat()
+
+    def kapat(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+
+
+def kalici_hatalar():
+    # Kalıcı hatalar tekrar denenmez, doğrudan ölü kuyruğa düşer.
+    # smtplib ilk gönderimde yüklenir; except ifadesi yalnızca hata olunca değerlendirilir.
+    import smtplib
+    return (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+# ---------------------------------------------------
+# ARKA PLAN POSTA İŞÇİSİ
+# ---------------------------------------------------
+class PostaIscisi(threading.Thread):
+    """bildirim_kutusu tablosunu partiler halinde tek bir SMTP bağlantısı üzerinden boşaltır.
+
+    Başarısız gönderimler üstel geri çekilmeyle yeniden denenir; `max_deneme`
+    aşıldığında ya da alıcı reddedildiğinde kayıt 'olu' durumuna alınır.
+    Özet politikalı alıcıların bildirimleri vadesi gelene kadar bekletilir ve
+    alıcı başına tek e-posta olarak gönderilir; günlük özet `ozet_saati`nde gider.
+    SMTP gönderimi veritabanı işlemi dışında yapılır; kayıtlar gönderim süresince `kira`
+    saniyeliğine ayrılır.
+    """
+
+    def __init__(self, havuz, smtp, parti=20, aralik=5.0, max_deneme=6, taban_gecikme=30.0, ozet_saati=8,
+                 kira=300.0):
+        super().__init__(name="posta-iscisi", daemon=True)
+        self._havuz = havuz
+        self._smtp = smtp
+        self.parti = parti
+        self.aralik = aralik
+        self.max_deneme = max_deneme
+        self.taban_gecikme = taban_gecikme
+        self.ozet_saati = ozet_saati
+        self.kira = kira
+
+        self._uyandir = threading.Event()
+        self._dur = threading.Event()
+        self._kilit = threading.Lock()
+        self._sayac = {"gonderilen": 0, "hata": 0, "olu": 0, "parti": 0, "ozet": 0, "ozetlenen": 0,
+                       "son_hata": None}
+
+    @classmethod
+    def ortamdan(cls, havuz):
+        return cls(
+            havuz,
+            SmtpBaglantisi.ortamdan(),
+            parti=int(os.getenv("POSTA_PARTI", "20")),
+            aralik=float(os.getenv("POSTA_ARALIK", "5")),
+            max_deneme=int(os.getenv("POSTA_MAX_DENEME", "6")),
+            taban_gecikme=float(os.getenv("POSTA_TABAN_GECIKME", "30")),
+            ozet_saati=int(os.getenv("OZET_SAATI", "8")),
+            kira=float(os.getenv("POSTA_KIRA", "300")),
+        )
+
+    def uyandir(self):
+        self._uyandir.set()
+
+    def durdur(self):
+        self._dur.set()
+        self._uyandir.set()
+
+    def run(self):
+        while not self._dur.is_set():
+            try:
+                islenen = self.parti_isle()
+                self.ozetleri_isle()
+            except Exception as e:
+                log.exception("Posta işçisi partiyi işleyemedi")
+                with self._kilit:
+                    self._sayac["son_hata"] = str(e)
+                islenen = 0
+
+            if islenen >= self.parti:
+                continue
+
+            self._smtp.bosta_ise_kapat()
+            self._uyandir.wait(self.aralik)
+            self._uyandir.clear()
+
+        self._smtp.kapat()
+
+    def parti_isle(self):
+        """Vadesi gelen anlık bildirimlerden bir parti gönderir, işlenen kayıt sayısını döndürür.
+
+        Kayıtlar kısa bir işlemde `kira` saniyeliğine ayrılır (sonraki_deneme ileri alınır) ve
+        commit edilir; gönderim açık işlem ve satır kilidi olmadan yapılır. İşçi yarıda kalırsa
+        ayrılan kayıtlar kira dolunca yeniden seçilir. Kalıcı olmayan ilk hatada parti kesilir,
+        denenmemiş kayıtlar hemen bırakılır; erişilemeyen sunucu partiyi tek bir zaman aşımı kadar tutar.
+        """
+        with self._havuz.imlec() as c:
+            c.execute("""
+                UPDATE bildirim_kutusu
+                SET sonraki_deneme = now() + make_interval(secs => %s)
+                WHERE id IN (
+                    SELECT id
+                    FROM bildirim_kutusu b
+                    WHERE durum = 'bekliyor' AND sonraki_deneme <= now()
+                      AND NOT EXISTS (
+                          SELECT 1 FROM bildirim_tercihleri t
+                          WHERE t.alici = b.alici AND t.politika <> 'anlik'
+                      )
+                    ORDER BY sonraki_deneme, id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, alici, konu, icerik, deneme
+            """, (self.kira, self.parti))
+            kayitlar = sorted(c.fetchall())
+
+        gonderilen, tekrar, olu, birakilan = [], [], [], []
+        for i, (bid, alici, konu, icerik, deneme) in enumerate(kayitlar):
+            try:
+                self._smtp.gonder(alici, konu, icerik)
+                gonderilen.append((bid,))
+            except kalici_hatalar() as e:
+                olu.append((str(e)[:500], bid))
+            except Exception as e:
+                self._smtp.kapat()
+                if deneme + 1 >= self.max_deneme:
+                    olu.append((str(e)[:500], bid))
+                else:
+                    gecikme = self.taban_gecikme * (2 ** deneme)
+                    tekrar.append((str(e)[:500], gecikme, bid))
+                birakilan = [(k[0],) for k in kayitlar[i + 1:]]
+                break
+
+        with self._havuz.imlec() as c:
+            if gonderilen:
+                c.executemany(
+                    "UPDATE bildirim_kutusu SET durum = 'gonderildi', gonderildi = now(), "
+                    "deneme = deneme + 1, son_hata = NULL WHERE id = %s",
+                    gonderilen
+                )
+            if tekrar:
+                c.executemany(
+                    "UPDATE bildirim_kutusu SET deneme = deneme + 1, son_hata = %s, "
+                    "sonraki_deneme = now() + make_interval(secs => %s) WHERE id = %s",
+                    tekrar
+                )
+            if olu:
+                c.executemany(
+                    "UPDATE bildirim_kutusu SET durum = 'olu', deneme = deneme + 1, "
+                    "son_hata = %s WHERE id = %s",
+                    olu
+                )
+            if birakilan:
+                c.executemany("UPDATE bildirim_kutusu SET sonraki_deneme = now() WHERE id = %s", birakilan)
+
+        with self._kilit:
+            self._sayac["gonderilen"] += len(gonderilen)
+            self._sayac["hata"] += len(tekrar)
+            self._sayac["olu"] += len(olu)
+            if kayitlar:
+                self._sayac["parti"] += 1
+            if tekrar or olu:
+                self._sayac["son_hata"] = (tekrar or olu)[-1][0]
+
+        return len(kayitlar) - len(birakilan)
+
+    def ozetleri_isle(self):
+        """Vadesi gelen özetleri gönderir, gönderilen özet sayısını döndürür.
+
+        Saatlik özet bir sonraki saat başında, günlük özet ilk bildirimden sonraki
+        `ozet_saati`nde vadesine gelir. Geri çekilmedeki kayıtlar sonraki özete kalır.
+        Kalıcı olmayan ilk hatada kalan alıcılar bir sonraki tura bırakılır.
+        """
+        with self._havuz.imlec() as c:
+            c.execute("""
+                SELECT b.alici
+                FROM bildirim_kutusu b
+                JOIN bildirim_tercihleri t ON t.alici = b.alici AND t.politika <> 'anlik'
+                WHERE b.durum = 'bekliyor' AND b.sonraki_deneme <= now()
+                GROUP BY b.alici, t.politika
+                HAVING now() >= CASE t.politika
+                    WHEN 'saatlik' THEN date_trunc('hour', min(b.olusturuldu)) + interval '1 hour'
+                    ELSE date_trunc('day', min(b.olusturuldu) - make_interval(hours => %s))
+                         + interval '1 day' + make_interval(hours => %s)
+                END
+                LIMIT %s
+            """, (self.ozet_saati, self.ozet_saati, self.parti))
+            alicilar = [r[0] for r in c.fetchall()]
+
+        # Tüm özetler aynı SMTP oturumundan gider.
+        gonderilen = 0
+        for alici in alicilar:
+            sonuc = self._ozet_gonder(alici)
+            if sonuc is None:
+                break
+            gonderilen += sonuc
+        return gonderilen
+
+    def _ozet_gonder(self, alici):
+        """1 (gönderildi), 0 (gönderilecek kayıt yok ya da kalıcı hata) ya da None (yeniden denenecek)."""
+        # Kayıtlar parti_isle'deki gibi kısa bir işlemde kiralanır, gönderim işlem dışında yapılır.
+        with self._havuz.imlec() as c:
+            c.execute("""
+                UPDATE bildirim_kutusu
+                SET sonraki_deneme = now() + make_interval(secs => %s)
+                WHERE id IN (
+                    SELECT id
+                    FROM bildirim_kutusu
+                    WHERE alici = %s AND durum = 'bekliyor' AND sonraki_deneme <= now()
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, konu, icerik, deneme, olusturuldu
+            """, (self.kira, alici))
+            kayitlar = sorted(c.fetchall())
+            if not kayitlar:
+                return 0
+            konu, icerik = ozet_metni(c, alici, kayitlar)
+        idler = [k[0] for k in kayitlar]
+        deneme = max(k[3] for k in kayitlar)
+
+        hata = None
+        try:
+            self._smtp.gonder(alici, konu, icerik)
+        except kalici_hatalar() as e:
+            hata, olu = str(e)[:500], True
+        except Exception as e:
+            self._smtp.kapat()
+            hata, olu = str(e)[:500], deneme + 1 >= self.max_deneme
+
+        with self._havuz.imlec() as c:
+            if hata is None:
+                c.execute(
+                    "UPDATE bildirim_kutusu SET durum = 'gonderildi', gonderildi = now(), "
+                    "deneme = deneme + 1, son_hata = NULL, ozet_grubu = %s WHERE id = ANY(%s)",
+                    (idler[0], idler)
+                )
+            elif olu:
+                c.execute(
+                    "UPDATE bildirim_kutusu SET durum = 'olu', deneme = deneme + 1, "
+                    "son_hata = %s WHERE id = ANY(%s)",
+                    (hata, idler)
+                )
+            else:
+                c.execute(
+                    "UPDATE bildirim_kutusu SET deneme = deneme + 1, son_hata = %s, "
+                    "sonraki_deneme = now() + make_interval(secs => %s) WHERE id = ANY(%s)",
+                    (hata, self.taban_gecikme * (2 ** deneme), idler)
+                )
+
+        with self._kilit:
+            if hata is None:
+                self._sayac["ozet"] += 1
+                self._sayac["ozetlenen"] += len(idler)
+                self._sayac["gonderilen"] += len(idler)
+            else:
+                self._sayac["olu" if olu else "hata"] += len(idler)
+                self._sayac["son_hata"] = hata
+        if hata is None:
+            return 1
+        return 0 if olu else None
+
+    def istatistik(self):
+        with self._kilit:
+            s = dict(self._sayac)
+        s["calisiyor"] = self.is_alive()
+        return s
+
+
+# ---------------------------------------------------
+# TEK BAŞINA ÇALIŞTIRMA
+# ---------------------------------------------------
+# Örn. yerel bir SMTP taklidiyle deneme:
+#   python -m aiosmtpd -n -l localhost:1025
+#   SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=0 python bildirim.py
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from veritabani import BaglantiHavuzu
+    from migrasyon import migrasyonlari_uygula
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    havuz = BaglantiHavuzu.ortamdan()
+    migrasyonlari_uygula(havuz)
+    isci = PostaIscisi.ortamdan(havuz)
+    isci.start()
+    try:
+        while isci.is_alive():
+            isci.join(1.0)
+    except KeyboardInterrupt:
+        isci.durdur()
+        isci.join()
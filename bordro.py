@@ -0,0 +1,115 @@
+"""Aylık bordro izin dökümü.
+
+Seçilen aya değen onaylı talepler donem GiST indeksiyle tek sorguda okunur,
+uçları ay sınırına kırpılır ve iş günleri IsTakvimi'nin önek toplamlarıyla tüm talepler
+için tek seferde hesaplanır; ay sınırını aşan talebin yalnızca bu aya düşen kısmı sayılır.
+Sonuç sicil başına tek satırdır, ücretsiz ve raporlu izin ayrı kolonlarda kalır.
+"""
+import os
+from calendar import monthrange
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from arsiv import arsiv_oku, arsivlenmis_yillar
+from olcum import olculu
+from talepler import IZIN_TURLERI, TalepFiltresi
+
+# Bordroda ücretten düşülen ya da SGK'ya ayrı bildirilen türler; ücretli toplama girmez.
+AYRI_TURLER = ["Ücretsiz İzin", "Raporlu İzin"]
+UCRETLI_TOPLAM = "Ücretli İzin Toplamı"
+
+KIMLIK_KOLONLARI = [("sicil", "Sicil"), ("ad_soyad", "Ad Soyad"), ("departman", "Departman")]
+OKUNAN_KOLONLAR = ["id", "sicil", "ad_soyad", "departman", "tip", "baslangic", "bitis"]
+
+
+def ay_araligi(yil, ay):
+    return date(yil, ay, 1), date(yil, ay, monthrange(yil, ay)[1])
+
+
+# ---------------------------------------------------
+# AYA DEĞEN ONAYLI TALEPLER
+# ---------------------------------------------------
+def ay_izinleri(havuz, yil, ay):
+    """Aya değen onaylı talepler; arşivlenmiş yıllardaki (ay ya da önceki yıl) talepler de eklenir."""
+    ilk, son = ay_araligi(yil, ay)
+    # İndeksin kısmi koşulu (CAKISMA_KOSULU) aynen yazılır; yoksa planlayıcı indeksi kullanamaz
+    # ve her yıl bölümünü baştan sona tarar.
+    parcalar = [havuz.sorgu_df("""
+        SELECT t.id, t.sicil, t.ad_soyad, COALESCE(p.departman, t.departman) AS departman,
+               t.tip, t.baslangic, t.bitis
+        FROM talepler t
+        LEFT JOIN personellers p ON p.sicil = t.sicil
+        WHERE t.donem && daterange(%s, %s, '[]')
+          AND t.durum IS DISTINCT FROM 'Reddedildi' AND t.donem IS NOT NULL AND t.sicil IS NOT NULL
+          AND t.durum = 'Onaylandı'
+    """, (ilk, son))]
+
+    arsiv = arsivlenmis_yillar(havuz)
+    filtre = TalepFiltresi(baslangic=ilk, bitis=son, durum="Onaylandı")
+    for dosya in arsiv.loc[arsiv["yil"].isin([yil - 1, yil]), "dosya"]:
+        if os.path.exists(dosya):
+            parcalar.append(arsiv_oku(dosya, filtre)[OKUNAN_KOLONLAR])
+
+    izinler = pd.concat(parcalar, ignore_index=True)
+    return izinler[izinler["sicil"].notna()].reset_index(drop=True)
+
+
+# ---------------------------------------------------
+# VEKTÖREL İŞ GÜNÜ TOPLAMLARI
+# ---------------------------------------------------
+def bordro_tablosu(izinler, takvim, yil, ay):
+    """Sicil x izin türü iş günü tablosu (sicile göre sıralı, başlıklar Türkçe)."""
+    ilk, son = ay_araligi(yil, ay)
+    turler = IZIN_TURLERI + sorted(set(izinler["tip"].dropna()) - set(IZIN_TURLERI))
+    basliklar = [b for _, b in KIMLIK_KOLONLARI] + turler + [UCRETLI_TOPLAM]
+    if izinler.empty:
+        return pd.DataFrame(columns=basliklar)
+
+    b = np.maximum(izinler["baslangic"].to_numpy(dtype="datetime64[D]"), np.datetime64(ilk, "D"))
+    e = np.minimum(izinler["bitis"].to_numpy(dtype="datetime64[D]"), np.datetime64(son, "D"))
+    gunler = pd.Series(takvim.is_gunu(b, e), index=izinler.index)
+
+    tablo = (gunler.groupby([izinler["sicil"], izinler["tip"]]).sum()
+             .unstack(fill_value=0.0)
+             .reindex(columns=turler, fill_value=0.0))
+    tablo[UCRETLI_TOPLAM] = tablo.drop(columns=AYRI_TURLER).sum(axis=1)
+
+    # Ad ve departman sicilin en son talebinden alınır.
+    kimlik = (izinler.sort_values("id").drop_duplicates("sicil", keep="last")
+              .set_index("sicil")[["ad_soyad", "departman"]])
+    tablo = kimlik.join(tablo, how="right").sort_index().reset_index()
+    return tablo.rename(columns=dict(KIMLIK_KOLONLARI))[basliklar]
+
+
+@olculu("bordro.hesap")
+def aylik_bordro(havuz, takvim, yil, ay):
+    return bordro_tablosu(ay_izinleri(havuz, yil, ay), takvim, yil, ay)
+
+
+# ---------------------------------------------------
+# CSV / PARQUET (PARÇA PARÇA YAZIM)
+# ---------------------------------------------------
+@olculu("bordro.csv")
+def bordro_csv_yaz(tablo, hedef, parca=10_000):
+    """Tabloyu `hedef` (ikili dosya) içine `parca`'lık gruplar halinde CSV olarak yazar."""
+    # Excel'in UTF-8 CSV'yi doğru açması için BOM + başlık satırı.
+    hedef.write(("\ufeff" + ",".join(tablo.columns) + "\n").encode("utf-8"))
+    for i in range(0, len(tablo), parca):
+        hedef.write(tablo.iloc[i:i + parca].to_csv(header=False, index=False, lineterminator="\n").encode("utf-8"))
+    return len(tablo)
+
+
+@olculu("bordro.parquet")
+def bordro_parquet_yaz(tablo, hedef, parca=10_000):
+    """Tabloyu `hedef` (yol ya da ikili dosya) içine her `parca` satır bir satır grubu olacak şekilde yazar."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    kimlik = {b for _, b in KIMLIK_KOLONLARI}
+    sema = pa.schema([(k, pa.string() if k in kimlik else pa.float64()) for k in tablo.columns])
+    with pq.ParquetWriter(hedef, sema, compression="zstd") as yazici:
+        for i in range(0, max(len(tablo), 1), parca):
+            yazici.write_table(pa.Table.from_pandas(tablo.iloc[i:i + parca], schema=sema, preserve_index=False))
+    return len(tablo)
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+import psycopg2.extensions
+
+from veritabani import get_db
+
+log = logging.getLogger(__name__)
+
+# migrasyon 11'deki pg_notify çağrılarıyla aynı olmalı.
+KANAL = "izin_degisiklik"
+
+# Bağlantı koptuğunda kaçırılan olaylar bilinemez; tüm önbellekler ve oturumlar için bu olay üretilir.
+HEPSI = {"tablo": "*", "hepsi": True}
+
+
+# ---------------------------------------------------
+# OLAY -> KONU
+# ---------------------------------------------------
+# Konular "tablo" ya da "tablo/boyut/değer" biçimindedir, ör. "talepler/onayci/mud@x.com".
+def olay_konulari(olay):
+    """(konular, tamamı değişen tablolar) döndürür."""
+    tablo = olay.get("tablo")
+    if olay.get("hepsi"):
+        return set(), {tablo}
+
+    konular = {tablo}
+    for boyut in ("sicil", "departman", "onayci"):
+        for deger in olay.get(boyut) or ():
+            konular.add(f"{tablo}/{boyut}/{deger}")
+    return konular, set()
+
+
+# ---------------------------------------------------
+# OTURUM ABONELİKLERİ
+# ---------------------------------------------------
+class OturumAboneleri:
+    """Hangi oturumun hangi konuları gösterdiği; her rerun kendi aboneliğini baştan yazar."""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._oturumlar = {}  # oturum -> konular
+        self._konular = {}  # konu -> oturumlar
+
+    def abone_ol(self, oturum, konular):
+        konular = frozenset(konular)
+        with self._kilit:
+            self._cikar(oturum)
+            if konular:
+                self._oturumlar[oturum] = konular
+                for k in konular:
+                    self._konular.setdefault(k, set()).add(oturum)
+
+    def birak(self, oturum):
+        with self._kilit:
+            self._cikar(oturum)
+
+    def _cikar(self, oturum):
+        for k in self._oturumlar.pop(oturum, ()):
+            kume = self._konular.get(k)
+            if kume is not None:
+                kume.discard(oturum)
+                if not kume:
+                    del self._konular[k]
+
+    def etkilenenler(self, konular, tablolar=()):
+        with self._kilit:
+            sonuc = set()
+            for k in konular:
+                sonuc |= self._konular.get(k, set())
+            if tablolar:
+                for oturum, abonelik in self._oturumlar.items():
+                    if "*" in tablolar or any(k.split("/", 1)[0] in tablolar for k in abonelik):
+                        sonuc.add(oturum)
+            return sonuc
+
+    def __len__(self):
+        with self._kilit:
+            return len(self._oturumlar)
+
+
+# ---------------------------------------------------
+# DİNLEYİCİ İŞ PARÇACIĞI
+# ---------------------------------------------------
+class DegisiklikDinleyici(threading.Thread):
+    """Ayrı bir bağlantıda LISTEN yapar, gelen olayları kısa bir süre toplayıp işleyicilere iletir.
+
+    Her tablo için bir sürüm sayacı tutulur; önbellek anahtarına sürüm eklenerek
+    yalnızca değişen tabloya bağlı kayıtlar eskitilir. Bağlantı koparsa yeniden
+    bağlanılır ve kaçırılmış olabilecek olaylar yerine HEPSI olayı yayımlanır.
+    """
+
+    def __init__(self, baglanti_fabrikasi=get_db, kanal=KANAL, toplama=0.05, yeniden_baglanma=5.0):
+        super().__init__(name="degisiklik-dinleyici", daemon=True)
+        self._fabrika = baglanti_fabrikasi
+        self.kanal = kanal
+        self.toplama = toplama
+        self.yeniden_baglanma = yeniden_baglanma
+
+        self._isleyiciler = []
+        self._dur = threading.Event()
+        self._kilit = threading.Lock()
+        self._surumler = {}
+        self._genel_surum = 0  # HEPSI olaylarında tüm tabloların sürümü birlikte artar
+        self._sayac = {"olay": 0, "parti": 0, "kopma": 0, "hata": 0, "son_hata": None}
+        self._bagli = False
+
+    @classmethod
+    def ortamdan(cls):
+        return cls(
+            toplama=float(os.getenv("DEGISIKLIK_TOPLAMA_MS", "50")) / 1000,
+            yeniden_baglanma=float(os.getenv("DEGISIKLIK_YENIDEN_BAGLANMA", "5")),
+        )
+
+    def isleyici_ekle(self, fonk):
+        """fonk(olaylar) her olay partisi için dinleyici iş parçacığında çağrılır."""
+        self._isleyiciler.append(fonk)
+
+    def surum(self, tablo):
+        with self._kilit:
+            return self._surumler.get(tablo, 0) + self._genel_surum
+
+    def surum_artir(self, tablo):
+        # Aynı süreçte yapılan değişiklik için olayı beklemeden önbelleği eskitir.
+        with self._kilit:
+            self._surumler[tablo] = self._surumler.get(tablo, 0) + 1
+
+    def durdur(self):
+        self._dur.set()
+
+    # ---------------------------------------------------
+    # OLAY İŞLEME
+    # ---------------------------------------------------
+    def yayimla(self, olaylar):
+        tablolar = {o.get("tablo") for o in olaylar}
+        with self._kilit:
+            if "*" in tablolar:
+                self._genel_surum += 1
+                tablolar.discard("*")
+            for t in tablolar:
+                self._surumler[t] = self._surumler.get(t, 0) + 1
+            self._sayac["olay"] += len(olaylar)
+            self._sayac["parti"] += 1
+
+        for fonk in self._isleyiciler:
+            try:
+                fonk(olaylar)
+            except Exception as e:
+                log.exception("Değişiklik işleyicisi başarısız")
+                with self._kilit:
+                    self._sayac["hata"] += 1
+                    self._sayac["son_hata"] = str(e)
+
+    def _olaylari_al(self, conn):
+        olaylar = []
+        while conn.notifies:
+            bildirim = conn.notifies.pop(0)
+            try:
+                olaylar.append(json.loads(bildirim.payload))
+            except ValueError:
+                log.warning("Çözülemeyen değişiklik olayı: %r", bildirim.payload[:200])
+        return olaylar
+
+    def _baglan(self):
+        conn = self._fabrika()
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as c:
+            c.execute(f"LISTEN {self.kanal}")
+        return conn
+
+    def run(self):
+        ilk = True
+        while not self._dur.is_set():
+            conn = None
+            try:
+                conn = self._baglan()
+                self._bagli = True
+                if not ilk:
+                    self.yayimla([HEPSI])
+                ilk = False
+
+                while not self._dur.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    # Aynı anda gelen olaylar (toplu onay, içe aktarma) tek partide işlenir.
+                    time.sleep(self.toplama)
+                    conn.poll()
+                    olaylar = self._olaylari_al(conn)
+                    if olaylar:
+                        self.yayimla(olaylar)
+            except Exception as e:
+                log.warning("Değişiklik dinleyicisi bağlantısı koptu: %s", e)
+                with self._kilit:
+                    self._sayac["kopma"] += 1
+                    self._sayac["son_hata"] = str(e)
+                ilk = False
+                self._dur.wait(self.yeniden_baglanma)
+            finally:
+                self._bagli = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def istatistik(self):
+        with self._kilit:
+            s = dict(self._sayac)
+            s["surumler"] = dict(self._surumler)
+            s["genel_surum"] = self._genel_surum
+        s["bagli"] = self._bagli
+        s["calisiyor"] = self.is_alive()
+        return s
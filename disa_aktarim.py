@@ -0,0 +1,93 @@
+from olcum import olculu
+
+# ---------------------------------------------------
+# TALEPLER DIŞA AKTARIM KOLONLARI
+# ---------------------------------------------------
+DISA_AKTARIM_KOLONLARI = [
+    ("t.id", "ID"),
+    ("t.sicil", "Sicil"),
+    ("t.ad_soyad", "Ad Soyad"),
+    ("t.departman", "Departman"),
+    ("t.meslek", "Meslek"),
+    ("t.tip", "İzin Türü"),
+    ("t.baslangic", "Başlangıç"),
+    ("t.bitis", "Bitiş"),
+    ("t.gun_sayisi", "İş Günü"),
+    ("t.neden", "Neden"),
+    ("t.durum", "Durum"),
+    ("t.onaylayan", "Onaylayan"),
+    ("t.onay_tarihi", "Onay Tarihi"),
+]
+
+EXCEL_MAX_SATIR = 1_048_576
+
+
+def _sorgu(filtre):
+    kosul, params = filtre.sql("t")
+    kolonlar = ", ".join(k for k, _ in DISA_AKTARIM_KOLONLARI)
+    return f"SELECT {kolonlar} FROM talepler t WHERE {kosul} ORDER BY t.id", params
+
+
+# ---------------------------------------------------
+# EXCEL (SABİT BELLEK)
+# ---------------------------------------------------
+@olculu("disa_aktarim.excel")
+def talepleri_excel_yaz(havuz, hedef_yol, filtre, parca=2000):
+    """Filtreye uyan talepleri `hedef_yol` dosyasına xlsx olarak yazar, satır sayısını döndürür.
+
+    Satırlar sunucu taraflı imleçle `parca`'lık gruplar halinde okunur ve
+    xlsxwriter'ın constant_memory modunda satır satır diske yazılır.
+    """
+    import xlsxwriter
+
+    sql, params = _sorgu(filtre)
+    basliklar = [b for _, b in DISA_AKTARIM_KOLONLARI]
+
+    wb = xlsxwriter.Workbook(hedef_yol, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd",
+    })
+    try:
+        def yeni_sayfa(no):
+            ws = wb.add_worksheet("Sayfa1" if no == 1 else f"Sayfa{no}")
+            ws.write_row(0, 0, basliklar)
+            return ws
+
+        sayfa_no = 1
+        ws = yeni_sayfa(sayfa_no)
+        satir = 0
+        toplam = 0
+
+        with havuz.baglanti() as conn, conn.cursor(name="talep_excel") as c:
+            c.itersize = parca
+            c.execute(sql, params)
+            for kayit in c:
+                satir += 1
+                if satir >= EXCEL_MAX_SATIR:
+                    sayfa_no += 1
+                    ws = yeni_sayfa(sayfa_no)
+                    satir = 1
+                ws.write_row(satir, 0, kayit)
+                toplam += 1
+    finally:
+        wb.close()
+
+    return toplam
+
+
+# ---------------------------------------------------
+# CSV (SUNUCUDAN DOĞRUDAN AKIŞ)
+# ---------------------------------------------------
+@olculu("disa_aktarim.csv")
+def talepleri_csv_yaz(havuz, hedef, filtre):
+    """Filtreye uyan talepleri COPY ... TO STDOUT ile `hedef` (ikili dosya) içine CSV olarak akıtır."""
+    sql, params = _sorgu(filtre)
+    basliklar = [b for _, b in DISA_AKTARIM_KOLONLARI]
+
+    # Excel'in UTF-8 CSV'yi doğru açması için BOM + başlık satırı.
+    hedef.write(("\ufeff" + ",".join(basliklar) + "\n").encode("utf-8"))
+
+    with havuz.imlec() as c:
+        sorgu = c.mogrify(sql, params).decode("utf-8")
+        c.copy_expert(f"COPY ({sorgu}) TO STDOUT WITH (FORMAT csv, ENCODING 'UTF8')", hedef)
+        return c.rowcount
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------
+# PENCEREYE DÜŞEN İZİNLER
+# ---------------------------------------------------
+def pencere_izinleri(havuz, baslangic, bitis, departmanlar=None, durumlar=("Onaylandı",)):
+    """[baslangic, bitis] penceresiyle kesişen izinleri personelin güncel departmanıyla döndürür.
+
+    `departmanlar` verilirse yalnızca bu departmanların izinleri okunur (boş liste boş sonuç verir).
+    """
+    kosul, params = "", [baslangic, bitis, bitis, list(durumlar)]
+    if departmanlar is not None:
+        kosul = "AND COALESCE(p.departman, t.departman) = ANY(%s)"
+        params.append(list(departmanlar))
+
+    # İndeksin kısmi koşulu (CAKISMA_KOSULU) aynen yazılır; yoksa planlayıcı donem indeksini
+    # kullanamaz. baslangic sınırı pencereden sonraki yılların bölümlerini budar.
+    return havuz.sorgu_df(f"""
+        SELECT t.id, t.sicil, t.ad_soyad, COALESCE(p.departman, t.departman) AS departman,
+               t.tip, t.baslangic, t.bitis, t.durum
+        FROM talepler t
+        LEFT JOIN personellers p ON p.sicil = t.sicil
+        WHERE t.donem && daterange(%s, %s, '[]')
+          AND t.baslangic <= %s
+          AND t.durum IS DISTINCT FROM 'Reddedildi' AND t.donem IS NOT NULL AND t.sicil IS NOT NULL
+          AND t.durum = ANY(%s)
+          {kosul}
+    """, params)
+
+
+# ---------------------------------------------------
+# FARK DİZİSİYLE ARALIK AÇMA
+# ---------------------------------------------------
+def _gun_indeksleri(izinler, baslangic, gun_sayisi):
+    # Pencereye kırpılmış [ilk, son] gün indeksleri.
+    ilk = np.datetime64(baslangic, "D")
+    b = (izinler["baslangic"].to_numpy(dtype="datetime64[D]") - ilk).astype("int64")
+    e = (izinler["bitis"].to_numpy(dtype="datetime64[D]") - ilk).astype("int64")
+    return np.clip(b, 0, gun_sayisi - 1), np.clip(e, 0, gun_sayisi - 1)
+
+
+def aralik_sayimi(izinler, baslangic, bitis, grup):
+    """`grup` kolonunun her değeri x pencerenin her günü için izinli kişi sayısı.
+
+    `izinler` pencereyle kesişen aralıklar olmalıdır; uçlar pencereye kırpılır.
+
+    Her aralık fark dizisine +1 / -1 olarak yazılır, satır bazında kümülatif toplam
+    günlük sayımı verir; satır sayısından bağımsız olarak iki np.add.at ve bir cumsum'dır.
+    """
+    gun_sayisi = (bitis - baslangic).days + 1
+    gunler = pd.date_range(baslangic, bitis, freq="D")
+    if izinler.empty:
+        return pd.DataFrame(np.zeros((0, gun_sayisi), dtype="int32"), columns=gunler)
+
+    kodlar, gruplar = pd.factorize(izinler[grup], use_na_sentinel=False)
+    b, e = _gun_indeksleri(izinler, baslangic, gun_sayisi)
+
+    fark = np.zeros((len(gruplar), gun_sayisi + 1), dtype="int32")
+    np.add.at(fark, (kodlar, b), 1)
+    np.add.at(fark, (kodlar, e + 1), -1)
+    return pd.DataFrame(np.cumsum(fark[:, :-1], axis=1), index=gruplar, columns=gunler)
+
+
+def departman_sayimi(izinler, baslangic, bitis):
+    return aralik_sayimi(izinler, baslangic, bitis, "departman")
+
+
+def kisi_matrisi(izinler, baslangic, bitis):
+    """Kişi x gün izinli mi matrisi; aynı kişinin çakışan izni olamayacağı için 0/1'dir.
+
+    Satırlar sicile göre ayrılır, etiket ad soyaddır; adaşların etiketine sicil eklenir.
+    """
+    matris = aralik_sayimi(izinler, baslangic, bitis, "sicil") > 0
+    siciller = matris.index.to_series()
+    adlar = (izinler.drop_duplicates("sicil").set_index("sicil")["ad_soyad"]
+             .reindex(matris.index).fillna(siciller).fillna("?").astype(str))
+    adas = adlar.duplicated(keep=False)
+    adlar[adas] = adlar[adas] + " (" + siciller[adas].astype(str) + ")"
+    matris.index = pd.Index(adlar.to_numpy())
+    return matris
+
+
+# ---------------------------------------------------
+# KAPSAMA VE BEKLEYEN TALEBİN ETKİSİ
+# ---------------------------------------------------
+def kapsama(sayim, kadro):
+    """Departman x gün çalışan oranı; kadro departman -> kişi sayısı serisidir."""
+    k = kadro.reindex(sayim.index).astype("float64")
+    return 1.0 - sayim.div(k.where(k > 0), axis=0)
+
+
+def talep_etkisi(havuz, talep, kadro, tampon=7):
+    """Bekleyen bir talebin departmanı için talep ± `tampon` gün penceresinde günlük etki tablosu.
+
+    Kolonlar: izinli (onaylı), talep ile (talep de onaylanırsa), kapsama, talep ile kapsama.
+    Ayrıca talep günlerinde izinli olanların kişi matrisi döner.
+    """
+    bas = talep["baslangic"] - timedelta(days=tampon)
+    bit = talep["bitis"] + timedelta(days=tampon)
+    departman = talep["departman"]
+
+    izinler = pencere_izinleri(havuz, bas, bit, departmanlar=[departman] if departman else None)
+    izinler = izinler[izinler["id"] != talep["id"]]
+
+    sayim = departman_sayimi(izinler, bas, bit)
+    izinli = sayim.iloc[0] if len(sayim) else pd.Series(0, index=pd.date_range(bas, bit, freq="D"))
+
+    gunler = izinli.index
+    talep_gunu = (gunler >= pd.Timestamp(talep["baslangic"])) & (gunler <= pd.Timestamp(talep["bitis"]))
+    kisi = float(kadro.get(departman, 0)) or np.nan
+
+    etki = pd.DataFrame({
+        "izinli": izinli.to_numpy(),
+        "talep ile": izinli.to_numpy() + talep_gunu.astype("int32"),
+    }, index=gunler)
+    etki["kapsama"] = 1.0 - etki["izinli"] / kisi
+    etki["talep ile kapsama"] = 1.0 - etki["talep ile"] / kisi
+
+    ortak = izinler[(izinler["baslangic"] <= talep["bitis"]) & (izinler["bitis"] >= talep["baslangic"])]
+    matris = kisi_matrisi(ortak, talep["baslangic"], talep["bitis"])
+    return etki, matris
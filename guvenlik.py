@@ -0,0 +1,70 @@
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+ALGORITMA = "pbkdf2_sha256"
+ITERASYON = int(os.getenv("SIFRE_ITERASYON", "260000"))
+
+
+# ---------------------------------------------------
+# ŞİFRE HASH
+# ---------------------------------------------------
+# Saklama biçimi: pbkdf2_sha256$<iterasyon>$<tuz>$<hash>  (tuz ve hash base64)
+def sifre_hashle(sifre, iterasyon=None):
+    iterasyon = iterasyon or ITERASYON
+    tuz = secrets.token_bytes(16)
+    ozet = hashlib.pbkdf2_hmac("sha256", str(sifre).encode("utf-8"), tuz, iterasyon)
+    return "$".join([
+        ALGORITMA,
+        str(iterasyon),
+        base64.b64encode(tuz).decode("ascii"),
+        base64.b64encode(ozet).decode("ascii"),
+    ])
+
+
+def hash_mi(kayitli):
+    return isinstance(kayitli, str) and kayitli.startswith(ALGORITMA + "$")
+
+
+def sifre_dogrula(sifre, kayitli):
+    """(doğru_mu, yeniden_hashlenmeli_mi) döndürür.
+
+    Eski düz metin kayıtlar da kabul edilir; doğru girişte yeniden hashlenmeleri istenir.
+    """
+    if kayitli is None:
+        return False, False
+
+    if not hash_mi(kayitli):
+        dogru = hmac.compare_digest(str(kayitli).encode("utf-8"), str(sifre).encode("utf-8"))
+        return dogru, dogru
+
+    try:
+        _, iterasyon, tuz, ozet = kayitli.split("$")
+        iterasyon = int(iterasyon)
+        tuz = base64.b64decode(tuz)
+        ozet = base64.b64decode(ozet)
+    except ValueError:
+        return False, False
+
+    hesaplanan = hashlib.pbkdf2_hmac("sha256", str(sifre).encode("utf-8"), tuz, iterasyon)
+    dogru = hmac.compare_digest(hesaplanan, ozet)
+    return dogru, dogru and iterasyon < ITERASYON
+
+
+# ---------------------------------------------------
+# TOPLU HASH (Excel içe aktarım)
+# ---------------------------------------------------
+def sifreleri_hashle(sifreler, isci_sayisi=None, paralel_esik=64):
+    """Şifre listesini aynı sırada hash listesine çevirir; uzun listeler süreç havuzunda işlenir."""
+    sifreler = list(sifreler)
+    if len(sifreler) < paralel_esik:
+        return [sifre_hashle(s) for s in sifreler]
+
+    isci_sayisi = isci_sayisi or os.cpu_count() or 1
+    parca = max(1, len(sifreler) // (isci_sayisi * 4))
+    with ProcessPoolExecutor(isci_sayisi, mp_context=multiprocessing.get_context("spawn")) as ex:
+        return list(ex.map(sifre_hashle, sifreler, chunksize=parca))
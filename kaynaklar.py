@@ -0,0 +1,119 @@
+import os
+
+# .env, ortam değişkenini içe aktarma anında okuyan modüllerden (olcum) önce yüklenmeli.
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import streamlit as st  # noqa: E402
+
+from arsiv import bolumleri_hazirla  # noqa: E402
+from bakiye import TakvimDeposu  # noqa: E402
+from bildirim import PostaIscisi  # noqa: E402
+from degisiklik import DegisiklikDinleyici, OturumAboneleri, olay_konulari  # noqa: E402
+from migrasyon import migrasyonlari_uygula  # noqa: E402
+from personel import PersonelRehberi  # noqa: E402
+from talepler import talep_sayisi  # noqa: E402
+from veritabani import BaglantiHavuzu  # noqa: E402
+
+
+# ---------------------------------------------------
+# SÜREÇ BAŞINA BİR KEZ KURULAN KAYNAKLAR
+# ---------------------------------------------------
+# Bu modül süreçte bir kez içe aktarılır; rerun'lar yalnızca önbellekten okur.
+@st.cache_resource
+def havuz_getir():
+    havuz = BaglantiHavuzu.ortamdan()
+    migrasyonlari_uygula(havuz)
+    # Yıl dönümünde yeni yılın bölümü hazır olsun; asıl bakım arsiv.py ile zamanlanır.
+    bolumleri_hazirla(havuz)
+    return havuz
+
+
+@st.cache_resource
+def rehber_getir(_havuz):
+    return PersonelRehberi.ortamdan(_havuz)
+
+
+# Bildirimler talepler değişikliğiyle aynı işlemde bildirim_kutusu'na yazılır,
+# bu arka plan iş parçacığı onları kalıcı bir SMTP bağlantısı üzerinden gönderir.
+@st.cache_resource
+def posta_iscisi_getir(_havuz):
+    isci = PostaIscisi.ortamdan(_havuz)
+    if os.getenv("POSTA_ISCISI", "1") == "1":
+        isci.start()
+    return isci
+
+
+@st.cache_resource
+def pdf_onbellegi_getir():
+    # fpdf yalnızca PDF isteyen sayfalarda yüklenir.
+    from pdf_formu import PdfOnbellegi
+    return PdfOnbellegi.ortamdan()
+
+
+@st.cache_resource
+def takvim_deposu_getir(_havuz):
+    return TakvimDeposu.ortamdan(_havuz)
+
+
+# ---------------------------------------------------
+# DEĞİŞİKLİK AKIŞI
+# ---------------------------------------------------
+@st.cache_resource
+def oturum_aboneleri_getir():
+    return OturumAboneleri()
+
+
+def oturumu_yenile(oturum_id):
+    """Oturuma sunucu tarafından rerun ister; oturum artık yoksa False döner.
+
+    Streamlit'in dışa açık bir API'si olmadığı için çalışma zamanının oturum
+    yöneticisi kullanılır (get_active_session_info iş parçacığı güvenlidir).
+    """
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return False
+    bilgi = Runtime.instance()._session_mgr.get_active_session_info(oturum_id)
+    if bilgi is None:
+        return False
+    bilgi.session.request_rerun(None)
+    return True
+
+
+@st.cache_resource
+def degisiklik_dinleyicisi_getir(_havuz):
+    dinleyici = DegisiklikDinleyici.ortamdan()
+    rehber = rehber_getir(_havuz)
+    takvim_deposu = takvim_deposu_getir(_havuz)
+    aboneler = oturum_aboneleri_getir()
+
+    def isle(olaylar):
+        konular, tablolar = set(), set()
+        for olay in olaylar:
+            k, t = olay_konulari(olay)
+            konular |= k
+            tablolar |= t
+        degisen = tablolar | {k.split("/", 1)[0] for k in konular}
+
+        if degisen & {"personellers", "*"}:
+            rehber.gecersiz_kil()
+        if degisen & {"tatil_gunleri", "*"}:
+            takvim_deposu.gecersiz_kil()
+
+        for oturum in aboneler.etkilenenler(konular, tablolar):
+            if not oturumu_yenile(oturum):
+                aboneler.birak(oturum)
+
+    dinleyici.isleyici_ekle(isle)
+    if os.getenv("DEGISIKLIK_DINLEYICI", "1") == "1":
+        dinleyici.start()
+    return dinleyici
+
+
+# Sayım önbelleğinin anahtarında talepler sürümü vardır; değişiklik olayı yalnızca
+# talepler sayımlarını eskitir, eski kayıtlar TTL ile düşer.
+@st.cache_data(ttl=60, show_spinner=False)
+def talep_sayisi_getir(filtre, surum):
+    return talep_sayisi(havuz_getir(), filtre)
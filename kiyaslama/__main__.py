@@ -0,0 +1,195 @@
+"""Kıyaslama paketi komut satırı.
+
+Depo kökünden çalıştırılır; DB_* ortam değişkenleri yerel bir PostgreSQL'i göstermelidir,
+tablolar KIYAS_DB_NAME (varsayılan izin_kiyaslama) veritabanında kurulur:
+
+    python -m kiyaslama hazirla --olcek orta
+    python -m kiyaslama calistir --cikti once.json
+    python -m kiyaslama karsilastir once.json sonra.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+from kiyaslama.senaryolar import SENARYOLAR
+from kiyaslama.veri import OLCEKLER, kiyas_baglantisi, veri_yukle, veritabani_hazirla
+from migrasyon import migrasyonlari_uygula
+from olcum import DEFTER, OLCUM_ACIK
+from veritabani import BaglantiHavuzu
+
+
+def havuz_ac():
+    return BaglantiHavuzu(kiyas_baglantisi, min_boyut=1, max_boyut=4)
+
+
+# ---------------------------------------------------
+# VERİ HAZIRLAMA
+# ---------------------------------------------------
+def hazirla(args):
+    personel, talep = OLCEKLER[args.olcek]
+    personel = args.personel or personel
+    talep = args.talep or talep
+
+    veritabani_hazirla()
+    havuz = havuz_ac()
+    try:
+        migrasyonlari_uygula(havuz)
+        t0 = time.perf_counter()
+        p, t = veri_yukle(havuz, personel, talep, tohum=args.tohum)
+        print(f"{p} personel, {t} talep yüklendi ({time.perf_counter() - t0:.1f} sn)")
+    finally:
+        havuz.kapat()
+
+
+# ---------------------------------------------------
+# ÇALIŞTIRMA
+# ---------------------------------------------------
+def _git(*komut):
+    try:
+        return subprocess.run(["git", *komut], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ortam_bilgisi(havuz):
+    with havuz.imlec() as c:
+        c.execute("SELECT current_setting('server_version'), "
+                  "(SELECT count(*) FROM personellers), (SELECT count(*) FROM talepler)")
+        surum, personel, talep = c.fetchone()
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "degisiklik_var": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "zaman": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu": os.cpu_count(),
+        "postgres": surum,
+        "personel": personel,
+        "talep": talep,
+    }
+
+
+def _db_ozeti():
+    db = [h for ad, h in DEFTER.islemler().items() if ad in ("db", "db.copy")]
+    if not db:
+        return {}
+    return {"db_sorgu": sum(h["sayi"] for h in db), "db_ms": sum(h["toplam_sn"] for h in db) * 1000}
+
+
+def senaryo_olc(havuz, senaryo, tohum, tekrar=None):
+    durum = senaryo.hazirla(havuz, np.random.default_rng(tohum))
+
+    # Isınma: bağlantılar, font/logo şablonları, plan önbelleği.
+    senaryo.calistir(havuz, durum)
+    if senaryo.temizle:
+        senaryo.temizle(havuz, durum)
+
+    sureler = []
+    db = {}
+    for _ in range(tekrar or senaryo.tekrar):
+        DEFTER.sifirla()
+        t0 = time.perf_counter()
+        senaryo.calistir(havuz, durum)
+        sureler.append((time.perf_counter() - t0) * 1000)
+        db = _db_ozeti()
+        if senaryo.temizle:
+            senaryo.temizle(havuz, durum)
+
+    sirali = sorted(sureler)
+    return {
+        "aciklama": senaryo.aciklama,
+        "ornekler_ms": sureler,
+        "min_ms": sirali[0],
+        "medyan_ms": statistics.median(sirali),
+        "maks_ms": sirali[-1],
+        **db,
+    }
+
+
+def calistir(args):
+    secilen = [s for s in SENARYOLAR if not args.senaryo or s.ad in args.senaryo]
+    havuz = havuz_ac()
+    try:
+        migrasyonlari_uygula(havuz)
+        sonuc = {"ortam": _ortam_bilgisi(havuz), "tohum": args.tohum, "senaryolar": {}}
+        if not sonuc["ortam"]["talep"]:
+            sys.exit("Kıyaslama veritabanı boş; önce 'python -m kiyaslama hazirla' çalıştırın.")
+
+        for s in secilen:
+            r = senaryo_olc(havuz, s, args.tohum, args.tekrar)
+            sonuc["senaryolar"][s.ad] = r
+            db = f"  {r['db_sorgu']} sorgu / {r['db_ms']:.1f} ms db" if "db_sorgu" in r else ""
+            print(f"{s.ad:<18} medyan {r['medyan_ms']:9.1f} ms   min {r['min_ms']:9.1f} ms{db}")
+    finally:
+        havuz.kapat()
+
+    kisa = (sonuc["ortam"]["commit"] or "yerel")[:10]
+    cikti = args.cikti or f"kiyaslama_{kisa}_{sonuc['ortam']['personel']}p.json"
+    with open(cikti, "w", encoding="utf-8") as f:
+        json.dump(sonuc, f, ensure_ascii=False, indent=2, default=str)
+    print(f"Sonuçlar: {cikti}")
+
+
+# ---------------------------------------------------
+# KARŞILAŞTIRMA
+# ---------------------------------------------------
+def karsilastir(args):
+    with open(args.once, encoding="utf-8") as f:
+        once = json.load(f)
+    with open(args.sonra, encoding="utf-8") as f:
+        sonra = json.load(f)
+
+    for anahtar in ("personel", "talep", "postgres"):
+        if once["ortam"].get(anahtar) != sonra["ortam"].get(anahtar):
+            print(f"Uyarı: {anahtar} farklı ({once['ortam'].get(anahtar)} / {sonra['ortam'].get(anahtar)})")
+
+    print(f"{'senaryo':<18} {'önce ms':>10} {'sonra ms':>10} {'oran':>7}")
+    for ad, s in sonra["senaryolar"].items():
+        o = once["senaryolar"].get(ad)
+        if o is None:
+            print(f"{ad:<18} {'-':>10} {s['medyan_ms']:10.1f}")
+            continue
+        oran = s["medyan_ms"] / o["medyan_ms"] if o["medyan_ms"] else float("nan")
+        print(f"{ad:<18} {o['medyan_ms']:10.1f} {s['medyan_ms']:10.1f} {oran:6.2f}x")
+
+
+def main(argv=None):
+    load_dotenv()
+    ap = argparse.ArgumentParser(prog="python -m kiyaslama")
+    alt = ap.add_subparsers(dest="komut", required=True)
+
+    h = alt.add_parser("hazirla", help="Kıyaslama veritabanını sentetik veriyle doldurur")
+    h.add_argument("--olcek", choices=OLCEKLER, default="kucuk")
+    h.add_argument("--personel", type=int)
+    h.add_argument("--talep", type=int)
+    h.add_argument("--tohum", type=int, default=42)
+    h.set_defaults(fonk=hazirla)
+
+    c = alt.add_parser("calistir", help="Senaryoları ölçer ve JSON'a yazar")
+    c.add_argument("--senaryo", action="append", choices=[s.ad for s in SENARYOLAR])
+    c.add_argument("--tekrar", type=int)
+    c.add_argument("--tohum", type=int, default=42)
+    c.add_argument("--cikti")
+    c.set_defaults(fonk=calistir)
+
+    k = alt.add_parser("karsilastir", help="İki sonuç dosyasının medyanlarını karşılaştırır")
+    k.add_argument("once")
+    k.add_argument("sonra")
+    k.set_defaults(fonk=karsilastir)
+
+    args = ap.parse_args(argv)
+    if args.komut == "calistir" and not OLCUM_ACIK:
+        print("Not: OLCUM=0, sorgu sayıları raporlanmayacak.")
+    args.fonk(args)
+
+
+if __name__ == "__main__":
+    main()
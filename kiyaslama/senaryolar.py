@@ -0,0 +1,289 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable
+
+import numpy as np
+from openpyxl import Workbook
+
+from bakiye import takvim_yukle
+from bordro import aylik_bordro, bordro_csv_yaz, bordro_parquet_yaz
+from disa_aktarim import talepleri_csv_yaz, talepleri_excel_yaz
+from kiyaslama.veri import KIYAS_SIFRESI, kiyas_db_adi
+from pdf_formu import pdf_olustur, pdf_verisi
+from personel import PERSONEL_KOLONLARI, Kullanici, giris_dogrula, personel_ara
+from personel_aktarimi import BEKLENEN_KOLONLAR, personel_aktar
+from talepler import (
+    ILGI, TalepFiltresi, kendi_talepleri, kendi_yil_sayilari, onay_kuyrugu, onay_kuyrugu_sayisi, talep_sayfasi,
+)
+
+# Her senaryo için örnek girdi sayısı; her tekrar bunların hepsini bir kez çalıştırır.
+ORNEK_SAYISI = 20
+
+
+# ---------------------------------------------------
+# SENARYO TANIMI
+# ---------------------------------------------------
+@dataclass(frozen=True)
+class Senaryo:
+    ad: str
+    aciklama: str
+    # hazirla(havuz, rng) -> durum; ölçülmez.
+    hazirla: Callable
+    # calistir(havuz, durum) ölçülen kısımdır.
+    calistir: Callable
+    # temizle(havuz, durum) her tekrardan sonra veriyi eski haline getirir; ölçülmez.
+    temizle: Callable | None = None
+    tekrar: int = 5
+
+
+def _ornek_personel(havuz, rng, sayi=ORNEK_SAYISI):
+    # Sicil sırasına göre aynı tohumla hep aynı kişiler seçilir.
+    df = havuz.sorgu_df("SELECT sicil, ad_soyad, email FROM personellers ORDER BY sicil")
+    secilen = rng.choice(len(df), size=min(sayi, len(df)), replace=False)
+    return df.iloc[np.sort(secilen)].reset_index(drop=True)
+
+
+# ---------------------------------------------------
+# GİRİŞ
+# ---------------------------------------------------
+def _giris_hazirla(havuz, rng):
+    # Şifre doğrulaması PBKDF2 maliyetidir; ad ile arama süresini bastırmasın diye az örnek.
+    return _ornek_personel(havuz, rng, 3)["ad_soyad"].tolist()
+
+
+def _giris(havuz, adlar):
+    for ad in adlar:
+        if giris_dogrula(havuz, ad, KIYAS_SIFRESI) is None:
+            raise RuntimeError(f"Kıyaslama kullanıcısı giriş yapamadı: {ad}")
+
+
+# ---------------------------------------------------
+# İZİNLERİM
+# ---------------------------------------------------
+def _kendi_hazirla(havuz, rng):
+    return _ornek_personel(havuz, rng)["sicil"].tolist()
+
+
+def _kendi(havuz, siciller):
+    for sicil in siciller:
+        kendi_talepleri(havuz, sicil)
+        kendi_yil_sayilari(havuz, sicil)
+
+
+# ---------------------------------------------------
+# ONAY KUYRUĞU
+# ---------------------------------------------------
+def _kuyruk_hazirla(havuz, rng):
+    df = havuz.sorgu_df(
+        "SELECT DISTINCT onayci_email FROM personellers WHERE onayci_email IS NOT NULL ORDER BY 1"
+    )
+    secilen = rng.choice(len(df), size=min(ORNEK_SAYISI, len(df)), replace=False)
+    return df["onayci_email"].iloc[np.sort(secilen)].tolist()
+
+
+def _kuyruk(havuz, emailler):
+    for email in emailler:
+        onay_kuyrugu(havuz, [email])
+        onay_kuyrugu_sayisi(havuz, [email])
+
+
+# ---------------------------------------------------
+# İK ARAMASI
+# ---------------------------------------------------
+def _arama_hazirla(havuz, rng):
+    # Yazarken gönderilen tipik metinler: adın ilk harfleri, ad + soyad başı, sicil başı.
+    ornekler = []
+    for ad_soyad, sicil in _ornek_personel(havuz, rng, ORNEK_SAYISI // 2)[["ad_soyad", "sicil"]].itertuples(index=False):
+        ad, soyad = ad_soyad.split()[:2]
+        ornekler += [ad[:3], f"{ad} {soyad[:2]}", sicil[:-1]]
+    return ornekler
+
+
+def _personel_arama(havuz, ornekler):
+    for metin in ornekler:
+        personel_ara(havuz, metin)
+
+
+def _talep_arama(havuz, ornekler):
+    for metin in ornekler:
+        talep_sayfasi(havuz, TalepFiltresi(arama=metin), ILGI)
+
+
+# ---------------------------------------------------
+# İK DIŞA AKTARIM
+# ---------------------------------------------------
+def _son_yil():
+    bugun = date.today()
+    return TalepFiltresi(baslangic=bugun - timedelta(days=365), bitis=bugun)
+
+
+def _excel(havuz, _):
+    with tempfile.TemporaryDirectory() as klasor:
+        talepleri_excel_yaz(havuz, os.path.join(klasor, "talepler.xlsx"), _son_yil())
+
+
+def _csv(havuz, _):
+    talepleri_csv_yaz(havuz, io.BytesIO(), TalepFiltresi())
+
+
+# ---------------------------------------------------
+# BORDRO İZİN DÖKÜMÜ
+# ---------------------------------------------------
+def _bordro_hazirla(havuz, rng):
+    # Geçen ay: bugüne kadar onaylanmış izinlerin büyük kısmı tamamlanmıştır.
+    gecen_ay = date.today().replace(day=1) - timedelta(days=1)
+    with havuz.imlec() as c:
+        return takvim_yukle(c), gecen_ay.year, gecen_ay.month
+
+
+def _bordro(havuz, durum):
+    takvim, yil, ay = durum
+    tablo = aylik_bordro(havuz, takvim, yil, ay)
+    bordro_csv_yaz(tablo, io.BytesIO())
+    bordro_parquet_yaz(tablo, io.BytesIO())
+
+
+# ---------------------------------------------------
+# EXCEL İÇE AKTARIM
+# ---------------------------------------------------
+def _aktarim_hazirla(havuz, rng, satir=None):
+    """Mevcut personelin güncellemesi ve %10 yeni personelden oluşan bir Excel dosyası."""
+    satir = satir or int(os.getenv("KIYAS_AKTARIM_SATIR", "1000"))
+    mevcut = havuz.sorgu_df(
+        "SELECT sicil, ad_soyad, meslek, departman, email, onayci_email, rol, cep_telefonu, ise_giris "
+        "FROM personellers ORDER BY sicil LIMIT %s", (satir - satir // 10,)
+    )
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(BEKLENEN_KOLONLAR + ["Ise_Giris"])
+    for r in mevcut.itertuples(index=False):
+        ws.append([r.sicil, r.ad_soyad, None, r.meslek, r.departman, r.email,
+                   r.onayci_email, r.rol, r.cep_telefonu, r.ise_giris])
+    yeniler = [f"YENI{i:06d}" for i in range(satir // 10)]
+    for sicil in yeniler:
+        ws.append([sicil, f"Yeni Personel {sicil}", KIYAS_SIFRESI, "Uzman", "Finans",
+                   f"{sicil.lower()}@kiyas.local", None, "Personel", None, None])
+
+    tampon = io.BytesIO()
+    wb.save(tampon)
+    return tampon.getvalue(), yeniler
+
+
+def _aktarim(havuz, durum):
+    icerik, _ = durum
+    rapor = personel_aktar(havuz, io.BytesIO(icerik))
+    if rapor.reddedilen:
+        raise RuntimeError(f"Kıyaslama dosyasında reddedilen satır var: {rapor.hatalar[:3]}")
+
+
+def _aktarim_temizle(havuz, durum):
+    _, yeniler = durum
+    with havuz.imlec() as c:
+        c.execute("DELETE FROM personellers WHERE sicil = ANY(%s)", (yeniler,))
+
+
+# ---------------------------------------------------
+# PDF
+# ---------------------------------------------------
+def _pdf_hazirla(havuz, rng):
+    df = havuz.sorgu_df("""
+        SELECT t.*, p.email, p.cep_telefonu
+        FROM talepler t JOIN personellers p ON p.sicil = t.sicil
+        WHERE t.durum = 'Onaylandı'
+        ORDER BY t.id
+        LIMIT 1000
+    """)
+    secilen = rng.choice(len(df), size=min(ORNEK_SAYISI, len(df)), replace=False)
+    return [pdf_verisi(df.iloc[i].to_dict()) for i in np.sort(secilen)]
+
+
+def _pdf(havuz, veriler):
+    # Önbellek atlanır; her çağrı gerçek üretimdir.
+    for veri in veriler:
+        pdf_olustur(veri)
+
+
+# ---------------------------------------------------
+# ARAYÜZ (STREAMLIT RERUN)
+# ---------------------------------------------------
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GIRIS = os.path.join(KOK, "izin_sistemi.py")
+
+ARAYUZ_SAYFALARI = [
+    "İzin Talep Formu", "İzinlerim (Durum Takip)", "Onay Bekleyenler (Yönetici)",
+    "Ekip Takvimi", "Tüm Talepler (İK)", "Analitik Paneli (İK)",
+]
+
+# Uygulama kıyaslama veritabanına bağlansın, posta işçisi başlamasın.
+ARAYUZ_ORTAMI = {"POSTA_ISCISI": "0"}
+
+_SOGUK_BETIK = """
+import sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+if at.exception:
+    sys.exit(str(at.exception))
+print((time.perf_counter() - t0) * 1000)
+"""
+
+
+def _arayuz_ortami():
+    return dict(ARAYUZ_ORTAMI, DB_NAME=kiyas_db_adi())
+
+
+def _soguk(havuz, _):
+    # Yeni bir süreçte giriş ekranının ilk çizimi: içe aktarmalar + tek seferlik kurulum.
+    subprocess.run(
+        [sys.executable, "-c", _SOGUK_BETIK, GIRIS],
+        cwd=KOK, env=dict(os.environ, **_arayuz_ortami()), check=True, capture_output=True,
+    )
+
+
+def _rerun_hazirla(havuz, rng):
+    from streamlit.testing.v1 import AppTest
+
+    with havuz.imlec() as c:
+        c.execute(f"SELECT {', '.join(PERSONEL_KOLONLARI)} FROM personellers WHERE rol = 'İK' ORDER BY sicil LIMIT 1")
+        ik = Kullanici(*c.fetchone())
+
+    os.environ.update(_arayuz_ortami())
+    os.chdir(KOK)
+    at = AppTest.from_file(GIRIS, default_timeout=120)
+    at.session_state["login_oldu"] = True
+    at.session_state["user"] = ik
+    at.run()
+    return at
+
+
+def _rerun(havuz, at):
+    # Her sayfaya geçiş bir rerun'dur; sonra aynı sayfada bir rerun daha.
+    for sayfa in ARAYUZ_SAYFALARI:
+        at.sidebar.radio[0].set_value(sayfa).run()
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{sayfa}: {at.exception[0].value}")
+
+
+SENARYOLAR = [
+    Senaryo("giris", "Ad soyad ile arama + şifre doğrulama (3 kişi)", _giris_hazirla, _giris),
+    Senaryo("izinlerim", f"İzinlerim ilk sayfa + yıl sayıları ({ORNEK_SAYISI} kişi)", _kendi_hazirla, _kendi),
+    Senaryo("onay_kuyrugu", f"Onaycı kuyruğu ilk sayfa + sayı ({ORNEK_SAYISI} onaycı)", _kuyruk_hazirla, _kuyruk),
+    Senaryo("personel_arama", "Personel araması ilk sayfa (yazarken gönderilen metinler)", _arama_hazirla,
+            _personel_arama),
+    Senaryo("talep_arama", "Tüm Talepler araması, ilgililiğe göre ilk sayfa", _arama_hazirla, _talep_arama),
+    Senaryo("ik_excel", "Son 12 ayın talepleri xlsx", lambda havuz, rng: None, _excel, tekrar=3),
+    Senaryo("ik_csv", "Tüm talepler CSV (COPY)", lambda havuz, rng: None, _csv, tekrar=3),
+    Senaryo("bordro", "Geçen ayın bordro izin dökümü (CSV + Parquet)", _bordro_hazirla, _bordro, tekrar=3),
+    Senaryo("personel_aktarim", "Excel içe aktarım (%90 güncelleme, %10 yeni)",
+            _aktarim_hazirla, _aktarim, _aktarim_temizle, tekrar=3),
+    Senaryo("pdf", f"İzin formu PDF üretimi ({ORNEK_SAYISI} talep)", _pdf_hazirla, _pdf),
+    Senaryo("arayuz_soguk", "Yeni süreçte giriş ekranının ilk çizimi", lambda havuz, rng: None, _soguk, tekrar=3),
+    Senaryo("arayuz_rerun", f"İK kullanıcısıyla {len(ARAYUZ_SAYFALARI)} sayfa x 2 rerun", _rerun_hazirla, _rerun),
+]
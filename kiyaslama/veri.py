@@ -0,0 +1,247 @@
+import os
+from datetime import date
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2 import sql
+
+from arsiv import bolumleri_hazirla
+from bakiye import takvim_yukle
+from guvenlik import sifre_hashle
+from onay_akisi import IK_ADIMI
+
+# Üretilen tüm personelin şifresi; giriş ölçümü bununla yapılır.
+KIYAS_SIFRESI = "Kiyas123!"
+
+ADLAR = [
+    "Ahmet", "Mehmet", "Mustafa", "Ali", "Hüseyin", "Hasan", "İbrahim", "Murat", "Emre", "Burak",
+    "Ayşe", "Fatma", "Emine", "Hatice", "Zeynep", "Elif", "Meryem", "Şerife", "Zehra", "Büşra",
+    "Can", "Cem", "Deniz", "Ece", "Gökhan", "İrem", "Kerem", "Selin", "Tuğba", "Yusuf",
+]
+SOYADLAR = [
+    "Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+    "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+    "Polat", "Korkmaz", "Erdoğan", "Güneş", "Aksoy", "Tekin", "Ünal", "Bulut", "Keskin", "Uçar",
+]
+DEPARTMANLAR = [
+    "Finans", "Muhasebe", "İnsan Kaynakları", "Bilgi İşlem", "Satış", "Pazarlama",
+    "Üretim", "Lojistik", "Satın Alma", "Hukuk", "Kalite", "Ar-Ge",
+]
+MESLEKLER = ["Uzman", "Uzman Yardımcısı", "Mühendis", "Teknisyen", "Analist", "Operatör", "Memur"]
+
+# Bir departmanda ortalama kaç kişi olduğu; büyük ölçeklerde departmanlar numaralanır.
+DEPARTMAN_BOYUTU = 40
+
+# Taleplerin yayıldığı dönem.
+DONEM_BASI = date(2019, 1, 1)
+DONEM_SONU = date(2026, 12, 31)
+
+OLCEKLER = {
+    "kucuk": (100, 2_000),
+    "orta": (2_000, 40_000),
+    "buyuk": (10_000, 200_000),
+    "cok_buyuk": (50_000, 1_000_000),
+}
+
+SIFIRLANACAK_TABLOLAR = [
+    "bildirim_kutusu", "talepler", "personellers",
+    "izin_bakiyeleri", "talep_ozetleri", "personel_aylik_izin", "talepler_arsivi",
+]
+
+
+# ---------------------------------------------------
+# KIYASLAMA VERİTABANI
+# ---------------------------------------------------
+def kiyas_db_adi():
+    return os.getenv("KIYAS_DB_NAME", "izin_kiyaslama")
+
+
+def kiyas_baglantisi(dbname=None):
+    """DB_* ortam değişkenleriyle, yalnızca veritabanı adı farklı bir bağlantı açar."""
+    return psycopg2.connect(
+        dbname=dbname or kiyas_db_adi(),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT", "5432"),
+        sslmode=os.getenv("DB_SSLMODE", "require"),
+    )
+
+
+def veritabani_hazirla():
+    """Kıyaslama veritabanı yoksa oluşturur. Uygulamanın kendi veritabanına dokunmayı reddeder."""
+    ad = kiyas_db_adi()
+    if ad == os.getenv("DB_NAME"):
+        raise RuntimeError(
+            f"KIYAS_DB_NAME ({ad}) uygulama veritabanıyla aynı; kıyaslama tabloları boşaltır."
+        )
+
+    conn = kiyas_baglantisi(os.getenv("KIYAS_YONETIM_DB", "postgres"))
+    conn.autocommit = True
+    try:
+        with conn.cursor() as c:
+            c.execute("SELECT 1 FROM pg_database WHERE datname = %s", (ad,))
+            if c.fetchone() is None:
+                c.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(ad)))
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------
+# PERSONEL ÜRETİMİ
+# ---------------------------------------------------
+def _departman_adlari(sayi):
+    if sayi <= len(DEPARTMANLAR):
+        return DEPARTMANLAR[:sayi]
+    return [f"{DEPARTMANLAR[i % len(DEPARTMANLAR)]} {i // len(DEPARTMANLAR) + 1}" for i in range(sayi)]
+
+
+def personel_uret(sayi, rng):
+    """`sayi` kişilik personel tablosu.
+
+    İlk kişi İK'dır; her departmanın ilk kişisi Yönetici olup İK'ya, diğerleri
+    departman yöneticisine bağlıdır. Ad soyadlar gerçekteki gibi tekrar edebilir.
+    """
+    idx = np.arange(sayi)
+    dep_sayisi = max(1, -(-sayi // DEPARTMAN_BOYUTU))
+    dep_adlari = np.array(_departman_adlari(dep_sayisi), dtype=object)
+    dep_kodu = idx % dep_sayisi
+
+    sicil = np.char.add("K", np.char.zfill(idx.astype(str), 6))
+    email = np.char.add(np.char.lower(sicil), "@kiyas.local")
+
+    yonetici_mi = idx < dep_sayisi
+    rol = np.where(yonetici_mi, "Yönetici", "Personel").astype(object)
+    rol[0] = "İK"
+    onayci = email[dep_kodu].astype(object)
+    onayci[yonetici_mi] = email[0]
+    onayci[0] = None
+
+    giris_gun = rng.integers(0, (date(2025, 12, 31) - date(2000, 1, 1)).days, sayi)
+
+    return pd.DataFrame({
+        "sicil": sicil,
+        "ad_soyad": (np.array(ADLAR, dtype=object)[rng.integers(0, len(ADLAR), sayi)] + " "
+                     + np.array(SOYADLAR, dtype=object)[rng.integers(0, len(SOYADLAR), sayi)]),
+        "meslek": np.array(MESLEKLER, dtype=object)[rng.integers(0, len(MESLEKLER), sayi)],
+        "departman": dep_adlari[dep_kodu],
+        "email": email,
+        "onayci_email": onayci,
+        "rol": rol,
+        "cep_telefonu": np.char.add("05", rng.integers(300_000_000, 599_999_999, sayi).astype(str)),
+        "ise_giris": np.datetime64("2000-01-01") + giris_gun.astype("timedelta64[D]"),
+    })
+
+
+# ---------------------------------------------------
+# TALEP ÜRETİMİ
+# ---------------------------------------------------
+def talep_uret(personel, sayi, rng, takvim):
+    """Personele dağıtılmış, kişi başına çakışmayan `sayi` talep.
+
+    Her kişinin talepleri rastgele bir başlangıçtan itibaren (boşluk + süre)
+    adımlarıyla art arda dizilir; geçmiştekiler çoğunlukla sonuçlanmış, ileridekiler
+    çoğunlukla bekleyen durumdadır.
+    """
+    kisi = np.sort(rng.integers(0, len(personel), sayi))
+    sure = rng.choice([1, 1, 1, 2, 2, 3, 5, 5, 10, 14], sayi)
+    bosluk = rng.integers(3, 90, sayi)
+
+    adim = bosluk + sure
+    toplam = np.cumsum(adim)
+    grup_basi = np.r_[0, np.flatnonzero(np.diff(kisi)) + 1]
+    onceki = np.repeat(np.r_[0, toplam[grup_basi[1:] - 1]], np.diff(np.r_[grup_basi, sayi]))
+    kisi_ici = toplam - onceki
+
+    ilk = np.datetime64(DONEM_BASI)
+    kisi_basi = rng.integers(0, 3 * 365, len(personel))
+    baslangic = ilk + (kisi_basi[kisi] + kisi_ici - sure).astype("timedelta64[D]")
+    bitis = baslangic + (sure - 1).astype("timedelta64[D]")
+
+    bugun = np.datetime64(date.today())
+    gecmis = bitis < bugun
+    zar = rng.random(sayi)
+    durum = np.where(
+        gecmis,
+        np.where(zar < 0.88, "Onaylandı", np.where(zar < 0.97, "Reddedildi", "Beklemede")),
+        np.where(zar < 0.55, "Beklemede", np.where(zar < 0.95, "Onaylandı", "Reddedildi")),
+    ).astype(object)
+
+    p = personel.iloc[kisi].reset_index(drop=True)
+    onayci_adi = personel.set_index("email")["ad_soyad"]
+    onayli = durum == "Onaylandı"
+    onay_tarihi = pd.Series(baslangic - rng.integers(1, 20, sayi).astype("timedelta64[D]"))
+    tip = rng.choice(["Yıllık İzin"] * 6 + ["Mazeret İzni", "Raporlu İzin", "Ücretsiz İzin"], sayi)
+
+    df = pd.DataFrame({
+        "sicil": p["sicil"],
+        "ad_soyad": p["ad_soyad"],
+        "departman": p["departman"],
+        "meslek": p["meslek"],
+        "tip": tip,
+        "baslangic": baslangic,
+        "bitis": bitis,
+        "neden": "Kıyaslama verisi",
+        "durum": durum,
+        "onaylayan": p["onayci_email"].map(onayci_adi).where(onayli),
+        "onay_tarihi": onay_tarihi.where(onayli),
+    })
+    # Bekleyenler kural tanımlanmamış haldeki gibi tek adımlı zincirde, doğrudan onaycıdadır;
+    # onaycısı olmayanınki İK'dadır.
+    bekleyen = durum == "Beklemede"
+    df["bekleyen_onayci"] = p["onayci_email"].fillna(IK_ADIMI).where(bekleyen)
+    df["onay_zinciri"] = ("{" + df["bekleyen_onayci"] + "}").where(bekleyen)
+    df["onay_adimi"] = pd.Series(1, index=df.index, dtype="Int16").where(bekleyen)
+    df["gun_sayisi"] = takvim.is_gunu(df["baslangic"].to_numpy(), df["bitis"].to_numpy())
+    return df[df["bitis"] <= np.datetime64(DONEM_SONU)]
+
+
+# ---------------------------------------------------
+# YÜKLEME
+# ---------------------------------------------------
+def _copy(c, tablo, df, parca=100_000):
+    kolonlar = ", ".join(df.columns)
+    for i in range(0, len(df), parca):
+        tampon = StringIO()
+        df.iloc[i:i + parca].to_csv(tampon, index=False, header=False, date_format="%Y-%m-%d")
+        tampon.seek(0)
+        c.copy_expert(f"COPY {tablo} ({kolonlar}) FROM STDIN WITH (FORMAT csv)", tampon)
+
+
+def veri_yukle(havuz, personel_sayisi, talep_sayisi, tohum=42, ilerleme=print):
+    """Tabloları boşaltıp aynı tohumla her seferinde aynı veriyi üretir ve yükler.
+
+    Talepler tetikleyicileri (çakışma, bakiye, özet) açıkken yüklenir; böylece
+    türetilmiş tablolar da uygulamadaki haliyle oluşur.
+    """
+    rng = np.random.default_rng(tohum)
+
+    with havuz.imlec() as c:
+        c.execute(f"TRUNCATE {', '.join(SIFIRLANACAK_TABLOLAR)} RESTART IDENTITY")
+        takvim = takvim_yukle(c)
+    # Arşiv kaydı da boşaltıldığı için dönemin her yılına bölüm açılır.
+    bolumleri_hazirla(havuz, DONEM_BASI.year, DONEM_SONU.year)
+
+    personel = personel_uret(personel_sayisi, rng)
+    talepler = talep_uret(personel, talep_sayisi, rng, takvim)
+
+    ilerleme(f"{len(personel)} personel yükleniyor")
+    with havuz.imlec() as c:
+        _copy(c, "personellers", personel.assign(sifre=sifre_hashle(KIYAS_SIFRESI)))
+
+    ilerleme(f"{len(talepler)} talep yükleniyor")
+    with havuz.imlec() as c:
+        _copy(c, "talepler", talepler)
+
+    with havuz.baglanti() as conn:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as c:
+                c.execute("VACUUM ANALYZE personellers")
+                c.execute("VACUUM ANALYZE talepler")
+        finally:
+            conn.autocommit = False
+
+    return len(personel), len(talepler)
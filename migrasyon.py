@@ -0,0 +1,870 @@
+import logging
+
+import psycopg2.extras
+
+from onay_akisi import IK_ADIMI
+
+log = logging.getLogger(__name__)
+
+# Aynı anda açılan birden fazla süreç migrasyonları iki kez çalıştırmasın diye
+# kullanılan PostgreSQL advisory lock anahtarı.
+MIGRASYON_KILIDI = 72_410_001
+
+# ---------------------------------------------------
+# MİGRASYON YARDIMCILARI
+# ---------------------------------------------------
+# Reddedilmemiş, tarihleri ve sicili dolu iki talep aynı personel için çakışamaz.
+CAKISMA_KOSULU = "durum IS DISTINCT FROM 'Reddedildi' AND donem IS NOT NULL AND sicil IS NOT NULL"
+
+
+def _personel_sicillerini_denetle(conn):
+    # Birincil anahtar eklenmeden önce: boş ya da tekrar eden sicil hangi kayıtlarda, açıkça söylenir.
+    with conn.cursor() as c:
+        c.execute("""
+            SELECT COALESCE(sicil, '(boş)'), string_agg(COALESCE(ad_soyad, '?') || ' <' || COALESCE(email, '-') || '>', ', ')
+            FROM personellers
+            GROUP BY sicil
+            HAVING sicil IS NULL OR count(*) > 1
+            ORDER BY sicil NULLS FIRST
+            LIMIT 50
+        """)
+        sorunlar = c.fetchall()
+    if sorunlar:
+        raise RuntimeError(
+            "Sicili boş ya da birden fazla personelde aynı olan kayıtlar var, migrasyondan önce düzeltilmeli: "
+            + "; ".join(f"{sicil}: {kayitlar}" for sicil, kayitlar in sorunlar)
+        )
+
+
+def _talep_sahiplerini_denetle(conn):
+    # Sicili olmayan talepler ad soyadla eşlenir; adaşlar varsa talep kime ait bilinemez.
+    with conn.cursor() as c:
+        c.execute("""
+            SELECT t.id, t.ad_soyad, string_agg(p.sicil, ', ' ORDER BY p.sicil)
+            FROM talepler t
+            JOIN personellers p ON p.ad_soyad = t.ad_soyad
+            WHERE t.sicil IS NULL
+            GROUP BY t.id, t.ad_soyad
+            HAVING count(*) > 1
+            ORDER BY t.id
+            LIMIT 50
+        """)
+        belirsizler = c.fetchall()
+    if belirsizler:
+        raise RuntimeError(
+            "Sahibi ad soyaddan belirlenemeyen (adaş) talepler var; migrasyondan önce talepler.sicil "
+            "kolonu eklenip (ALTER TABLE talepler ADD COLUMN sicil TEXT) bu taleplere doğru sicil girilmeli: "
+            + ", ".join(f"#{i} {ad} ({siciller})" for i, ad, siciller in belirsizler)
+        )
+
+
+def _cakismalari_denetle(conn):
+    # Kısıt mevcut çakışmalar varken eklenemez; hangi kayıtların düzeltileceği açıkça söylenir.
+    with conn.cursor() as c:
+        c.execute("""
+            SELECT a.id, b.id
+            FROM talepler a
+            JOIN talepler b ON b.sicil = a.sicil AND b.id > a.id AND b.donem && a.donem
+            WHERE a.durum IS DISTINCT FROM 'Reddedildi'
+              AND b.durum IS DISTINCT FROM 'Reddedildi'
+            ORDER BY a.id, b.id
+            LIMIT 50
+        """)
+        ciftler = c.fetchall()
+    if ciftler:
+        raise RuntimeError(
+            "Çakışan izin talepleri var, migrasyondan önce düzeltilmeli: "
+            + ", ".join(f"#{a} / #{b}" for a, b in ciftler)
+        )
+
+
+def _cakisma_kisiti_ekle(conn):
+    # Tercih edilen yol btree_gist ile (sicil =, donem &&) exclusion kısıtıdır.
+    # Uzantı kurulamıyorsa aynı kural, sicil başına advisory lock alan bir tetikleyici
+    # ve donem üzerindeki GiST indeksiyle uygulanır; iki yol da 23P01 hatası verir.
+    with conn.cursor() as c:
+        c.execute("SAVEPOINT btree_gist")
+        try:
+            c.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+            c.execute(f"""
+                ALTER TABLE talepler ADD CONSTRAINT talepler_donem_cakisma
+                    EXCLUDE USING gist (sicil WITH =, donem WITH &&)
+                    WHERE ({CAKISMA_KOSULU})
+            """)
+            c.execute("RELEASE SAVEPOINT btree_gist")
+            return
+        except Exception as e:
+            c.execute("ROLLBACK TO SAVEPOINT btree_gist")
+            log.warning("btree_gist kullanılamadı, çakışma tetikleyicisine geçiliyor: %s", e)
+
+        c.execute(f"CREATE INDEX IF NOT EXISTS talepler_donem_idx ON talepler USING gist (donem) WHERE {CAKISMA_KOSULU}")
+        c.execute("""
+            CREATE OR REPLACE FUNCTION talepler_cakisma_denetle() RETURNS trigger AS $$
+            DECLARE
+                yeni_donem daterange;
+                cakisan INTEGER;
+            BEGIN
+                -- Üretilen kolonlar BEFORE tetikleyicisinde henüz hesaplanmamıştır.
+                IF NEW.baslangic IS NULL OR NEW.bitis IS NULL OR NEW.sicil IS NULL
+                   OR NEW.baslangic > NEW.bitis OR NEW.durum IS NOT DISTINCT FROM 'Reddedildi' THEN
+                    RETURN NEW;
+                END IF;
+                yeni_donem := daterange(NEW.baslangic, NEW.bitis, '[]');
+
+                PERFORM pg_advisory_xact_lock(hashtext('talepler_cakisma'), hashtext(NEW.sicil));
+                SELECT id INTO cakisan
+                FROM talepler
+                WHERE donem && yeni_donem
+                  AND sicil = NEW.sicil
+                  AND durum IS DISTINCT FROM 'Reddedildi'
+                  AND id <> NEW.id
+                LIMIT 1;
+
+                IF cakisan IS NOT NULL THEN
+                    RAISE EXCEPTION 'talep % ile çakışıyor', cakisan
+                        USING ERRCODE = 'exclusion_violation', CONSTRAINT = 'talepler_donem_cakisma';
+                END IF;
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        c.execute("""
+            CREATE TRIGGER talepler_cakisma_denetle
+                BEFORE INSERT OR UPDATE OF sicil, baslangic, bitis, durum ON talepler
+                FOR EACH ROW EXECUTE FUNCTION talepler_cakisma_denetle()
+        """)
+
+
+def _trigram_indeksleri_ekle(conn):
+    # pg_trgm yalnızca adda yazım hatası toleransı içindir; kurulamıyorsa arama tam metin
+    # ön ek eşleşmesiyle çalışmaya devam eder (arama.trigram_var).
+    with conn.cursor() as c:
+        c.execute("SAVEPOINT pg_trgm")
+        try:
+            c.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            c.execute("CREATE INDEX personellers_ad_trgm_idx ON personellers USING gin (arama_metni(ad_soyad) gin_trgm_ops)")
+            c.execute("CREATE INDEX talepler_ad_trgm_idx ON talepler USING gin (arama_metni(ad_soyad) gin_trgm_ops)")
+            c.execute("RELEASE SAVEPOINT pg_trgm")
+        except Exception as e:
+            c.execute("ROLLBACK TO SAVEPOINT pg_trgm")
+            log.warning("pg_trgm kullanılamadı, bulanık ad araması kapalı: %s", e)
+
+
+def _talepleri_bolumle(conn):
+    # Büyük tablonun partili kopyası açılışta değil arsiv.py bolumle ile yapılır; burada yalnızca
+    # yer değiştirilir (küçük tablo aynı işlemde kopyalanır). Ayrıntılar arsiv.bolumlemeyi_bitir'de.
+    from arsiv import bolumlemeyi_bitir
+    bolumlemeyi_bitir(conn)
+
+
+def _takvim_ve_gun_sayilari(conn):
+    # Bilinen yılların resmi tatilleri eklenir, mevcut taleplerin iş günü sayısı bir kez hesaplanır.
+    from bakiye import DINI_BAYRAMLAR, takvim_yukle, varsayilan_tatiller
+
+    with conn.cursor() as c:
+        for yil in sorted(DINI_BAYRAMLAR):
+            psycopg2.extras.execute_values(
+                c,
+                "INSERT INTO tatil_gunleri (tarih, ad, yarim_gun) VALUES %s ON CONFLICT (tarih) DO NOTHING",
+                varsayilan_tatiller(yil)
+            )
+
+        c.execute("SELECT id, baslangic, bitis FROM talepler WHERE donem IS NOT NULL")
+        satirlar = c.fetchall()
+        if satirlar:
+            idler, baslar, bitisler = zip(*satirlar)
+            gunler = takvim_yukle(c).is_gunu(list(baslar), list(bitisler))
+            psycopg2.extras.execute_values(
+                c,
+                "UPDATE talepler t SET gun_sayisi = v.gun FROM (VALUES %s) AS v(id, gun) WHERE t.id = v.id",
+                list(zip(idler, gunler.tolist())),
+                page_size=1000
+            )
+
+
+# ---------------------------------------------------
+# MİGRASYON LİSTESİ
+# ---------------------------------------------------
+# Her kayıt (sürüm, açıklama, adımlar). Adımlar sırayla aynı işlem içinde
+# çalışır; bir adım SQL metni ya da bağlantı alan bir fonksiyon olabilir.
+# Uygulanmış bir migrasyon asla değiştirilmez, yeni değişiklik yeni sürümle eklenir.
+MIGRASYONLAR = [
+    (1, "ilk tablolar", [
+        """
+        CREATE TABLE IF NOT EXISTS personellers (
+            sicil TEXT,
+            ad_soyad TEXT,
+            sifre TEXT,
+            meslek TEXT,
+            departman TEXT,
+            email TEXT,
+            onayci_email TEXT,
+            rol TEXT,
+            cep_telefonu TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS talepler (
+            id SERIAL PRIMARY KEY,
+            ad_soyad TEXT,
+            departman TEXT,
+            meslek TEXT,
+            tip TEXT,
+            baslangic TEXT,
+            bitis TEXT,
+            neden TEXT,
+            durum TEXT,
+            onay_notu TEXT
+        )
+        """,
+    ]),
+
+    (2, "tarih tipleri, sicil birincil anahtarı, talepler -> personellers yabancı anahtarı", [
+        # Boş ya da tekrar eden sicil kendiliğinden düzeltilmez; migrasyon kayıtları listeleyip durur.
+        "UPDATE personellers SET sicil = NULLIF(btrim(sicil), '')",
+        _personel_sicillerini_denetle,
+        "ALTER TABLE personellers ALTER COLUMN sicil SET NOT NULL, ADD PRIMARY KEY (sicil)",
+
+        # Mevcut 'YYYY-MM-DD' metinleri yerinde DATE'e çevrilir.
+        """
+        ALTER TABLE talepler
+            ALTER COLUMN baslangic TYPE DATE USING NULLIF(btrim(baslangic), '')::date,
+            ALTER COLUMN bitis TYPE DATE USING NULLIF(btrim(bitis), '')::date,
+            ALTER COLUMN durum SET DEFAULT 'Beklemede'
+        """,
+
+        "ALTER TABLE talepler ADD COLUMN IF NOT EXISTS sicil TEXT",
+        _talep_sahiplerini_denetle,
+        """
+        UPDATE talepler t
+        SET sicil = p.sicil
+        FROM personellers p
+        WHERE t.sicil IS NULL AND p.ad_soyad = t.ad_soyad
+        """,
+        """
+        ALTER TABLE talepler
+            ADD CONSTRAINT talepler_sicil_fkey FOREIGN KEY (sicil)
+            REFERENCES personellers (sicil) ON UPDATE CASCADE ON DELETE SET NULL
+        """,
+    ]),
+
+    (3, "sık kullanılan sorgular için indeksler", [
+        "CREATE INDEX IF NOT EXISTS personellers_ad_soyad_idx ON personellers (ad_soyad)",
+        "CREATE INDEX IF NOT EXISTS personellers_onayci_email_idx ON personellers (onayci_email)",
+        "CREATE INDEX IF NOT EXISTS talepler_ad_soyad_idx ON talepler (ad_soyad, id DESC)",
+        "CREATE INDEX IF NOT EXISTS talepler_sicil_idx ON talepler (sicil, baslangic)",
+        "CREATE INDEX IF NOT EXISTS talepler_durum_idx ON talepler (durum)",
+    ]),
+
+    (4, "bildirim kutusu (outbox)", [
+        """
+        CREATE TABLE IF NOT EXISTS bildirim_kutusu (
+            id BIGSERIAL PRIMARY KEY,
+            alici TEXT NOT NULL,
+            konu TEXT NOT NULL,
+            icerik TEXT NOT NULL,
+            durum TEXT NOT NULL DEFAULT 'bekliyor'
+                CHECK (durum IN ('bekliyor', 'gonderildi', 'olu')),
+            deneme INTEGER NOT NULL DEFAULT 0,
+            sonraki_deneme TIMESTAMPTZ NOT NULL DEFAULT now(),
+            son_hata TEXT,
+            olusturuldu TIMESTAMPTZ NOT NULL DEFAULT now(),
+            gonderildi TIMESTAMPTZ
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS bildirim_kutusu_bekleyen_idx
+            ON bildirim_kutusu (sonraki_deneme) WHERE durum = 'bekliyor'
+        """,
+    ]),
+
+    (5, "yapısal onay bilgisi ve son değişiklik zamanı", [
+        """
+        ALTER TABLE talepler
+            ADD COLUMN IF NOT EXISTS onaylayan TEXT,
+            ADD COLUMN IF NOT EXISTS onay_tarihi DATE,
+            ADD COLUMN IF NOT EXISTS guncellendi TIMESTAMPTZ NOT NULL DEFAULT now()
+        """,
+        # Eski kayıtlar: "<Ad Soyad (Meslek)> tarafından <YYYY-MM-DD> tarihinde onaylandı."
+        r"""
+        UPDATE talepler
+        SET onaylayan = substring(onay_notu from '^(.*) tarafından '),
+            onay_tarihi = substring(onay_notu from 'tarafından (\d{4}-\d{2}-\d{2})')::date
+        WHERE durum = 'Onaylandı' AND onay_notu IS NOT NULL AND onaylayan IS NULL
+        """,
+        """
+        CREATE OR REPLACE FUNCTION talepler_guncellendi() RETURNS trigger AS $$
+        BEGIN
+            NEW.guncellendi := now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER talepler_guncellendi
+            BEFORE UPDATE ON talepler
+            FOR EACH ROW EXECUTE FUNCTION talepler_guncellendi()
+        """,
+    ]),
+
+    (6, "İK talep listesi için sıralama ve filtre indeksleri", [
+        # talepler.SIRALAMALAR ifadeleriyle aynı olmalı.
+        "CREATE INDEX IF NOT EXISTS talepler_sira_baslangic_idx ON talepler ((COALESCE(baslangic, DATE '9999-12-31')), id)",
+        "CREATE INDEX IF NOT EXISTS talepler_sira_ad_idx ON talepler ((COALESCE(ad_soyad, '')), id)",
+        "CREATE INDEX IF NOT EXISTS talepler_ad_desen_idx ON talepler (ad_soyad text_pattern_ops)",
+        "CREATE INDEX IF NOT EXISTS talepler_departman_idx ON talepler (departman)",
+    ]),
+
+    (7, "onay kuyruğu için bekleyen talepler indeksi", [
+        # personellers(onayci_email) -> sicil listesi, buradan bekleyen talepler id sırasıyla okunur.
+        "CREATE INDEX IF NOT EXISTS talepler_bekleyen_sicil_idx ON talepler (sicil, id) WHERE durum = 'Beklemede'",
+    ]),
+
+    (8, "tarih aralığı kolonu ve personel başına çakışma kısıtı", [
+        """
+        ALTER TABLE talepler ADD COLUMN donem daterange
+            GENERATED ALWAYS AS (
+                CASE WHEN baslangic <= bitis THEN daterange(baslangic, bitis, '[]') END
+            ) STORED
+        """,
+        _cakismalari_denetle,
+        _cakisma_kisiti_ekle,
+    ]),
+
+    (9, "iş günü takvimi, izin hakları ve artımlı bakiye tablosu", [
+        """
+        CREATE TABLE tatil_gunleri (
+            tarih DATE PRIMARY KEY,
+            ad TEXT NOT NULL,
+            yarim_gun BOOLEAN NOT NULL DEFAULT FALSE
+        )
+        """,
+        """
+        CREATE TABLE izin_hak_kurallari (
+            tip TEXT NOT NULL,
+            kidem_yil INTEGER NOT NULL,
+            gun NUMERIC(5,1) NOT NULL,
+            PRIMARY KEY (tip, kidem_yil)
+        )
+        """,
+        # İş Kanunu m.53: 1-5 yıl 14, 5-15 yıl 20, 15 yıl ve üzeri 26 gün.
+        "INSERT INTO izin_hak_kurallari VALUES ('Yıllık İzin', 1, 14), ('Yıllık İzin', 5, 20), ('Yıllık İzin', 15, 26)",
+        "ALTER TABLE personellers ADD COLUMN ise_giris DATE",
+        "ALTER TABLE talepler ADD COLUMN gun_sayisi NUMERIC(6,1)",
+        _takvim_ve_gun_sayilari,
+
+        # Talebin günleri başlangıç yılına yazılır. Yabancı anahtar yoktur: personel silinince
+        # talepler.sicil NULL'a çekilir ve tetikleyici o personelin bakiyesini kendisi sıfırlar.
+        """
+        CREATE TABLE izin_bakiyeleri (
+            sicil TEXT NOT NULL,
+            yil INTEGER NOT NULL,
+            tip TEXT NOT NULL,
+            kullanilan NUMERIC(8,1) NOT NULL DEFAULT 0,
+            bekleyen NUMERIC(8,1) NOT NULL DEFAULT 0,
+            PRIMARY KEY (sicil, yil, tip)
+        )
+        """,
+        """
+        INSERT INTO izin_bakiyeleri (sicil, yil, tip, kullanilan, bekleyen)
+        SELECT sicil, extract(year FROM baslangic)::int, tip,
+               COALESCE(sum(gun_sayisi) FILTER (WHERE durum = 'Onaylandı'), 0),
+               COALESCE(sum(gun_sayisi) FILTER (WHERE durum = 'Beklemede'), 0)
+        FROM talepler
+        WHERE sicil IS NOT NULL AND baslangic IS NOT NULL AND tip IS NOT NULL AND gun_sayisi IS NOT NULL
+        GROUP BY 1, 2, 3
+        """,
+        """
+        CREATE FUNCTION izin_bakiyesi_uygula(p_sicil TEXT, p_tarih DATE, p_tip TEXT,
+                                             p_durum TEXT, p_gun NUMERIC, p_isaret INTEGER)
+        RETURNS void AS $$
+        BEGIN
+            IF p_sicil IS NULL OR p_tarih IS NULL OR p_tip IS NULL OR p_gun IS NULL
+               OR p_durum IS NULL OR p_durum NOT IN ('Onaylandı', 'Beklemede') THEN
+                RETURN;
+            END IF;
+            INSERT INTO izin_bakiyeleri AS b (sicil, yil, tip, kullanilan, bekleyen)
+            VALUES (
+                p_sicil, extract(year FROM p_tarih)::int, p_tip,
+                CASE WHEN p_durum = 'Onaylandı' THEN p_isaret * p_gun ELSE 0 END,
+                CASE WHEN p_durum = 'Beklemede' THEN p_isaret * p_gun ELSE 0 END
+            )
+            ON CONFLICT (sicil, yil, tip) DO UPDATE SET
+                kullanilan = b.kullanilan + EXCLUDED.kullanilan,
+                bekleyen = b.bekleyen + EXCLUDED.bekleyen;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE FUNCTION talepler_bakiye() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM izin_bakiyesi_uygula(OLD.sicil, OLD.baslangic, OLD.tip, OLD.durum, OLD.gun_sayisi, -1);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM izin_bakiyesi_uygula(NEW.sicil, NEW.baslangic, NEW.tip, NEW.durum, NEW.gun_sayisi, 1);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER talepler_bakiye
+            AFTER INSERT OR DELETE OR UPDATE OF sicil, baslangic, tip, durum, gun_sayisi ON talepler
+            FOR EACH ROW EXECUTE FUNCTION talepler_bakiye()
+        """,
+    ]),
+
+    (10, "İK analitik özet tabloları ve karar zamanı", [
+        "ALTER TABLE talepler ADD COLUMN olusturuldu TIMESTAMPTZ",
+        "ALTER TABLE talepler ALTER COLUMN olusturuldu SET DEFAULT now()",
+        "ALTER TABLE talepler ADD COLUMN karar_zamani TIMESTAMPTZ",
+        # Eski onaylarda yalnızca gün bilinir; süre hesabına girmesinler diye olusturuldu boş kalır.
+        "UPDATE talepler SET karar_zamani = onay_tarihi::timestamptz WHERE onay_tarihi IS NOT NULL",
+        """
+        CREATE FUNCTION talepler_karar_zamani() RETURNS trigger AS $$
+        BEGIN
+            IF OLD.durum IS DISTINCT FROM NEW.durum THEN
+                NEW.karar_zamani := CASE WHEN NEW.durum = 'Beklemede' THEN NULL ELSE now() END;
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER talepler_karar_zamani
+            BEFORE UPDATE OF durum ON talepler
+            FOR EACH ROW EXECUTE FUNCTION talepler_karar_zamani()
+        """,
+
+        # Talep başlangıç ayına yazılır. Boş departman/tip/durum birincil anahtar için '' olur.
+        """
+        CREATE TABLE talep_ozetleri (
+            ay DATE NOT NULL,
+            departman TEXT NOT NULL,
+            tip TEXT NOT NULL,
+            durum TEXT NOT NULL,
+            talep_sayisi INTEGER NOT NULL DEFAULT 0,
+            gun_toplami NUMERIC(10,1) NOT NULL DEFAULT 0,
+            karar_sayisi INTEGER NOT NULL DEFAULT 0,
+            karar_suresi_saat NUMERIC(14,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (ay, departman, tip, durum)
+        )
+        """,
+        """
+        CREATE TABLE personel_aylik_izin (
+            ay DATE NOT NULL,
+            sicil TEXT NOT NULL,
+            departman TEXT NOT NULL,
+            gun NUMERIC(8,1) NOT NULL DEFAULT 0,
+            talep_sayisi INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ay, sicil, departman)
+        )
+        """,
+        """
+        INSERT INTO talep_ozetleri
+        SELECT date_trunc('month', baslangic)::date, COALESCE(departman, ''), COALESCE(tip, ''), COALESCE(durum, ''),
+               count(*),
+               COALESCE(sum(gun_sayisi), 0),
+               count(*) FILTER (WHERE karar_zamani IS NOT NULL AND olusturuldu IS NOT NULL),
+               COALESCE(sum(extract(epoch FROM karar_zamani - olusturuldu) / 3600), 0)
+        FROM talepler
+        WHERE baslangic IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        """,
+        """
+        INSERT INTO personel_aylik_izin
+        SELECT date_trunc('month', baslangic)::date, sicil, COALESCE(departman, ''),
+               COALESCE(sum(gun_sayisi), 0), count(*)
+        FROM talepler
+        WHERE baslangic IS NOT NULL AND sicil IS NOT NULL AND durum = 'Onaylandı'
+        GROUP BY 1, 2, 3
+        """,
+        """
+        CREATE FUNCTION talep_ozeti_uygula(t talepler, p_isaret INTEGER) RETURNS void AS $$
+        DECLARE
+            v_ay DATE := date_trunc('month', t.baslangic)::date;
+            v_karar BOOLEAN := t.karar_zamani IS NOT NULL AND t.olusturuldu IS NOT NULL;
+        BEGIN
+            IF t.baslangic IS NULL THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO talep_ozetleri AS o
+            VALUES (
+                v_ay, COALESCE(t.departman, ''), COALESCE(t.tip, ''), COALESCE(t.durum, ''),
+                p_isaret,
+                p_isaret * COALESCE(t.gun_sayisi, 0),
+                CASE WHEN v_karar THEN p_isaret ELSE 0 END,
+                CASE WHEN v_karar THEN p_isaret * extract(epoch FROM t.karar_zamani - t.olusturuldu) / 3600 ELSE 0 END
+            )
+            ON CONFLICT (ay, departman, tip, durum) DO UPDATE SET
+                talep_sayisi = o.talep_sayisi + EXCLUDED.talep_sayisi,
+                gun_toplami = o.gun_toplami + EXCLUDED.gun_toplami,
+                karar_sayisi = o.karar_sayisi + EXCLUDED.karar_sayisi,
+                karar_suresi_saat = o.karar_suresi_saat + EXCLUDED.karar_suresi_saat;
+
+            IF t.sicil IS NOT NULL AND t.durum = 'Onaylandı' THEN
+                INSERT INTO personel_aylik_izin AS k
+                VALUES (v_ay, t.sicil, COALESCE(t.departman, ''), p_isaret * COALESCE(t.gun_sayisi, 0), p_isaret)
+                ON CONFLICT (ay, sicil, departman) DO UPDATE SET
+                    gun = k.gun + EXCLUDED.gun,
+                    talep_sayisi = k.talep_sayisi + EXCLUDED.talep_sayisi;
+            END IF;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE FUNCTION talepler_ozet() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM talep_ozeti_uygula(OLD, -1);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM talep_ozeti_uygula(NEW, 1);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER talepler_ozet
+            AFTER INSERT OR DELETE OR UPDATE OF sicil, departman, tip, baslangic, durum, gun_sayisi ON talepler
+            FOR EACH ROW EXECUTE FUNCTION talepler_ozet()
+        """,
+        "CREATE INDEX personel_aylik_izin_ay_idx ON personel_aylik_izin (ay, departman)",
+    ]),
+
+    # Kanal adı degisiklik.KANAL ile aynı olmalı. Olaylar deyim başına bir kez, commit anında gider.
+    (11, "değişiklik akışı (LISTEN/NOTIFY)", [
+        """
+        CREATE FUNCTION talep_degisiklik_yuku(p_siciller TEXT[], p_departmanlar TEXT[]) RETURNS text AS $$
+        DECLARE
+            yuk TEXT;
+        BEGIN
+            IF p_siciller IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            SELECT json_build_object(
+                'tablo', 'talepler',
+                'sicil', (SELECT json_agg(DISTINCT s) FROM unnest(p_siciller) s WHERE s IS NOT NULL),
+                'departman', (SELECT json_agg(DISTINCT d) FROM unnest(p_departmanlar) d WHERE d IS NOT NULL),
+                'onayci', (SELECT json_agg(DISTINCT p.onayci_email) FROM personellers p
+                           WHERE p.sicil = ANY(p_siciller) AND p.onayci_email IS NOT NULL)
+            )::text INTO yuk;
+
+            -- NOTIFY yükü 8000 baytla sınırlı; büyük toplu değişiklik tablo geneli olay olur.
+            IF octet_length(yuk) > 7900 THEN
+                yuk := '{"tablo": "talepler", "hepsi": true}';
+            END IF;
+            RETURN yuk;
+        END
+        $$ LANGUAGE plpgsql STABLE
+        """,
+        # plpgsql deyimleri ilk çalıştıklarında planlanır; her dal yalnızca kendi
+        # tetikleyicisinde tanımlı geçiş tablosuna dokunur.
+        """
+        CREATE FUNCTION talepler_degisiklik_bildir() RETURNS trigger AS $$
+        DECLARE
+            yuk TEXT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT talep_degisiklik_yuku(array_agg(sicil), array_agg(departman)) INTO yuk FROM yeni;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT talep_degisiklik_yuku(array_agg(sicil), array_agg(departman)) INTO yuk FROM eski;
+            ELSE
+                SELECT talep_degisiklik_yuku(array_agg(sicil), array_agg(departman)) INTO yuk
+                FROM (SELECT sicil, departman FROM eski UNION ALL SELECT sicil, departman FROM yeni) x;
+            END IF;
+
+            IF yuk IS NOT NULL THEN
+                PERFORM pg_notify('izin_degisiklik', yuk);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE FUNCTION tablo_degisiklik_bildir() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('izin_degisiklik', json_build_object('tablo', TG_TABLE_NAME, 'hepsi', true)::text);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER talepler_degisiklik_ekle
+            AFTER INSERT ON talepler REFERENCING NEW TABLE AS yeni
+            FOR EACH STATEMENT EXECUTE FUNCTION talepler_degisiklik_bildir()
+        """,
+        """
+        CREATE TRIGGER talepler_degisiklik_guncelle
+            AFTER UPDATE ON talepler REFERENCING OLD TABLE AS eski NEW TABLE AS yeni
+            FOR EACH STATEMENT EXECUTE FUNCTION talepler_degisiklik_bildir()
+        """,
+        """
+        CREATE TRIGGER talepler_degisiklik_sil
+            AFTER DELETE ON talepler REFERENCING OLD TABLE AS eski
+            FOR EACH STATEMENT EXECUTE FUNCTION talepler_degisiklik_bildir()
+        """,
+        """
+        CREATE TRIGGER talepler_degisiklik_bosalt
+            AFTER TRUNCATE ON talepler
+            FOR EACH STATEMENT EXECUTE FUNCTION tablo_degisiklik_bildir()
+        """,
+        # Personel rehberi ve iş günü takvimi tablonun tamamını önbelleğe alır; tablo geneli olay yeterli.
+        """
+        CREATE TRIGGER personellers_degisiklik
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON personellers
+            FOR EACH STATEMENT EXECUTE FUNCTION tablo_degisiklik_bildir()
+        """,
+        """
+        CREATE TRIGGER tatil_gunleri_degisiklik
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tatil_gunleri
+            FOR EACH STATEMENT EXECUTE FUNCTION tablo_degisiklik_bildir()
+        """,
+    ]),
+
+    # Kaydı olmayan alıcı için politika 'anlik'tır.
+    (12, "bildirim tercihleri ve özet gönderimi", [
+        """
+        CREATE TABLE bildirim_tercihleri (
+            alici TEXT PRIMARY KEY,
+            politika TEXT NOT NULL DEFAULT 'anlik'
+                CHECK (politika IN ('anlik', 'saatlik', 'gunluk')),
+            guncellendi TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """,
+        # Tek e-postayla giden bildirimler, o e-postadaki ilk kaydın id'sini taşır.
+        "ALTER TABLE bildirim_kutusu ADD COLUMN ozet_grubu BIGINT",
+        """
+        CREATE INDEX bildirim_kutusu_alici_bekleyen_idx
+            ON bildirim_kutusu (alici, olusturuldu) WHERE durum = 'bekliyor'
+        """,
+        "CREATE INDEX bildirim_kutusu_olusturuldu_idx ON bildirim_kutusu (olusturuldu)",
+    ]),
+
+    # Her UPDATE surum'u artırır; talepler.talep_guncelle/talep_sil okunan sürümle koşullanır.
+    (13, "talep sürümü (iyimser eşzamanlılık) ve kişisel geçmiş indeksi", [
+        "ALTER TABLE talepler ADD COLUMN surum INTEGER NOT NULL DEFAULT 1",
+        """
+        CREATE OR REPLACE FUNCTION talepler_guncellendi() RETURNS trigger AS $$
+        BEGIN
+            NEW.guncellendi := now();
+            NEW.surum := OLD.surum + 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        # talepler.kendi_talepleri sıralamasıyla aynı olmalı; geriye doğru taranır.
+        """
+        CREATE INDEX talepler_kendi_gecmis_idx
+            ON talepler (sicil, (COALESCE(baslangic, DATE '9999-12-31')), id)
+        """,
+    ]),
+
+    # talepler başlangıç yılına göre bölümlenir; kapanmış yıllar arsiv.py ile Parquet'e taşınır.
+    (14, "talepler yıllık bölümleme (çevrimiçi) ve arşiv kaydı", [
+        """
+        CREATE TABLE IF NOT EXISTS talepler_arsivi (
+            yil INTEGER PRIMARY KEY,
+            dosya TEXT NOT NULL,
+            satir INTEGER NOT NULL,
+            bayt BIGINT NOT NULL,
+            arsivlendi TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """,
+        _talepleri_bolumle,
+    ]),
+
+    # İK araması (arama.py). unaccent Türkçe İ/ı'yı tutarlı katlamadığından katlama translate ile yapılır.
+    (15, "İK araması: Türkçe katlama, tam metin ve trigram indeksleri", [
+        """
+        CREATE OR REPLACE FUNCTION arama_metni(metin TEXT) RETURNS TEXT AS $$
+            SELECT lower(translate(metin, 'ÇĞİIÖŞÜÂÎÛçğıöşüâîû', 'cgiiosuaiucgiosuaiu'))
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        """,
+        # Alanlar tek metinde katlanır; satır başına hesaplaması yine de pahalıdır. COST, planlayıcının
+        # seyrek eşleşmede süzgeçli tarama yerine GIN indeksini seçmesi içindir.
+        """
+        CREATE OR REPLACE FUNCTION arama_vektoru(VARIADIC alanlar TEXT[]) RETURNS tsvector AS $$
+            SELECT to_tsvector('simple', arama_metni(array_to_string(alanlar, ' ')))
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE COST 5000
+        """,
+        # Her kelime ön ek olarak aranır: "meh yıl" -> 'meh':* & 'yil':*
+        """
+        CREATE OR REPLACE FUNCTION arama_sorgusu(metin TEXT) RETURNS tsquery AS $$
+            SELECT to_tsquery('simple', string_agg(quote_literal(lexeme) || ':*', ' & '))
+            FROM unnest(to_tsvector('simple', arama_metni(metin)))
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        """,
+        """
+        CREATE INDEX personellers_arama_idx
+            ON personellers USING gin (arama_vektoru(ad_soyad, sicil, departman, email))
+        """,
+        """
+        CREATE INDEX talepler_arama_idx
+            ON talepler USING gin (arama_vektoru(ad_soyad, sicil, departman, neden))
+        """,
+        _trigram_indeksleri_ekle,
+    ]),
+
+    # Zincir talep oluşturulurken kurulur (onay_akisi.py); sırası gelen onaycı bekleyen_onayci'dadır.
+    # talepler bölümlü olduğundan (birincil anahtar id, baslangic) durum ayrı bir tabloda değil talepte tutulur.
+    (16, "çok aşamalı onay: kurallar ve talep başına onay adımı", [
+        """
+        CREATE TABLE onay_kurallari (
+            id SERIAL PRIMARY KEY,
+            tip TEXT,
+            en_az_gun NUMERIC NOT NULL DEFAULT 0 CHECK (en_az_gun >= 0),
+            seviye SMALLINT NOT NULL DEFAULT 1 CHECK (seviye BETWEEN 1 AND 10),
+            ik_onayi BOOLEAN NOT NULL DEFAULT false
+        )
+        """,
+        # tip NULL: tüm türler için geçerli kural.
+        "CREATE UNIQUE INDEX onay_kurallari_tip_esik_idx ON onay_kurallari ((COALESCE(tip, '')), en_az_gun)",
+        "ALTER TABLE talepler ADD COLUMN onay_zinciri TEXT[]",
+        "ALTER TABLE talepler ADD COLUMN onay_adimi SMALLINT",
+        "ALTER TABLE talepler ADD COLUMN bekleyen_onayci TEXT",
+        # Bekleyen talepler tek adımlı zincirle devam eder.
+        """
+        UPDATE talepler t
+        SET onay_zinciri = ARRAY[p.onayci_email], onay_adimi = 1, bekleyen_onayci = p.onayci_email
+        FROM personellers p
+        WHERE p.sicil = t.sicil AND t.durum = 'Beklemede' AND p.onayci_email IS NOT NULL
+        """,
+        "CREATE INDEX talepler_bekleyen_onayci_idx ON talepler (bekleyen_onayci, id) WHERE durum = 'Beklemede'",
+        # Onay ekranları artık bekleyen_onayci konusuna abone; ekip takvimi için doğrudan onaycı da kalır.
+        """
+        CREATE FUNCTION talep_degisiklik_yuku(p_siciller TEXT[], p_departmanlar TEXT[], p_onaycilar TEXT[])
+        RETURNS text AS $$
+        DECLARE
+            yuk TEXT;
+        BEGIN
+            IF p_siciller IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            SELECT json_build_object(
+                'tablo', 'talepler',
+                'sicil', (SELECT json_agg(DISTINCT s) FROM unnest(p_siciller) s WHERE s IS NOT NULL),
+                'departman', (SELECT json_agg(DISTINCT d) FROM unnest(p_departmanlar) d WHERE d IS NOT NULL),
+                'onayci', (SELECT json_agg(DISTINCT o) FROM (
+                               SELECT p.onayci_email FROM personellers p
+                               WHERE p.sicil = ANY(p_siciller) AND p.onayci_email IS NOT NULL
+                               UNION
+                               SELECT o FROM unnest(p_onaycilar) o WHERE o IS NOT NULL
+                           ) x(o))
+            )::text INTO yuk;
+
+            IF octet_length(yuk) > 7900 THEN
+                yuk := '{"tablo": "talepler", "hepsi": true}';
+            END IF;
+            RETURN yuk;
+        END
+        $$ LANGUAGE plpgsql STABLE
+        """,
+        """
+        CREATE OR REPLACE FUNCTION talepler_degisiklik_bildir() RETURNS trigger AS $$
+        DECLARE
+            yuk TEXT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT talep_degisiklik_yuku(array_agg(sicil), array_agg(departman), array_agg(bekleyen_onayci))
+                INTO yuk FROM yeni;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT talep_degisiklik_yuku(array_agg(sicil), array_agg(departman), array_agg(bekleyen_onayci))
+                INTO yuk FROM eski;
+            ELSE
+                SELECT talep_degisiklik_yuku(array_agg(sicil), array_agg(departman), array_agg(bekleyen_onayci))
+                INTO yuk
+                FROM (SELECT sicil, departman, bekleyen_onayci FROM eski
+                      UNION ALL SELECT sicil, departman, bekleyen_onayci FROM yeni) x;
+            END IF;
+
+            IF yuk IS NOT NULL THEN
+                PERFORM pg_notify('izin_degisiklik', yuk);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP FUNCTION talep_degisiklik_yuku(TEXT[], TEXT[])",
+    ]),
+
+    (17, "onaycısı olmayan bekleyen talepler İK'ya, org ağacı için e-posta indeksi", [
+        # 16'da yalnızca onaycısı olanlar taşındı; onaycısı olmayan (ya da rehberde bulunmayan)
+        # personelin bekleyen talebi yeni taleplerdeki gibi (onay_akisi.zincir_kur) İK'ya düşer.
+        f"""
+        UPDATE talepler
+        SET onay_zinciri = ARRAY['{IK_ADIMI}'], onay_adimi = 1, bekleyen_onayci = '{IK_ADIMI}'
+        WHERE durum = 'Beklemede' AND bekleyen_onayci IS NULL
+        """,
+        "CREATE INDEX IF NOT EXISTS personellers_email_idx ON personellers (email)",
+    ]),
+]
+
+
+# ---------------------------------------------------
+# MİGRASYON ÇALIŞTIRICI
+# ---------------------------------------------------
+def _adim_calistir(conn, adim):
+    if callable(adim):
+        adim(conn)
+    else:
+        with conn.cursor() as c:
+            c.execute(adim)
+
+
+def migrasyonlari_uygula(havuz, migrasyonlar=MIGRASYONLAR):
+    """Uygulanmamış migrasyonları sırayla çalıştırır, uygulanan sürümleri döndürür.
+
+    Her sürüm tek işlemdir: adımlar ve sema_surumleri kaydı birlikte commit edilir ya da geri
+    alınır. Çağrılabilir adımlar bu yüzden commit etmemelidir.
+    """
+    uygulanan = []
+
+    with havuz.baglanti() as conn:
+        with conn.cursor() as c:
+            c.execute("SELECT pg_advisory_lock(%s)", (MIGRASYON_KILIDI,))
+        conn.commit()
+
+        try:
+            with conn.cursor() as c:
+                c.execute("""
+                    CREATE TABLE IF NOT EXISTS sema_surumleri (
+                        surum INTEGER PRIMARY KEY,
+                        aciklama TEXT NOT NULL,
+                        uygulandi TIMESTAMPTZ NOT NULL DEFAULT now()
+                    )
+                """)
+                c.execute("SELECT surum FROM sema_surumleri")
+                mevcut = {r[0] for r in c.fetchall()}
+            conn.commit()
+
+            for surum, aciklama, adimlar in sorted(migrasyonlar, key=lambda m: m[0]):
+                if surum in mevcut:
+                    continue
+
+                log.info("Migrasyon %s uygulanıyor: %s", surum, aciklama)
+                try:
+                    for adim in adimlar:
+                        _adim_calistir(conn, adim)
+                    with conn.cursor() as c:
+                        c.execute(
+                            "INSERT INTO sema_surumleri (surum, aciklama) VALUES (%s, %s)",
+                            (surum, aciklama)
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    log.exception("Migrasyon %s başarısız", surum)
+                    raise
+                uygulanan.append(surum)
+        finally:
+            with conn.cursor() as c:
+                c.execute("SELECT pg_advisory_unlock(%s)", (MIGRASYON_KILIDI,))
+            conn.commit()
+
+    return uygulanan
@@ -0,0 +1,342 @@
+import bisect
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2.extensions
+import psycopg2.extras
+import psycopg2.sql
+
+# OLCUM=0 ile tamamen kapanır; kapalıyken imleçler sarılmaz, olc() hiçbir şey kaydetmez.
+OLCUM_ACIK = os.getenv("OLCUM", "1") == "1"
+YAVAS_ESIK = float(os.getenv("OLCUM_YAVAS_MS", "200")) / 1000
+
+# Saniye cinsinden histogram üst sınırları (Prometheus 'le' etiketleri).
+KOVALAR = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+MAX_SORGU_KALIBI = 500
+
+
+# ---------------------------------------------------
+# SQL NORMALLEŞTİRME
+# ---------------------------------------------------
+_METIN = re.compile(r"'(?:[^']|'')*'")
+_SAYI = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?\b")
+_YER_TUTUCU = re.compile(r"%\(\w+\)s|%s")
+_LISTE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_DEGERLER = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_BOSLUK = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def sql_normalize(sql):
+    """Değerleri '?' ile değiştirir, listeleri ve VALUES satırlarını tek kalıba indirir."""
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    s = _METIN.sub("?", str(sql))
+    s = _YER_TUTUCU.sub("?", s)
+    s = _SAYI.sub("?", s)
+    s = _LISTE.sub("(...)", s)
+    s = _DEGERLER.sub(r"\1", s)
+    return _BOSLUK.sub(" ", s).strip()
+
+
+# ---------------------------------------------------
+# HİSTOGRAM
+# ---------------------------------------------------
+class Histogram:
+    __slots__ = ("kovalar", "sayi", "toplam", "maks", "satir")
+
+    def __init__(self):
+        self.kovalar = [0] * (len(KOVALAR) + 1)
+        self.sayi = 0
+        self.toplam = 0.0
+        self.maks = 0.0
+        self.satir = 0
+
+    def ekle(self, sure, satir=None):
+        self.kovalar[bisect.bisect_left(KOVALAR, sure)] += 1
+        self.sayi += 1
+        self.toplam += sure
+        self.maks = max(self.maks, sure)
+        if satir and satir > 0:
+            self.satir += satir
+
+    def yuzdelik(self, oran):
+        # Kova üst sınırıyla tahmin; son kova için gözlenen en büyük değer.
+        if not self.sayi:
+            return 0.0
+        hedef = oran * self.sayi
+        birikim = 0
+        for i, n in enumerate(self.kovalar):
+            birikim += n
+            if birikim >= hedef:
+                return min(KOVALAR[i], self.maks) if i < len(KOVALAR) else self.maks
+        return self.maks
+
+    def ozet(self):
+        return {
+            "sayi": self.sayi,
+            "toplam_sn": self.toplam,
+            "ort_ms": self.toplam / self.sayi * 1000 if self.sayi else 0.0,
+            "p50_ms": self.yuzdelik(0.5) * 1000,
+            "p95_ms": self.yuzdelik(0.95) * 1000,
+            "maks_ms": self.maks * 1000,
+            "satir": self.satir,
+        }
+
+
+# ---------------------------------------------------
+# KAYIT DEFTERİ
+# ---------------------------------------------------
+class OlcumDefteri:
+    """Süreç genelindeki histogramlar, yavaş sorgu günlüğü ve son rerun izleri."""
+
+    def __init__(self, yavas_esik=YAVAS_ESIK, yavas_kapasite=200, iz_kapasite=50):
+        self.yavas_esik = yavas_esik
+        self._kilit = threading.Lock()
+        self._histogramlar = {}
+        self._sorgular = {}
+        self._yavas = deque(maxlen=yavas_kapasite)
+        self._izler = deque(maxlen=iz_kapasite)
+        self.baslangic = time.time()
+
+    def kaydet(self, islem, sure, satir=None, sql=None):
+        kalip = sql_normalize(sql) if sql is not None else None
+        with self._kilit:
+            h = self._histogramlar.get(islem)
+            if h is None:
+                h = self._histogramlar[islem] = Histogram()
+            h.ekle(sure, satir)
+
+            if kalip is not None:
+                s = self._sorgular.get(kalip)
+                if s is None and len(self._sorgular) < MAX_SORGU_KALIBI:
+                    s = self._sorgular[kalip] = Histogram()
+                if s is not None:
+                    s.ekle(sure, satir)
+                if sure >= self.yavas_esik:
+                    self._yavas.append({
+                        "zaman": time.time(), "sure_ms": sure * 1000, "satir": satir, "sql": kalip,
+                    })
+
+        iz = _aktif_iz.get()
+        if iz is not None:
+            iz.ekle(islem, sure, satir, kalip)
+
+    def iz_ekle(self, iz):
+        with self._kilit:
+            self._izler.append(iz.sozluk())
+
+    # ---------------------------------------------------
+    # OKUMA / DIŞA AKTARMA
+    # ---------------------------------------------------
+    def islemler(self):
+        with self._kilit:
+            return {ad: h.ozet() for ad, h in sorted(self._histogramlar.items())}
+
+    def sorgular(self, limit=20):
+        with self._kilit:
+            satirlar = [dict(h.ozet(), sql=k) for k, h in self._sorgular.items()]
+        return sorted(satirlar, key=lambda s: s["toplam_sn"], reverse=True)[:limit]
+
+    def yavas_sorgular(self):
+        with self._kilit:
+            return list(reversed(self._yavas))
+
+    def izler(self):
+        with self._kilit:
+            return list(reversed(self._izler))
+
+    def sifirla(self):
+        with self._kilit:
+            self._histogramlar.clear()
+            self._sorgular.clear()
+            self._yavas.clear()
+            self._izler.clear()
+            self.baslangic = time.time()
+
+    def json(self, ek=None):
+        return json.dumps({
+            "acik": OLCUM_ACIK,
+            "baslangic": self.baslangic,
+            "islemler": self.islemler(),
+            "sorgular": self.sorgular(limit=MAX_SORGU_KALIBI),
+            "yavas_sorgular": self.yavas_sorgular(),
+            "izler": self.izler(),
+            "ek": ek or {},
+        }, ensure_ascii=False, indent=2, default=str)
+
+    def prometheus(self, ek=None):
+        """Prometheus metin biçimi; `ek` {metrik_adi: sayı} olarak gauge yazılır."""
+        satirlar = [
+            "# HELP izin_islem_suresi_saniye İşlem süreleri",
+            "# TYPE izin_islem_suresi_saniye histogram",
+        ]
+        with self._kilit:
+            for ad, h in sorted(self._histogramlar.items()):
+                birikim = 0
+                for ust, n in zip(KOVALAR, h.kovalar):
+                    birikim += n
+                    satirlar.append(f'izin_islem_suresi_saniye_bucket{{islem="{ad}",le="{ust}"}} {birikim}')
+                satirlar.append(f'izin_islem_suresi_saniye_bucket{{islem="{ad}",le="+Inf"}} {h.sayi}')
+                satirlar.append(f'izin_islem_suresi_saniye_sum{{islem="{ad}"}} {h.toplam:.6f}')
+                satirlar.append(f'izin_islem_suresi_saniye_count{{islem="{ad}"}} {h.sayi}')
+            satirlar.append("# TYPE izin_islem_satir_toplam counter")
+            for ad, h in sorted(self._histogramlar.items()):
+                satirlar.append(f'izin_islem_satir_toplam{{islem="{ad}"}} {h.satir}')
+            satirlar.append("# TYPE izin_yavas_sorgu_kayitli gauge")
+            satirlar.append(f"izin_yavas_sorgu_kayitli {len(self._yavas)}")
+
+        for ad, deger in (ek or {}).items():
+            if isinstance(deger, (int, float)) and not isinstance(deger, bool):
+                satirlar.append(f"# TYPE {ad} gauge")
+                satirlar.append(f"{ad} {deger}")
+        return "\n".join(satirlar) + "\n"
+
+
+DEFTER = OlcumDefteri()
+
+
+# ---------------------------------------------------
+# RERUN İZİ
+# ---------------------------------------------------
+_aktif_iz = contextvars.ContextVar("olcum_izi", default=None)
+
+
+class RerunIzi:
+    MAX_ADIM = 500
+
+    def __init__(self, etiket):
+        self.etiket = etiket
+        self.zaman = time.time()
+        self._t0 = time.perf_counter()
+        self.sure = None
+        self.adimlar = []  # (başlangıca göre ms, işlem, süre ms, satır, sql)
+        self.kesilen = 0
+
+    def ekle(self, islem, sure, satir, sql):
+        if len(self.adimlar) >= self.MAX_ADIM:
+            self.kesilen += 1
+            return
+        bitis = time.perf_counter() - self._t0
+        self.adimlar.append(((bitis - sure) * 1000, islem, sure * 1000, satir, sql))
+
+    def bitir(self, yarida=False):
+        # Yarıda kalan (st.stop / st.rerun) izin süresi son adımın bitişidir.
+        if self.sure is not None:
+            return
+        if yarida:
+            self.sure = max((t + s for t, _, s, _, _ in self.adimlar), default=0.0) / 1000
+        else:
+            self.sure = time.perf_counter() - self._t0
+
+    def sozluk(self):
+        return {
+            "etiket": self.etiket,
+            "zaman": self.zaman,
+            "sure_ms": (self.sure or 0.0) * 1000,
+            "adim_sayisi": len(self.adimlar) + self.kesilen,
+            "db_ms": sum(a[2] for a in self.adimlar if a[1] == "db"),
+            "adimlar": [
+                {"t_ms": t, "islem": i, "sure_ms": s, "satir": r, "sql": q}
+                for t, i, s, r, q in self.adimlar
+            ],
+        }
+
+
+def iz_baslat(etiket=""):
+    if not OLCUM_ACIK:
+        return None
+    iz = RerunIzi(etiket)
+    _aktif_iz.set(iz)
+    return iz
+
+
+def iz_bitir(iz, etiket=None, yarida=False):
+    """İzi kapatır ve deftere ekler; aynı iz ikinci kez eklenmez."""
+    if iz is None or iz.sure is not None:
+        return
+    if etiket:
+        iz.etiket = etiket
+    iz.bitir(yarida)
+    if _aktif_iz.get() is iz:
+        _aktif_iz.set(None)
+    DEFTER.iz_ekle(iz)
+
+
+# ---------------------------------------------------
+# ÖLÇÜM NOKTALARI
+# ---------------------------------------------------
+@contextmanager
+def olc(islem):
+    """Bloğun süresini `islem` adıyla kaydeder; blok içinde sonuc["satir"] atanabilir."""
+    if not OLCUM_ACIK:
+        yield {}
+        return
+    sonuc = {}
+    t0 = time.perf_counter()
+    try:
+        yield sonuc
+    finally:
+        DEFTER.kaydet(islem, time.perf_counter() - t0, sonuc.get("satir"))
+
+
+def olculu(islem):
+    def sarmala(fonk):
+        if not OLCUM_ACIK:
+            return fonk
+
+        @functools.wraps(fonk)
+        def sarilmis(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fonk(*args, **kwargs)
+            finally:
+                DEFTER.kaydet(islem, time.perf_counter() - t0)
+        return sarilmis
+    return sarmala
+
+
+# ---------------------------------------------------
+# ÖLÇÜMLÜ İMLEÇLER
+# ---------------------------------------------------
+class _OlcumluImlecKarisimi:
+    def _metin(self, query):
+        # psycopg2.sql ile kurulan sorgular defterde düz metin olarak tutulur.
+        return query.as_string(self) if isinstance(query, psycopg2.sql.Composable) else query
+
+    def execute(self, query, vars=None):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            DEFTER.kaydet("db", time.perf_counter() - t0, self.rowcount, self._metin(query))
+
+    def executemany(self, query, vars_list):
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            DEFTER.kaydet("db", time.perf_counter() - t0, self.rowcount, self._metin(query))
+
+    def copy_expert(self, sql, file, size=8192):
+        t0 = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            DEFTER.kaydet("db.copy", time.perf_counter() - t0, self.rowcount, sql)
+
+
+class OlcumluImlec(_OlcumluImlecKarisimi, psycopg2.extensions.cursor):
+    pass
+
+
+class OlcumluSozlukImlec(_OlcumluImlecKarisimi, psycopg2.extras.RealDictCursor):
+    pass
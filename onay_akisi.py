@@ -0,0 +1,113 @@
+"""Çok aşamalı onay zinciri (migrasyon 16).
+
+Talep oluşturulurken türüne ve iş günü sayısına uyan kurala göre onaycı zinciri kurulur ve
+talepte saklanır (onay_zinciri); sırası gelen onaycı bekleyen_onayci kolonundadır. Böylece
+bir onaycının kuyruğu hiyerarşi ne kadar derin olursa olsun tek bir indeks okumasıdır.
+Zincir, personel rehberinin önbelleğe aldığı org ağacından (ust_onaycilar) çıkarılır;
+kurallar sonradan değişse de bekleyen talepler kuruldukları zincirle devam eder.
+"""
+import pandas as pd
+import psycopg2.extras
+
+# İK adımı tek bir kişiye değil, rolü İK olan herkese düşer.
+IK_ADIMI = "İK"
+
+KURAL_KOLONLARI = ["tip", "en_az_gun", "seviye", "ik_onayi"]
+
+# Uyan kural yoksa: yalnızca doğrudan onaycı, İK onayı yok.
+VARSAYILAN_KURAL = (1, False)
+
+
+def onay_anahtarlari(kullanici):
+    """Kullanıcının onay kuyruğuna düşen bekleyen_onayci değerleri."""
+    anahtarlar = [kullanici.email]
+    if kullanici.rol == "İK":
+        anahtarlar.append(IK_ADIMI)
+    return anahtarlar
+
+
+def zincir_metni(zincir, adim=None):
+    if not zincir:
+        return "-"
+    return " → ".join(
+        f"**{o}**" if adim is not None and i == adim else o
+        for i, o in enumerate(zincir, start=1)
+    )
+
+
+# ---------------------------------------------------
+# KURAL + ZİNCİR
+# ---------------------------------------------------
+def kural_bul(c, tip, gun_sayisi):
+    """(seviye, ik_onayi): türe özel kural genel kurala, aynı grupta en yüksek eşik düşüğüne üstün gelir."""
+    c.execute("""
+        SELECT seviye, ik_onayi
+        FROM onay_kurallari
+        WHERE (tip = %s OR tip IS NULL) AND en_az_gun <= %s
+        ORDER BY tip IS NULL, en_az_gun DESC
+        LIMIT 1
+    """, (tip, gun_sayisi or 0))
+    return c.fetchone() or VARSAYILAN_KURAL
+
+
+def zincir_kur(rehber, kullanici, seviye, ik_onayi):
+    """Org ağacında yukarı doğru en fazla `seviye` onaycı, istenirse sonda İK.
+
+    Talep sahibi ve tekrar eden onaycılar atlanır; kimse kalmazsa talep İK'ya düşer.
+    Rehberde henüz olmayan yeni personel için oturumdaki onaycı kullanılır.
+    """
+    ustler = rehber.ust_onaycilar(kullanici.sicil)
+    if not ustler and isinstance(kullanici.onayci_email, str) and kullanici.onayci_email:
+        ustler = (kullanici.onayci_email,)
+
+    zincir = []
+    for email in ustler:
+        if email != kullanici.email and email not in zincir:
+            zincir.append(email)
+    zincir = zincir[:seviye]
+    if ik_onayi or not zincir:
+        zincir.append(IK_ADIMI)
+    return zincir
+
+
+def alicilar(c, onayci):
+    """Bir adımın bildirim alıcıları; İK adımında rolü İK olan herkes."""
+    if onayci != IK_ADIMI:
+        return [onayci]
+    c.execute("SELECT DISTINCT email FROM personellers WHERE rol = 'İK' AND email IS NOT NULL")
+    return [e for e, in c.fetchall()]
+
+
+# ---------------------------------------------------
+# KURAL YÖNETİMİ (İK)
+# ---------------------------------------------------
+def _bos_mu(deger):
+    # Veri düzenleyiciden boş hücre None, NaN ya da pd.NA gelir.
+    return deger is None or bool(pd.isna(deger))
+
+
+def kurallar(havuz):
+    return havuz.sorgu_df(f"""
+        SELECT {", ".join(KURAL_KOLONLARI)}
+        FROM onay_kurallari
+        ORDER BY tip NULLS FIRST, en_az_gun
+    """)
+
+
+def kurallari_kaydet(havuz, kayitlar):
+    """(tip, en_az_gun, seviye, ik_onayi) listesi tüm kuralların yerine geçer; tip None ise tüm türler.
+
+    Boş gün eşiği 0 (eşik yok) sayılır; boş kademe hatadır.
+    """
+    kayitlar = [(tip, 0 if _bos_mu(gun) else gun, seviye, ik) for tip, gun, seviye, ik in kayitlar]
+    if any(_bos_mu(seviye) for _, _, seviye, _ in kayitlar):
+        raise ValueError("Her kural için yönetici kademesi girilmelidir.")
+    anahtarlar = [(tip or "", float(gun)) for tip, gun, _, _ in kayitlar]
+    if len(set(anahtarlar)) != len(anahtarlar):
+        raise ValueError("Aynı tür ve gün eşiği için birden fazla kural var.")
+    with havuz.imlec() as c:
+        c.execute("DELETE FROM onay_kurallari")
+        if kayitlar:
+            psycopg2.extras.execute_values(c, """
+                INSERT INTO onay_kurallari (tip, en_az_gun, seviye, ik_onayi) VALUES %s
+            """, [(tip or None, gun, int(seviye), bool(ik)) for tip, gun, seviye, ik in kayitlar])
@@ -0,0 +1,327 @@
+import copy
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import replace
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import psycopg2.extras
+
+from olcum import olculu
+
+FONT_NORMAL = "fonts/DejaVuSans.ttf"
+FONT_KALIN = "fonts/DejaVuSans-Bold.ttf"
+LOGO = "assets/logo.png"
+
+# ---------------------------------------------------
+# SÜREÇ BAŞINA BİR KEZ YÜKLENEN KAYNAKLAR
+# ---------------------------------------------------
+# FPDF her add_font çağrısında TTF metriklerini, her image çağrısında PNG'yi
+# yeniden çözer. İlk PDF'te çözülen sözlükler saklanır, sonrakilere kopyalanır.
+_kaynak_kilidi = threading.Lock()
+_font_sablonu = None
+_logo_sablonu = {}
+
+
+def _fontlari_ekle(pdf):
+    global _font_sablonu
+
+    with _kaynak_kilidi:
+        sablon = _font_sablonu
+
+    if sablon is None:
+        pdf.add_font("DejaVu", "", FONT_NORMAL, uni=True)
+        pdf.add_font("DejaVu", "B", FONT_KALIN, uni=True)
+        try:
+            # 'subset' her belgede kullanılan karakterlerle doldurulur; temiz kopyası saklanır.
+            fontlar = {}
+            for k, v in pdf.fonts.items():
+                fontlar[k] = dict(v)
+                fontlar[k]["subset"] = copy.deepcopy(v["subset"])
+            dosyalar = {k: dict(v) for k, v in pdf.font_files.items()}
+        except (AttributeError, KeyError, TypeError):
+            return
+        with _kaynak_kilidi:
+            _font_sablonu = (fontlar, dosyalar)
+        return
+
+    fontlar, dosyalar = sablon
+    for k, v in fontlar.items():
+        yeni = dict(v)
+        yeni["subset"] = copy.deepcopy(v["subset"])
+        pdf.fonts[k] = yeni
+    for k, v in dosyalar.items():
+        pdf.font_files[k] = dict(v)
+
+
+def _logo_ekle(pdf, logo_path):
+    with _kaynak_kilidi:
+        bilgi = _logo_sablonu.get(logo_path)
+    if bilgi is not None and not pdf.images:
+        pdf.images[logo_path] = dict(bilgi)
+
+    pdf.image(logo_path, x=80, y=10, w=50)
+
+    if bilgi is None:
+        with _kaynak_kilidi:
+            _logo_sablonu[logo_path] = dict(pdf.images[logo_path])
+
+
+# ---------------------------------------------------
+# PDF OLUŞTURMA FONKSİYONU
+# ---------------------------------------------------
+@olculu("pdf.olustur")
+def pdf_olustur(veri, logo_path=LOGO):
+    # fpdf yalnızca PDF üretilirken yüklenir; önbellekten dönen PDF'ler için gerekmez.
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+
+    # TÜRKÇE FONTLAR
+    _fontlari_ekle(pdf)
+
+    # LOGO
+    try:
+        _logo_ekle(pdf, logo_path)
+    except Exception:
+        pass
+
+    pdf.ln(35)
+
+    # BAŞLIK
+    pdf.set_font("DejaVu", "B", 18)
+    pdf.cell(0, 10, "İZİN TALEP FORMU", ln=True, align='C')
+    pdf.ln(5)
+
+    # KUTU BAŞLIĞI
+    def kutu_baslik(baslik):
+        pdf.set_font("DejaVu", "B", 12)
+        pdf.set_fill_color(230, 230, 230)
+        pdf.cell(180, 8, baslik, ln=True, fill=True)
+
+    # SATIR
+    def satir(label, value):
+        pdf.set_font("DejaVu", "", 11)
+        pdf.cell(60, 8, f"{label}:", border=1)
+        pdf.cell(120, 8, str(value), border=1, ln=True)
+
+    # PERSONEL BİLGİLERİ
+    kutu_baslik("PERSONEL BİLGİLERİ")
+    satir("Ad Soyad", veri["ad_soyad"])
+    satir("Sicil No", veri["sicil"])
+    satir("Departman", veri["departman"])
+    satir("Görevi", veri["meslek"])
+    satir("Cep Telefonu", veri["telefon"])
+    satir("Mail Adresi", veri["email"])
+    pdf.ln(5)
+
+    # İZİN BİLGİLERİ
+    kutu_baslik("İZİN BİLGİLERİ")
+    satir("İzin Türü", veri["tip"])
+    satir("Başlangıç Tarihi", veri["baslangic"])
+    satir("Bitiş Tarihi", veri["bitis"])
+
+    pdf.set_font("DejaVu", "", 11)
+    pdf.cell(60, 8, "İzin Nedeni:", border=1)
+
+    # Neden metni güvenli şekilde hazırlanıyor
+    neden_metin = veri.get("neden")
+    if not neden_metin or str(neden_metin).strip() == "":
+        neden_metin = "Belirtilmemiş"
+    else:
+        neden_metin = str(neden_metin)
+    pdf.multi_cell(120, 8, neden_metin, border=1)
+    pdf.ln(5)
+
+    # YÖNETİCİ ONAYI
+    if veri["durum"] == "Onaylandı" and veri["yonetici"]:
+        kutu_baslik("YÖNETİCİ ONAYI")
+        metin = f"Bu izin, {veri['yonetici']} tarafından {veri['onay_tarihi']} tarihinde onaylanmıştır."
+        pdf.multi_cell(180, 8, metin, border=1)
+        pdf.ln(5)
+
+    # İMZA ALANLARI
+    pdf.set_font("DejaVu", "B", 12)
+    pdf.cell(90, 10, "Personel İmzası", border=1, ln=False, align='C')
+    pdf.cell(90, 10, "Yönetici İmzası", border=1, ln=True, align='C')
+
+    return pdf.output(dest='S').encode('latin1')
+
+
+# ---------------------------------------------------
+# TALEP SATIRINDAN PDF VERİSİ
+# ---------------------------------------------------
+def _bos_degil(deger):
+    # None / NaN / NaT boş sayılır.
+    return deger is not None and deger == deger
+
+
+def pdf_verisi(talep, personel=None):
+    """Talep satırı ve personel bilgisinden pdf_olustur'un beklediği sözlüğü kurar.
+
+    `personel` verilmezse personel alanları (sicil, email, ...) talep satırından okunur.
+    """
+    personel = talep if personel is None else personel
+    onay_tarihi = talep.get("onay_tarihi")
+    return {
+        "id": int(talep["id"]),
+        "guncellendi": str(talep.get("guncellendi")),
+        "ad_soyad": talep["ad_soyad"],
+        "sicil": personel["sicil"],
+        "departman": personel["departman"],
+        "meslek": personel["meslek"],
+        "telefon": personel["cep_telefonu"],
+        "email": personel["email"],
+        "tip": talep["tip"],
+        "baslangic": talep["baslangic"],
+        "bitis": talep["bitis"],
+        "neden": talep["neden"],
+        "durum": talep["durum"],
+        "yonetici": talep.get("onaylayan") if _bos_degil(talep.get("onaylayan")) else "",
+        "onay_tarihi": onay_tarihi if _bos_degil(onay_tarihi) else "",
+    }
+
+
+# ---------------------------------------------------
+# İÇERİK ADRESLİ PDF ÖNBELLEĞİ
+# ---------------------------------------------------
+def pdf_anahtari(veri):
+    # Talep id + son değişiklik zamanı + basılan tüm alanlar; herhangi biri değişirse yeni PDF.
+    metin = json.dumps(veri, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(metin.encode("utf-8")).hexdigest()
+
+
+class PdfOnbellegi:
+    def __init__(self, max_bayt=64 * 1024 * 1024):
+        self.max_bayt = max_bayt
+        self._kilit = threading.Lock()
+        self._kayitlar = OrderedDict()
+        self._bayt = 0
+        self._sayac = {"isabet": 0, "iskalama": 0, "atilan": 0}
+
+    @classmethod
+    def ortamdan(cls):
+        return cls(max_bayt=int(float(os.getenv("PDF_CACHE_MB", "64")) * 1024 * 1024))
+
+    def getir(self, veri):
+        anahtar = pdf_anahtari(veri)
+        with self._kilit:
+            pdf = self._kayitlar.get(anahtar)
+            if pdf is not None:
+                self._kayitlar.move_to_end(anahtar)
+                self._sayac["isabet"] += 1
+                return pdf
+            self._sayac["iskalama"] += 1
+
+        pdf = pdf_olustur(veri)
+
+        with self._kilit:
+            if anahtar not in self._kayitlar:
+                self._kayitlar[anahtar] = pdf
+                self._bayt += len(pdf)
+            while self._bayt > self.max_bayt and len(self._kayitlar) > 1:
+                _, eski = self._kayitlar.popitem(last=False)
+                self._bayt -= len(eski)
+                self._sayac["atilan"] += 1
+        return pdf
+
+    def istatistik(self):
+        with self._kilit:
+            s = dict(self._sayac)
+            s["kayit"] = len(self._kayitlar)
+            s["bayt"] = self._bayt
+        s["max_bayt"] = self.max_bayt
+        return s
+
+
+# ---------------------------------------------------
+# TOPLU PDF DIŞA AKTARIM (ZIP)
+# ---------------------------------------------------
+TOPLU_PDF_SORGUSU = """
+    SELECT t.id, t.guncellendi, t.ad_soyad, t.tip, t.baslangic, t.bitis, t.neden,
+           t.durum, t.onaylayan, t.onay_tarihi,
+           COALESCE(t.sicil, '') AS sicil,
+           COALESCE(p.departman, t.departman) AS departman,
+           COALESCE(p.meslek, t.meslek) AS meslek,
+           COALESCE(p.cep_telefonu, '') AS cep_telefonu,
+           COALESCE(p.email, '') AS email
+    FROM talepler t
+    LEFT JOIN personellers p ON p.sicil = t.sicil
+    WHERE {kosul}
+    ORDER BY t.id
+"""
+
+
+def _dosya_adi(veri):
+    ham = f"{veri['sicil']}_{veri['ad_soyad']}_{veri['tip']}_{veri['baslangic']}_{veri['id']}"
+    return re.sub(r"[^\w.-]+", "_", ham) + ".pdf"
+
+
+def _pdf_partisi(veriler):
+    # Alt süreçte çalışır; fontlar ve logo her alt süreçte bir kez yüklenir.
+    return [(_dosya_adi(v), pdf_olustur(v)) for v in veriler]
+
+
+@olculu("pdf.toplu_zip")
+def toplu_pdf_zip(havuz, hedef, filtre, ilerleme=None, isci_sayisi=None, parti=16):
+    """Filtreye uyan onaylı talepleri PDF'leyip `hedef` dosyasına ZIP olarak yazar.
+
+    Satırlar sunucu taraflı imleçle okunur, PDF'ler süreç havuzunda üretilir ve
+    tamamlandıkça ZIP'e eklenir; bellekte aynı anda yalnızca birkaç parti bulunur.
+    Yazılan form sayısını döndürür.
+    """
+    isci_sayisi = isci_sayisi or int(os.getenv("PDF_ISCI_SAYISI", "0")) or os.cpu_count() or 1
+    kosul, params = replace(filtre, durum="Onaylandı").sql("t")
+
+    with havuz.imlec() as c:
+        c.execute(f"SELECT count(*) FROM talepler t LEFT JOIN personellers p ON p.sicil = t.sicil WHERE {kosul}", params)
+        toplam = c.fetchone()[0]
+
+    yazilan = 0
+    if ilerleme:
+        ilerleme(yazilan, toplam)
+
+    # PDF'ler zaten sıkıştırılmış olduğundan ZIP içinde yeniden sıkıştırılmaz.
+    # spawn: alt süreçler ana süreçteki veritabanı soketlerini ve iş parçacıklarını devralmaz.
+    with zipfile.ZipFile(hedef, "w", zipfile.ZIP_STORED) as zf, \
+            ProcessPoolExecutor(isci_sayisi, mp_context=multiprocessing.get_context("spawn")) as havuz_pdf, \
+            havuz.baglanti() as conn, \
+            conn.cursor(name="toplu_pdf", cursor_factory=psycopg2.extras.RealDictCursor) as c:
+
+        c.itersize = parti * isci_sayisi
+        c.execute(TOPLU_PDF_SORGUSU.format(kosul=kosul), params)
+
+        bekleyen = set()
+
+        def _tamamlananlari_yaz(hepsi=False):
+            nonlocal bekleyen, yazilan
+            if not bekleyen:
+                return
+            biten, bekleyen = wait(bekleyen, return_when=ALL_COMPLETED if hepsi else FIRST_COMPLETED)
+            for f in biten:
+                for ad, pdf in f.result():
+                    zf.writestr(ad, pdf)
+                    yazilan += 1
+            if ilerleme:
+                ilerleme(yazilan, toplam)
+
+        veriler = []
+        for satir in c:
+            veriler.append(pdf_verisi(satir))
+            if len(veriler) == parti:
+                bekleyen.add(havuz_pdf.submit(_pdf_partisi, veriler))
+                veriler = []
+                while len(bekleyen) >= 2 * isci_sayisi:
+                    _tamamlananlari_yaz()
+
+        if veriler:
+            bekleyen.add(havuz_pdf.submit(_pdf_partisi, veriler))
+        _tamamlananlari_yaz(hepsi=True)
+
+    return yazilan
@@ -0,0 +1,262 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+
+from arama import PERSONEL_BELGESI, arama_kosulu, skor_ifadesi, trigram_var
+from guvenlik import sifre_dogrula, sifre_hashle
+from olcum import olculu
+
+PERSONEL_KOLONLARI = [
+    "sicil", "ad_soyad", "meslek", "departman", "email",
+    "onayci_email", "rol", "cep_telefonu", "ise_giris",
+]
+
+
+# ---------------------------------------------------
+# OTURUMDA TUTULAN KULLANICI
+# ---------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class Kullanici:
+    sicil: str
+    ad_soyad: str
+    meslek: str
+    departman: str
+    email: str
+    onayci_email: str
+    rol: str
+    cep_telefonu: str
+    ise_giris: date | None = None
+
+
+# ---------------------------------------------------
+# GİRİŞ DOĞRULAMA
+# ---------------------------------------------------
+@olculu("giris")
+def giris_dogrula(havuz, ad_soyad, sifre):
+    """Ad soyad + şifre doğruysa Kullanici, değilse None döndürür.
+
+    Düz metin saklanan eski şifreler ilk başarılı girişte hashlenerek güncellenir.
+    """
+    with havuz.imlec() as c:
+        c.execute(
+            f"SELECT {', '.join(PERSONEL_KOLONLARI)}, sifre FROM personellers WHERE ad_soyad = %s",
+            (ad_soyad,)
+        )
+        adaylar = c.fetchall()
+
+    if not adaylar:
+        # Olmayan kullanıcıda da aynı süre harcansın (kullanıcı adı tahminine karşı).
+        sifre_hashle(sifre)
+        return None
+
+    for satir in adaylar:
+        *alanlar, kayitli = satir
+        dogru, yenile = sifre_dogrula(sifre, kayitli)
+        if not dogru:
+            continue
+
+        if yenile:
+            with havuz.imlec() as c:
+                c.execute(
+                    "UPDATE personellers SET sifre = %s WHERE sicil = %s AND sifre = %s",
+                    (sifre_hashle(sifre), alanlar[0], kayitli)
+                )
+        return Kullanici(*alanlar)
+
+    return None
+
+
+# ---------------------------------------------------
+# PERSONEL REHBERİ (SÜREÇ İÇİ ÖNBELLEK)
+# ---------------------------------------------------
+# Onaycı zincirinde izlenen en fazla yönetici kademesi (hatalı veride sonsuz döngüye karşı).
+EN_FAZLA_DERINLIK = 10
+
+
+class PersonelRehberi:
+    """personellers tablosunun süreç içi kopyası; sicil, ad ve onaycı e-postası ile indekslenir.
+
+    Şifre kolonu hiçbir zaman önbelleğe alınmaz. Veri `ttl` saniye sonra ya da
+    `gecersiz_kil()` çağrıldığında yeniden okunur.
+    """
+
+    def __init__(self, havuz, ttl=300.0):
+        self._havuz = havuz
+        self.ttl = ttl
+        self._kilit = threading.Lock()
+        self._veri = None
+        self._yuklenme = 0.0
+        self._sayac = {"isabet": 0, "iskalama": 0, "gecersiz_kilma": 0}
+
+    @classmethod
+    def ortamdan(cls, havuz):
+        return cls(havuz, ttl=float(os.getenv("PERSONEL_CACHE_TTL", "300")))
+
+    def _yukle(self):
+        df = self._havuz.sorgu_df(
+            f"SELECT {', '.join(PERSONEL_KOLONLARI)} FROM personellers ORDER BY ad_soyad"
+        )
+        kayitlar = df.to_dict("records")
+
+        sicile_gore = {}
+        ada_gore = {}
+        onayciya_gore = {}
+        for k in kayitlar:
+            sicile_gore[k["sicil"]] = k
+            ada_gore.setdefault(k["ad_soyad"], []).append(k)
+            if k["onayci_email"]:
+                onayciya_gore.setdefault(k["onayci_email"], []).append(k)
+
+        return {
+            "tablo": df,
+            "sicil": sicile_gore,
+            "ad": ada_gore,
+            "onayci": onayciya_gore,
+        }
+
+    def _agac_yukle(self):
+        # Her personel için yukarı doğru onaycı zinciri; döngüde ya da EN_FAZLA_DERINLIK'te durur.
+        with self._havuz.imlec() as c:
+            c.execute("""
+                WITH RECURSIVE zincir (sicil, derinlik, onayci, yol) AS (
+                    SELECT sicil, 1, onayci_email, ARRAY[email]
+                    FROM personellers
+                    WHERE onayci_email IS NOT NULL
+                  UNION ALL
+                    SELECT z.sicil, z.derinlik + 1, u.onayci_email, z.yol || u.email
+                    FROM zincir z
+                    JOIN personellers u ON u.email = z.onayci
+                    WHERE u.onayci_email IS NOT NULL
+                      AND u.onayci_email <> ALL (z.yol)
+                      AND z.derinlik < %s
+                )
+                SELECT sicil, derinlik, onayci FROM zincir ORDER BY sicil, derinlik
+            """, (EN_FAZLA_DERINLIK,))
+            satirlar = c.fetchall()
+
+        agac = {}
+        for sicil, derinlik, onayci in satirlar:
+            ustler = agac.setdefault(sicil, [])
+            # Aynı e-postayla birden fazla kayıt varsa her derinlikte ilki alınır.
+            if len(ustler) < derinlik:
+                ustler.append(onayci)
+        return {sicil: tuple(ustler) for sicil, ustler in agac.items()}
+
+    def _guncel(self):
+        with self._kilit:
+            if self._veri is not None and time.monotonic() - self._yuklenme < self.ttl:
+                self._sayac["isabet"] += 1
+                return self._veri
+
+            self._sayac["iskalama"] += 1
+            self._veri = self._yukle()
+            self._yuklenme = time.monotonic()
+            return self._veri
+
+    # ---------------------------------------------------
+    # SORGULAR
+    # ---------------------------------------------------
+    def tablo(self):
+        # Paylaşılan DataFrame döner; çağıran değiştirmemeli.
+        return self._guncel()["tablo"]
+
+    def sicil_ile(self, sicil):
+        return self._guncel()["sicil"].get(sicil)
+
+    def ad_ile(self, ad_soyad):
+        return self._guncel()["ad"].get(ad_soyad, [])
+
+    def onayciya_bagli(self, onayci_email):
+        return self._guncel()["onayci"].get(onayci_email, [])
+
+    def ust_onaycilar(self, sicil):
+        """Doğrudan onaycıdan başlayarak org ağacında yukarı doğru onaycı e-postaları.
+
+        Ağaç ilk istendiğinde tek bir özyinelemeli sorguyla kurulur ve rehberle birlikte
+        geçersiz kılınır (personellers değişince). Sorgu kilit dışında çalışır, diğer rehber
+        okumaları beklemez; aynı anda iki kez kurulursa ilk yerleşen kullanılır.
+        """
+        veri = self._guncel()
+        agac = veri.get("agac")
+        if agac is None:
+            yeni = self._agac_yukle()
+            with self._kilit:
+                agac = veri.setdefault("agac", yeni)
+        return agac.get(sicil, ())
+
+    def email_bul(self, sicil=None, ad_soyad=None):
+        kayit = self.sicil_ile(sicil) if sicil else None
+        if kayit is None and ad_soyad:
+            adaylar = self.ad_ile(ad_soyad)
+            kayit = adaylar[0] if adaylar else None
+        return kayit["email"] if kayit else None
+
+    # ---------------------------------------------------
+    # GEÇERSİZ KILMA
+    # ---------------------------------------------------
+    def gecersiz_kil(self):
+        with self._kilit:
+            self._veri = None
+            self._sayac["gecersiz_kilma"] += 1
+
+    def istatistik(self):
+        with self._kilit:
+            s = dict(self._sayac)
+            s["kayit"] = len(self._veri["sicil"]) if self._veri is not None else 0
+            s["yas"] = time.monotonic() - self._yuklenme if self._veri is not None else None
+        toplam = s["isabet"] + s["iskalama"]
+        s["isabet_orani"] = s["isabet"] / toplam if toplam else 0.0
+        s["ttl"] = self.ttl
+        return s
+
+
+# ---------------------------------------------------
+# İK ARAMASI (İNDEKSLİ, SAYFALI)
+# ---------------------------------------------------
+ARAMA_KOLONLARI = ["sicil", "ad_soyad", "departman", "meslek", "email", "onayci_email", "rol"]
+
+
+@olculu("personel.arama")
+def personel_ara(havuz, metin=None, sonra=None, boyut=25):
+    """Bir sayfa personel ve sonraki sayfanın imlecini döndürür (son sayfada None).
+
+    Metin varsa ad, sicil, departman ve e-postada Türkçe harf duyarsız ön ek araması yapılır,
+    en ilgili önce gelir; yoksa sicil sırasıyla listelenir. `sonra` önceki sayfanın son
+    satırının (skor, sicil) ikilisidir; tablo belleğe alınmaz.
+    """
+    metin = (metin or "").strip()
+    if metin:
+        belge = PERSONEL_BELGESI.format(t="p")
+        bulanik = trigram_var(havuz)
+        kosul, params = arama_kosulu(belge, "p.ad_soyad", metin, bulanik)
+        skor, skor_params = skor_ifadesi("p.ad_soyad", metin, bulanik)
+    else:
+        kosul, params, skor, skor_params = "TRUE", [], "0::float8", []
+
+    sayfa, sayfa_params = "", []
+    if sonra is not None:
+        sayfa = "WHERE s.skor < %s OR (s.skor = %s AND s.sicil > %s)"
+        sayfa_params = [sonra[0], sonra[0], sonra[1]]
+
+    with havuz.imlec() as c:
+        c.execute(f"""
+            SELECT s.* FROM (
+                SELECT {", ".join(f"p.{k}" for k in ARAMA_KOLONLARI)}, {skor} AS skor
+                FROM personellers p
+                WHERE {kosul}
+            ) s
+            {sayfa}
+            ORDER BY s.skor DESC, s.sicil
+            LIMIT %s
+        """, skor_params + params + sayfa_params + [boyut + 1])
+        satirlar = c.fetchall()
+
+    sonraki = None
+    if len(satirlar) > boyut:
+        satirlar = satirlar[:boyut]
+        sonraki = (satirlar[-1][-1], satirlar[-1][0])
+    return pd.DataFrame([s[:-1] for s in satirlar], columns=ARAMA_KOLONLARI), sonraki
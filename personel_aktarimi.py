@@ -0,0 +1,225 @@
+from dataclasses import dataclass, field
+from io import StringIO
+
+import pandas as pd
+import psycopg2.extras
+
+from guvenlik import sifreleri_hashle
+from olcum import olculu
+
+BEKLENEN_KOLONLAR = ["Sicil", "Ad Soyad", "Sifre", "Meslek", "Departman", "Email", "Onayci_Email", "Rol", "Cep_Telefonu"]
+
+KOLON_ESLESME = {
+    "Sicil": "sicil",
+    "Ad Soyad": "ad_soyad",
+    "Sifre": "sifre",
+    "Meslek": "meslek",
+    "Departman": "departman",
+    "Email": "email",
+    "Onayci_Email": "onayci_email",
+    "Rol": "rol",
+    "Cep_Telefonu": "cep_telefonu",
+    "Ise_Giris": "ise_giris",
+}
+
+# Dosyada yoksa boş kabul edilen sütunlar; boş değer mevcut kaydı ezmez.
+OPSIYONEL_KOLONLAR = ["Ise_Giris"]
+
+YUKLEME_KOLONLARI = ["satir"] + list(KOLON_ESLESME.values())
+
+ROLLER = ["Personel", "Yönetici", "İK"]
+
+EMAIL_DESENI = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+
+class FormatHatasi(ValueError):
+    pass
+
+
+@dataclass
+class AktarimRaporu:
+    eklenen: int = 0
+    guncellenen: int = 0
+    reddedilen: int = 0
+    hatalar: list = field(default_factory=list)  # (excel satır no, sicil, sebep)
+
+    MAX_HATA = 200
+
+    def reddet(self, satir, sicil, sebep):
+        self.reddedilen += 1
+        if len(self.hatalar) < self.MAX_HATA:
+            self.hatalar.append((int(satir), sicil, sebep))
+
+
+# ---------------------------------------------------
+# EXCEL'İ PARÇA PARÇA OKUMA
+# ---------------------------------------------------
+def excel_parcalari(dosya, parca=5000):
+    """Çalışma kitabını salt-okunur modda açar, (DataFrame, ilk excel satır no) parçaları üretir."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(dosya, read_only=True, data_only=True)
+    try:
+        satirlar = wb.active.iter_rows(values_only=True)
+        baslik = next(satirlar, None)
+        if baslik is None:
+            return
+
+        baslik = [str(b).strip() if b is not None else "" for b in baslik]
+        eksik = [k for k in BEKLENEN_KOLONLAR if k not in baslik]
+        if eksik:
+            raise FormatHatasi(f"Eksik sütunlar: {', '.join(eksik)}")
+
+        ilk = 2
+        tampon = []
+        for satir in satirlar:
+            tampon.append(satir)
+            if len(tampon) == parca:
+                yield pd.DataFrame(tampon, columns=baslik), ilk
+                ilk += len(tampon)
+                tampon = []
+        if tampon:
+            yield pd.DataFrame(tampon, columns=baslik), ilk
+    finally:
+        wb.close()
+
+
+# ---------------------------------------------------
+# VEKTÖREL DOĞRULAMA / NORMALLEŞTİRME
+# ---------------------------------------------------
+def _metin(seri):
+    # Excel sayı olarak okuduğu sicil/telefonları "1234.0" yerine "1234" yapar.
+    s = seri.astype("string").str.strip()
+    s = s.str.replace(r"^(\d+)\.0$", r"\1", regex=True)
+    return s.mask(s.isin(["", "nan", "None", "NaT"]))
+
+
+def normalize_et(df, ilk_satir):
+    """(temiz, reddedilen) döndürür; reddedilen'de 'satir', 'sicil', 'sebep' kolonları vardır."""
+    df = df.reindex(columns=BEKLENEN_KOLONLAR + OPSIYONEL_KOLONLAR).rename(columns=KOLON_ESLESME)
+    df = df.apply(_metin)
+    df.insert(0, "satir", range(ilk_satir, ilk_satir + len(df)))
+
+    # Tamamen boş satırlar sessizce atlanır.
+    df = df[df.drop(columns="satir").notna().any(axis=1)].copy()
+
+    df["email"] = df["email"].str.lower()
+    df["onayci_email"] = df["onayci_email"].str.lower()
+    df["rol"] = df["rol"].fillna("Personel")
+
+    # Excel tarih hücreleri ISO biçiminde gelir; metin olarak yazılanlar gg.aa.yyyy kabul edilir.
+    ise_giris = pd.to_datetime(df["ise_giris"], errors="coerce", format="ISO8601")
+    ise_giris = ise_giris.fillna(pd.to_datetime(df["ise_giris"], errors="coerce", format="%d.%m.%Y"))
+    gecersiz_tarih = df["ise_giris"].notna() & ise_giris.isna()
+    df["ise_giris"] = ise_giris.dt.strftime("%Y-%m-%d")
+
+    sebep = pd.Series(pd.NA, index=df.index, dtype="string")
+    sebep = sebep.mask(df["sicil"].isna(), "Sicil boş")
+    sebep = sebep.mask(sebep.isna() & df["ad_soyad"].isna(), "Ad Soyad boş")
+    sebep = sebep.mask(sebep.isna() & ~df["rol"].isin(ROLLER), "Geçersiz rol")
+    sebep = sebep.mask(
+        sebep.isna() & df["email"].notna() & ~df["email"].str.match(EMAIL_DESENI).fillna(False),
+        "Geçersiz e-posta"
+    )
+    sebep = sebep.mask(
+        sebep.isna() & df["onayci_email"].notna() & ~df["onayci_email"].str.match(EMAIL_DESENI).fillna(False),
+        "Geçersiz onaycı e-postası"
+    )
+    sebep = sebep.mask(sebep.isna() & gecersiz_tarih, "Geçersiz işe giriş tarihi")
+
+    hatali = sebep.notna()
+    reddedilen = df.loc[hatali, ["satir", "sicil"]].assign(sebep=sebep[hatali])
+    return df.loc[~hatali, YUKLEME_KOLONLARI], reddedilen
+
+
+# ---------------------------------------------------
+# TOPLU UPSERT
+# ---------------------------------------------------
+@olculu("personel.aktar")
+def personel_aktar(havuz, dosya, parca=5000):
+    rapor = AktarimRaporu()
+
+    with havuz.baglanti() as conn, conn.cursor() as c:
+        c.execute("""
+            CREATE TEMP TABLE personel_yukleme (
+                satir INTEGER, sicil TEXT, ad_soyad TEXT, sifre TEXT, meslek TEXT,
+                departman TEXT, email TEXT, onayci_email TEXT, rol TEXT, cep_telefonu TEXT,
+                ise_giris DATE
+            ) ON COMMIT DROP
+        """)
+
+        # 1) Parçaları doğrula ve COPY ile ara tabloya yükle
+        for df, ilk in excel_parcalari(dosya, parca):
+            temiz, reddedilen = normalize_et(df, ilk)
+            for satir, sicil, sebep in reddedilen.itertuples(index=False):
+                rapor.reddet(satir, sicil, sebep)
+
+            if not temiz.empty:
+                tampon = StringIO()
+                temiz.to_csv(tampon, index=False, header=False)
+                tampon.seek(0)
+                c.copy_expert(
+                    f"COPY personel_yukleme ({', '.join(YUKLEME_KOLONLARI)}) FROM STDIN WITH (FORMAT csv)",
+                    tampon
+                )
+
+        # 2) Dosya içinde tekrar eden siciller: son satır kazanır
+        c.execute("""
+            DELETE FROM personel_yukleme a
+            USING personel_yukleme b
+            WHERE a.sicil = b.sicil AND a.satir < b.satir
+            RETURNING a.satir, a.sicil
+        """)
+        for satir, sicil in c.fetchall():
+            rapor.reddet(satir, sicil, "Dosyada tekrar eden sicil (son satır kullanıldı)")
+
+        # 3) Yeni personelin şifresi zorunlu ve hashlenir; mevcut personelin şifresine dokunulmaz
+        c.execute("""
+            DELETE FROM personel_yukleme y
+            WHERE y.sifre IS NULL
+              AND NOT EXISTS (SELECT 1 FROM personellers p WHERE p.sicil = y.sicil)
+            RETURNING y.satir, y.sicil
+        """)
+        for satir, sicil in c.fetchall():
+            rapor.reddet(satir, sicil, "Yeni personel için şifre boş")
+
+        c.execute("""
+            SELECT y.sicil, y.sifre
+            FROM personel_yukleme y
+            WHERE NOT EXISTS (SELECT 1 FROM personellers p WHERE p.sicil = y.sicil)
+        """)
+        yeniler = c.fetchall()
+        if yeniler:
+            hashler = sifreleri_hashle([s for _, s in yeniler])
+            psycopg2.extras.execute_values(
+                c,
+                "UPDATE personel_yukleme y SET sifre = v.h FROM (VALUES %s) AS v(sicil, h) WHERE y.sicil = v.sicil",
+                [(sicil, h) for (sicil, _), h in zip(yeniler, hashler)],
+                page_size=1000
+            )
+
+        # 4) Tek INSERT ... ON CONFLICT
+        c.execute("""
+            INSERT INTO personellers (sicil, ad_soyad, sifre, meslek, departman,
+                                      email, onayci_email, rol, cep_telefonu, ise_giris)
+            SELECT sicil, ad_soyad, sifre, meslek, departman,
+                   email, onayci_email, rol, cep_telefonu, ise_giris
+            FROM personel_yukleme
+            ON CONFLICT (sicil) DO UPDATE SET
+                ad_soyad = EXCLUDED.ad_soyad,
+                meslek = EXCLUDED.meslek,
+                departman = EXCLUDED.departman,
+                email = EXCLUDED.email,
+                onayci_email = EXCLUDED.onayci_email,
+                rol = EXCLUDED.rol,
+                cep_telefonu = EXCLUDED.cep_telefonu,
+                ise_giris = COALESCE(EXCLUDED.ise_giris, personellers.ise_giris)
+            RETURNING (xmax = 0) AS eklendi
+        """)
+        for (eklendi,) in c.fetchall():
+            if eklendi:
+                rapor.eklenen += 1
+            else:
+                rapor.guncellenen += 1
+
+    return rapor
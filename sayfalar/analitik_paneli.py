@@ -0,0 +1,72 @@
+from datetime import date
+
+import streamlit as st
+
+from analitik import aylik_gunler, departman_tablosu, en_cok_izin_alanlar, metrikler, ozet_boyutlari, ozet_verisi
+from kaynaklar import havuz_getir
+
+
+# Değişiklik akışında bu sayfayı yenileyen konular.
+def konular(user):
+    return {"talepler"}
+
+
+# ---------------------------------------------------
+# ANALİTİK PANELİ (İK)
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+
+    st.header("📈 İzin Analitiği")
+
+    # Tüm göstergeler artımlı güncellenen özet tablolarından okunur.
+    a_departmanlar, a_tipler, ilk_ay, son_ay = ozet_boyutlari(havuz)
+    if ilk_ay is None:
+        st.info("Henüz özetlenecek talep yok.")
+        st.stop()
+
+    a_col1, a_col2 = st.columns(2)
+    a_bas = a_col1.date_input("İlk ay", min(max(ilk_ay, date.today().replace(month=1, day=1)), son_ay),
+                              min_value=ilk_ay, max_value=son_ay, key="analitik_bas")
+    a_bit = a_col2.date_input("Son ay", son_ay, min_value=ilk_ay, max_value=son_ay, key="analitik_bit")
+    a_dep = st.multiselect("Departmanlar", a_departmanlar, key="analitik_dep",
+                           format_func=lambda d: d or "(boş)")
+    a_tip = st.multiselect("İzin türleri", a_tipler, key="analitik_tip")
+
+    ozet = ozet_verisi(havuz, a_bas, a_bit, a_dep, a_tip)
+    m = metrikler(ozet)
+
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Talep", m["talep"])
+    k2.metric("Onaylı izin günü", f"{m['onayli_gun']:g}")
+    k3.metric("Onay oranı", f"{m['onay_orani']:.0%}" if m["onay_orani"] is not None else "-")
+    k4.metric("Ort. karar süresi",
+              f"{m['ort_karar_saat'] / 24:.1f} gün" if m["ort_karar_saat"] is not None else "-")
+
+    st.subheader("Aylık onaylı izin günleri")
+    boyut = st.radio("Kırılım", ["departman", "tip"], horizontal=True, key="analitik_boyut",
+                     format_func={"departman": "Departman", "tip": "İzin türü"}.get)
+    aylik = aylik_gunler(ozet, boyut)
+    if aylik.empty:
+        st.caption("Seçilen aralıkta onaylı izin yok.")
+    else:
+        st.bar_chart(aylik)
+
+    st.subheader("Departman bazında")
+    st.dataframe(
+        departman_tablosu(ozet),
+        use_container_width=True,
+        column_config={
+            "talep_sayisi": "Talep",
+            "onayli_gun": "Onaylı gün",
+            "onay_orani": st.column_config.NumberColumn("Onay oranı", format="percent"),
+            "ort_karar_saat": st.column_config.NumberColumn("Ort. karar (saat)", format="%.1f"),
+        },
+    )
+
+    st.subheader("En çok izin kullananlar")
+    st.dataframe(
+        en_cok_izin_alanlar(havuz, a_bas, a_bit, a_dep),
+        use_container_width=True,
+        hide_index=True,
+    )
@@ -0,0 +1,89 @@
+import pandas as pd
+import streamlit as st
+
+from bildirim import POLITIKALAR, gunluk_eposta_sayilari, politikalar, politikalari_ayarla, teslim_istatistikleri
+from kaynaklar import havuz_getir, posta_iscisi_getir, rehber_getir
+
+
+# ---------------------------------------------------
+# BİLDİRİM TERCİHLERİ VE TESLİM (İK)
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    rehber = rehber_getir(havuz)
+    posta_iscisi = posta_iscisi_getir(havuz)
+
+    st.header("📬 Bildirimler")
+
+    # ---------------------------------------------------
+    # 📈 TESLİM ÖZETİ
+    # ---------------------------------------------------
+    gun = st.selectbox("Dönem", [1, 7, 30], index=1, format_func=lambda g: f"Son {g} gün")
+    ozet = teslim_istatistikleri(havuz, gun)
+    if ozet.empty:
+        st.info("Bu dönemde bildirim oluşmadı.")
+    else:
+        m_col1, m_col2, m_col3, m_col4 = st.columns(4)
+        m_col1.metric("Bildirim", int(ozet["bildirim"].sum()))
+        m_col2.metric("Gönderilen E-posta", int(ozet["eposta"].sum()))
+        m_col3.metric("Bekleyen", int(ozet["bekleyen"].sum()))
+        m_col4.metric("Ölü", int(ozet["olu"].sum()))
+        ozet["politika"] = ozet["politika"].map(POLITIKALAR)
+        st.dataframe(ozet, use_container_width=True, hide_index=True)
+
+    gunluk = gunluk_eposta_sayilari(havuz, 30)
+    if not gunluk.empty:
+        st.caption("Son 30 günde gün başına gönderilen e-posta")
+        st.bar_chart(gunluk.set_index("gun")["eposta"])
+
+    b = posta_iscisi.istatistik()
+    st.caption(
+        f"Bu süreçteki posta işçisi: {b['gonderilen']} bildirim gönderildi, "
+        f"{b['ozetlenen']} tanesi {b['ozet']} özet e-postasında."
+    )
+
+    # ---------------------------------------------------
+    # ⚙️ ALICI POLİTİKALARI
+    # ---------------------------------------------------
+    st.markdown("---")
+    st.subheader("Alıcı Başına Gönderim Politikası")
+    st.caption("Saatlik özet her saat başında, günlük özet her gün aynı saatte gider. "
+               "Özette alıcının o an onayını bekleyen talepler de listelenir.")
+
+    df_p = rehber.tablo()
+    adlar = df_p.dropna(subset=["email"]).drop_duplicates("email").set_index("email")["ad_soyad"]
+    kayitli = politikalar(havuz).set_index("alici")["politika"]
+
+    # Onaycılar ve tercihi kayıtlı herkes listelenir; diğer alıcılar "Anında" kabul edilir.
+    alicilar = sorted(set(df_p["onayci_email"].dropna()) | set(kayitli.index))
+    tablo = pd.DataFrame({
+        "alici": alicilar,
+        "ad_soyad": [adlar.get(a) for a in alicilar],
+        "politika": [POLITIKALAR[kayitli.get(a, "anlik")] for a in alicilar],
+    })
+
+    duzenlenen = st.data_editor(
+        tablo,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "alici": st.column_config.TextColumn("E-posta", required=True),
+            "ad_soyad": st.column_config.TextColumn("Ad Soyad", disabled=True),
+            "politika": st.column_config.SelectboxColumn(
+                "Politika", options=list(POLITIKALAR.values()), default=POLITIKALAR["anlik"], required=True
+            ),
+        },
+        key="bildirim_politika_editor",
+    )
+
+    if st.button("💾 Politikaları Kaydet"):
+        etiketten = {v: k for k, v in POLITIKALAR.items()}
+        secilen = duzenlenen.dropna(subset=["alici", "politika"])
+        kayitlar = [(a, etiketten[p]) for a, p in zip(secilen["alici"], secilen["politika"])]
+        # Tablodan silinen alıcı anında bildirime döner.
+        kayitlar += [(a, "anlik") for a in set(tablo["alici"]) - set(secilen["alici"])]
+        politikalari_ayarla(havuz, kayitlar)
+        posta_iscisi.uyandir()
+        st.success("Bildirim politikaları kaydedildi.")
+        st.rerun()
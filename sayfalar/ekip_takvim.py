@@ -0,0 +1,83 @@
+from datetime import date, timedelta
+
+import altair as alt
+import streamlit as st
+
+from ekip_takvimi import departman_sayimi, kapsama, pencere_izinleri
+from kaynaklar import havuz_getir, rehber_getir
+
+
+# Değişiklik akışında bu sayfayı yenileyen konular.
+def konular(user):
+    if user.rol == "İK":
+        return {"talepler"}
+    return {f"talepler/departman/{user.departman}", f"talepler/onayci/{user.email}"}
+
+
+# ---------------------------------------------------
+# EKİP TAKVİMİ (YÖNETİCİ / İK)
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    rehber = rehber_getir(havuz)
+
+    st.header("🗓️ Ekip İzin Takvimi")
+
+    personel_df = rehber.tablo()
+    kadro = personel_df.groupby("departman").size()
+    if user.rol == "İK":
+        departman_secenekleri = sorted(d for d in kadro.index if d)
+    else:
+        bagli = [p["departman"] for p in rehber.onayciya_bagli(user.email)]
+        departman_secenekleri = sorted({d for d in bagli + [user.departman] if d})
+
+    bugun = date.today()
+    e_col1, e_col2, e_col3 = st.columns([1, 1, 2])
+    e_bas = e_col1.date_input("Başlangıç", bugun.replace(day=1), key="ekip_bas")
+    e_bit = e_col2.date_input("Bitiş", bugun.replace(day=1) + timedelta(days=90), key="ekip_bit")
+    e_dep = e_col3.multiselect("Departmanlar", departman_secenekleri, default=departman_secenekleri,
+                               key="ekip_dep")
+    bekleyen_dahil = st.checkbox("Bekleyen talepleri de göster", key="ekip_bekleyen")
+
+    if e_bit < e_bas or (e_bit - e_bas).days > 366:
+        st.error("Pencere en fazla bir yıl olabilir ve bitiş başlangıçtan önce olamaz.")
+        st.stop()
+
+    durumlar = ("Onaylandı", "Beklemede") if bekleyen_dahil else ("Onaylandı",)
+    izinler = pencere_izinleri(havuz, e_bas, e_bit, departmanlar=e_dep, durumlar=durumlar)
+
+    sayim = departman_sayimi(izinler, e_bas, e_bit)
+    oran = kapsama(sayim, kadro)
+
+    if sayim.empty:
+        st.info("Seçilen pencerede izinli kimse yok.")
+    else:
+        uzun = sayim.stack().rename("izinli").to_frame()
+        uzun["kapsama"] = oran.stack()
+        uzun = uzun.rename_axis(["departman", "gun"]).reset_index()
+
+        isi_haritasi = alt.Chart(uzun).mark_rect().encode(
+            x=alt.X("gun:T", timeUnit="yearmonthdate", title=None),
+            y=alt.Y("departman:N", title=None),
+            color=alt.Color("izinli:Q", scale=alt.Scale(scheme="orangered"), title="İzinli"),
+            tooltip=[
+                alt.Tooltip("departman:N", title="Departman"),
+                alt.Tooltip("gun:T", title="Gün"),
+                alt.Tooltip("izinli:Q", title="İzinli"),
+                alt.Tooltip("kapsama:Q", title="Kapsama", format=".0%"),
+            ],
+        ).properties(height=max(120, 28 * len(sayim)))
+        st.altair_chart(isi_haritasi, use_container_width=True)
+
+        secili_gun = st.date_input("Gün detayı", max(e_bas, min(bugun, e_bit)),
+                                   min_value=e_bas, max_value=e_bit, key="ekip_gun")
+        o_gun = izinler[(izinler["baslangic"] <= secili_gun) & (izinler["bitis"] >= secili_gun)]
+        if o_gun.empty:
+            st.caption("Bu gün izinli kimse yok.")
+        else:
+            st.dataframe(
+                o_gun[["departman", "ad_soyad", "tip", "baslangic", "bitis", "durum"]]
+                .sort_values(["departman", "ad_soyad"]),
+                use_container_width=True,
+                hide_index=True,
+            )
@@ -0,0 +1,103 @@
+from datetime import date
+
+import pandas as pd
+import psycopg2.errors
+import streamlit as st
+
+from bakiye import bakiye_tablosu, hak_kurallari, hak_kurallarini_kaydet, tatilleri_kaydet, varsayilan_tatiller, yil_tatilleri
+from kaynaklar import havuz_getir, takvim_deposu_getir
+from talepler import IZIN_TURLERI
+
+
+# Değişiklik akışında bu sayfayı yenileyen konular.
+def konular(user):
+    return {"talepler", "personellers", "tatil_gunleri"}
+
+
+# ---------------------------------------------------
+# İZİN BAKİYELERİ (İK)
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    takvim_deposu = takvim_deposu_getir(havuz)
+
+    st.header("⚖️ İzin Bakiyeleri ve İş Günü Takvimi")
+
+    bu_yil = date.today().year
+    yil = st.selectbox("Yıl", list(range(bu_yil + 1, bu_yil - 5, -1)), index=1)
+
+    # Bakiyeler talepler tetikleyicisiyle artımlı güncellenir; burada yalnızca okunur.
+    bakiyeler = bakiye_tablosu(havuz, yil)
+    departmanlar = sorted(d for d in bakiyeler["departman"].dropna().unique() if d)
+    b_dep = st.selectbox("Departman", ["Tümü"] + departmanlar, key="bakiye_dep")
+    if b_dep != "Tümü":
+        bakiyeler = bakiyeler[bakiyeler["departman"] == b_dep]
+
+    if bakiyeler.empty:
+        st.info("Gösterilecek bakiye yok. Hak kuralı tanımlı izin türü bulunmuyor olabilir.")
+    else:
+        st.dataframe(
+            bakiyeler[["sicil", "ad_soyad", "departman", "ise_giris", "tip",
+                       "hak", "kullanilan", "bekleyen", "kalan"]],
+            use_container_width=True,
+            hide_index=True,
+        )
+        if bakiyeler["hak"].isna().any():
+            st.caption("İşe giriş tarihi girilmemiş personelin hakkı hesaplanamaz.")
+
+    # ---------------------------------------------------
+    # 📅 RESMİ TATİLLER
+    # ---------------------------------------------------
+    with st.expander(f"📅 {yil} Resmi Tatilleri"):
+        tatiller = yil_tatilleri(havuz, yil)
+        if tatiller.empty:
+            st.info("Bu yıl için tatil girilmemiş; sabit resmi tatiller ve bilinen bayramlar önerildi.")
+            tatiller = pd.DataFrame(varsayilan_tatiller(yil), columns=["tarih", "ad", "yarim_gun"])
+
+        duzenlenen = st.data_editor(
+            tatiller,
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "tarih": st.column_config.DateColumn("Tarih", required=True),
+                "ad": st.column_config.TextColumn("Ad", required=True),
+                "yarim_gun": st.column_config.CheckboxColumn("Yarım Gün", default=False),
+            },
+            key=f"tatil_editor_{yil}",
+        )
+
+        if st.button("💾 Tatilleri Kaydet"):
+            degisen = tatilleri_kaydet(
+                havuz, yil,
+                duzenlenen.dropna(subset=["tarih"]).itertuples(index=False, name=None)
+            )
+            takvim_deposu.gecersiz_kil()
+            st.success(f"Tatiller kaydedildi, {degisen} talebin iş günü sayısı güncellendi.")
+
+    # ---------------------------------------------------
+    # 📏 HAK KURALLARI
+    # ---------------------------------------------------
+    with st.expander("📏 İzin Hak Kuralları"):
+        st.caption("Her izin türü için: en az bu kadar yıl kıdemi olana yılda bu kadar iş günü.")
+        kurallar = st.data_editor(
+            hak_kurallari(havuz),
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "tip": st.column_config.SelectboxColumn("İzin Türü", options=IZIN_TURLERI, required=True),
+                "kidem_yil": st.column_config.NumberColumn("Kıdem (yıl)", min_value=0, step=1, required=True),
+                "gun": st.column_config.NumberColumn("Gün", min_value=0, step=0.5, required=True),
+            },
+            key="hak_editor",
+        )
+
+        if st.button("💾 Kuralları Kaydet"):
+            try:
+                hak_kurallarini_kaydet(havuz, kurallar.dropna().itertuples(index=False, name=None))
+            except psycopg2.errors.UniqueViolation:
+                st.error("Aynı izin türü ve kıdem için birden fazla kural var.")
+                st.stop()
+            st.success("Hak kuralları kaydedildi.")
+            st.rerun()
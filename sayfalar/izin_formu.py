@@ -0,0 +1,73 @@
+from datetime import date
+
+import pandas as pd
+import psycopg2.errors
+import streamlit as st
+
+from bakiye import bakiye_tablosu
+from kaynaklar import (
+    degisiklik_dinleyicisi_getir, havuz_getir, posta_iscisi_getir, rehber_getir, takvim_deposu_getir,
+)
+from talepler import BOLUM_YOK_MESAJI, IZIN_TURLERI, cakisan_talepler, cakisma_mesaji, talep_olustur
+
+
+# Değişiklik akışında bu sayfayı yenileyen konular.
+def konular(user):
+    return {f"talepler/sicil/{user.sicil}"}
+
+
+# ---------------------------------------------------
+# İZİN TALEP FORMU
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    posta_iscisi = posta_iscisi_getir(havuz)
+    rehber = rehber_getir(havuz)
+    takvim_deposu = takvim_deposu_getir(havuz)
+
+    st.header("📝 Yeni İzin Talebi Oluştur")
+
+    bu_yil = date.today().year
+    for b in bakiye_tablosu(havuz, bu_yil, sicil=user.sicil).itertuples():
+        if pd.notna(b.hak):
+            st.caption(
+                f"**{b.tip} ({bu_yil}):** hak {b.hak:g} · kullanılan {b.kullanilan:g} · "
+                f"bekleyen {b.bekleyen:g} · kalan **{b.kalan:g}** iş günü"
+            )
+
+    with st.form("izin_formu"):
+        tip = st.selectbox("İzin Türü", IZIN_TURLERI)
+        baslangic = st.date_input("Başlangıç Tarihi", date.today())
+        bitis = st.date_input("Bitiş Tarihi", date.today())
+        neden = st.text_area("İzin Nedeni")
+
+        if st.form_submit_button("Talebi Gönder"):
+            if bitis < baslangic:
+                st.error("Bitiş tarihi başlangıç tarihinden önce olamaz.")
+                st.stop()
+
+            if (bitis - baslangic).days > 365:
+                st.error("İzin süresi 1 yıldan uzun olamaz.")
+                st.stop()
+
+            try:
+                gun_sayisi = takvim_deposu.takvim().is_gunu(baslangic, bitis)
+            except ValueError as e:
+                st.error(f"İş günü hesaplanamadı: {e}")
+                st.stop()
+
+            # Çakışma kontrolü veritabanındaki kısıtla yapılır; eşzamanlı gönderimlerde de geçerlidir.
+            try:
+                talep_olustur(havuz, rehber, user, tip, baslangic, bitis, neden, gun_sayisi)
+            except psycopg2.errors.ExclusionViolation:
+                st.error(cakisma_mesaji(cakisan_talepler(havuz, user.sicil, baslangic, bitis)))
+                st.stop()
+            except psycopg2.errors.CheckViolation:
+                st.error(BOLUM_YOK_MESAJI)
+                st.stop()
+
+            posta_iscisi.uyandir()
+            # İzinlerim'e geçildiğinde değişiklik olayını beklemeden yeniden okunsun.
+            degisiklik_dinleyicisi_getir(havuz).surum_artir("talepler")
+            st.success(f"İzin talebiniz başarıyla gönderildi! ({gun_sayisi:g} iş günü)")
+            st.rerun()
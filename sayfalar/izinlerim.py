@@ -0,0 +1,218 @@
+import pandas as pd
+import psycopg2.errors
+import streamlit as st
+
+from arsiv import arsivlenmis_yillar
+from kaynaklar import degisiklik_dinleyicisi_getir, havuz_getir, pdf_onbellegi_getir, takvim_deposu_getir
+from onay_akisi import zincir_metni
+from pdf_formu import pdf_verisi
+from talepler import (
+    BOLUM_YOK_MESAJI, IZIN_TURLERI, SurumCakismasi, cakisan_talepler, cakisma_mesaji,
+    kendi_arsiv_talepleri, kendi_talepleri, kendi_yil_sayilari, talep_guncelle, talep_sil,
+)
+
+SAYFA_BOYUTU = 20
+GOSTERILEN_KOLONLAR = ["tip", "baslangic", "bitis", "gun_sayisi", "durum", "onaylayan"]
+
+CAKISMA_UYARISI = ("Bu talep siz açtıktan sonra değişmiş (ör. yöneticiniz karar vermiş ya da silinmiş). "
+                   "Liste yenilendi, lütfen güncel halini kontrol edin.")
+
+
+# Değişiklik akışında bu sayfayı yenileyen konular.
+def konular(user):
+    return {f"talepler/sicil/{user.sicil}"}
+
+
+# Yüklenen sayfalar oturumda tutulur; talepler sürümü değişince aynı sayıda satır baştan okunur.
+def _gecmis(havuz, user, surum):
+    durum = st.session_state.get("izinlerim")
+    if durum is None or durum["sicil"] != user.sicil:
+        durum = {"sicil": user.sicil, "surum": None, "boyut": SAYFA_BOYUTU}
+        st.session_state["izinlerim"] = durum
+    if durum["surum"] != surum:
+        durum["satirlar"], durum["sonraki"] = kendi_talepleri(havuz, user.sicil, boyut=durum["boyut"])
+        durum["yillar"] = kendi_yil_sayilari(havuz, user.sicil)
+        durum["surum"] = surum
+    return durum
+
+
+# Arşivlenmiş yıllar (Parquet) salt okunur gösterilir ve yalnızca istenince okunur.
+def _arsiv(havuz, user):
+    if arsivlenmis_yillar(havuz).empty:
+        return
+    with st.expander("🗄️ Arşivlenmiş Yıllar"):
+        if st.button("Arşivdeki Taleplerimi Göster"):
+            st.session_state["izinlerim_arsiv"] = (user.sicil, kendi_arsiv_talepleri(havuz, user.sicil))
+        sonuc = st.session_state.get("izinlerim_arsiv")
+        if sonuc is not None and sonuc[0] == user.sicil:
+            if sonuc[1].empty:
+                st.info("Arşivlenmiş yıllarda talebiniz bulunmuyor.")
+            else:
+                st.dataframe(sonuc[1][GOSTERILEN_KOLONLAR], use_container_width=True, hide_index=True)
+
+
+def _yil(tarih):
+    return tarih.year if pd.notna(tarih) else None
+
+
+# ---------------------------------------------------
+# İZİNLERİM (DÜZENLE / SİL + PDF)
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    pdf_onbellegi = pdf_onbellegi_getir()
+    takvim_deposu = takvim_deposu_getir(havuz)
+    dinleyici = degisiklik_dinleyicisi_getir(havuz)
+
+    st.header("📑 İzin Taleplerimin Son Durumu")
+
+    durum = _gecmis(havuz, user, dinleyici.surum("talepler"))
+    satirlar = durum["satirlar"]
+
+    if satirlar.empty:
+        st.info("Henüz bir izin talebiniz bulunmuyor.")
+        _arsiv(havuz, user)
+        return
+
+    st.subheader("📋 İzin Listem")
+    st.caption("İşlem yapmak istediğiniz talebi listeden seçin.")
+
+    # ---------------------------------------------------
+    # 📅 YILLARA GÖRE GEÇMİŞ
+    # ---------------------------------------------------
+    # Tablo başına tek seçim; en son değişen tablonun seçimi geçerlidir.
+    onceki_secimler = st.session_state.setdefault("izinlerim_secimler", {})
+    secili_id = st.session_state.get("izinlerim_secili")
+
+    for yil, grup in satirlar.groupby(satirlar["baslangic"].map(_yil), sort=False, dropna=False):
+        yil = None if pd.isna(yil) else int(yil)
+        toplam = durum["yillar"].get(yil, len(grup))
+        baslik = f"**{yil or 'Tarihsiz'}** — {toplam} talep"
+        if len(grup) < toplam:
+            baslik += f" ({len(grup)} tanesi yüklendi)"
+        st.markdown(baslik)
+
+        anahtar = f"izinlerim_{yil}"
+        secim = st.dataframe(
+            grup[GOSTERILEN_KOLONLAR],
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key=anahtar,
+        )
+        idler = grup["id"].iloc[secim.selection.rows].tolist()
+        if idler != onceki_secimler.get(anahtar, []):
+            onceki_secimler[anahtar] = idler
+            secili_id = idler[0] if idler else None
+
+    st.session_state["izinlerim_secili"] = secili_id
+
+    if durum["sonraki"] is not None and st.button("⬇️ Daha Fazla Yükle"):
+        ek, durum["sonraki"] = kendi_talepleri(havuz, user.sicil, sonra=durum["sonraki"], boyut=SAYFA_BOYUTU)
+        durum["satirlar"] = pd.concat([satirlar, ek], ignore_index=True)
+        durum["boyut"] += SAYFA_BOYUTU
+        st.rerun()
+
+    if durum["sonraki"] is None:
+        _arsiv(havuz, user)
+
+    if "izinlerim_mesaj" in st.session_state:
+        tur, mesaj = st.session_state.pop("izinlerim_mesaj")
+        getattr(st, tur)(mesaj)
+
+    secilen = satirlar[satirlar["id"] == secili_id]
+    if secilen.empty:
+        return
+    row = secilen.iloc[0]
+
+    # ---------------------------------------------------
+    # ✏️ SEÇİLEN TALEP: DÜZENLE / SİL
+    # ---------------------------------------------------
+    # İşlemler yüklenmiş satır ve onun sürümüyle yapılır; arada değişen talep SurumCakismasi verir.
+    st.markdown("---")
+    st.subheader(f"✏️ {row['tip']} — {row['baslangic']} → {row['bitis']}")
+    gun = f" · {float(row['gun_sayisi']):g} iş günü" if pd.notna(row["gun_sayisi"]) else ""
+    st.write(f"Durum: **{row['durum']}**{gun}")
+    if isinstance(row["onay_zinciri"], list):
+        adim = int(row["onay_adimi"]) if row["durum"] == "Beklemede" else None
+        st.caption(f"Onay sırası: {zincir_metni(row['onay_zinciri'], adim)}")
+
+    # Yalnızca bekleyen talep değiştirilebilir; karar verilmiş talebin tarihleri yeniden onaysız kaymasın.
+    duzenlenebilir = row["durum"] == "Beklemede"
+    if not duzenlenebilir:
+        st.info("Karar verilmiş talepler değiştirilemez ya da silinemez. Değişiklik için İK ile iletişime geçin.")
+
+    def _bitir(tur, mesaj):
+        dinleyici.surum_artir("talepler")
+        st.session_state["izinlerim_mesaj"] = (tur, mesaj)
+        st.session_state.pop("izinlerim_secili", None)
+        st.rerun()
+
+    if duzenlenebilir:
+        with st.form(f"izin_duzenle_{row['id']}"):
+            yeni_tip = st.selectbox("İzin Türü", IZIN_TURLERI, index=IZIN_TURLERI.index(row["tip"]))
+            yeni_bas = st.date_input("Başlangıç", row["baslangic"])
+            yeni_bit = st.date_input("Bitiş", row["bitis"])
+            yeni_neden = st.text_area("İzin Nedeni", row["neden"])
+            kaydet = st.form_submit_button("Kaydet")
+
+        if kaydet:
+            if yeni_bit < yeni_bas:
+                st.error("Bitiş tarihi başlangıç tarihinden önce olamaz.")
+                st.stop()
+
+            try:
+                yeni_gun = takvim_deposu.takvim().is_gunu(yeni_bas, yeni_bit)
+            except ValueError as e:
+                st.error(f"İş günü hesaplanamadı: {e}")
+                st.stop()
+
+            try:
+                talep_guncelle(havuz, row["id"], row["baslangic"], row["surum"],
+                               yeni_tip, yeni_bas, yeni_bit, yeni_neden, yeni_gun)
+            except psycopg2.errors.ExclusionViolation:
+                st.error(cakisma_mesaji(
+                    cakisan_talepler(havuz, user.sicil, yeni_bas, yeni_bit, haric_id=int(row["id"]))
+                ))
+                st.stop()
+            except psycopg2.errors.CheckViolation:
+                st.error(BOLUM_YOK_MESAJI)
+                st.stop()
+            except SurumCakismasi:
+                _bitir("warning", CAKISMA_UYARISI)
+            _bitir("success", "Talep güncellendi!")
+
+        if st.button("❌ Talebi Sil", key=f"sil_{row['id']}"):
+            try:
+                talep_sil(havuz, row["id"], row["surum"], mevcut_baslangic=row["baslangic"])
+            except SurumCakismasi:
+                _bitir("warning", CAKISMA_UYARISI)
+            _bitir("success", "Talep silindi!")
+
+    # ---------------------------------------------------
+    # 🖨️ ONAYLANAN İZNİN PDF ÇIKTISI
+    # ---------------------------------------------------
+    if row["durum"] == "Onaylandı":
+        # PDF'ler yalnızca istenince üretilir ve süreç genelinde önbelleğe alınır.
+        hazir_pdfler = st.session_state.setdefault("hazir_pdfler", set())
+        talep_id = int(row["id"])
+
+        if talep_id not in hazir_pdfler and st.button("📄 PDF Hazırla", key=f"pdf_{talep_id}"):
+            hazir_pdfler.add(talep_id)
+
+        if talep_id in hazir_pdfler:
+            veri = pdf_verisi(row.to_dict(), {
+                "sicil": user.sicil,
+                "departman": user.departman,
+                "meslek": user.meslek,
+                "cep_telefonu": user.cep_telefonu,
+                "email": user.email,
+            })
+            st.download_button(
+                label="📥 PDF İndir",
+                data=pdf_onbellegi.getir(veri),
+                file_name=f"{user.ad_soyad}_{row['tip'].replace(' ', '_')}_{user.sicil}.pdf",
+                mime="application/pdf",
+                key=f"pdf_indir_{talep_id}"
+            )
@@ -0,0 +1,118 @@
+import streamlit as st
+
+from bildirim import POLITIKALAR, politika_getir, politikalari_ayarla
+from ekip_takvimi import talep_etkisi
+from kaynaklar import havuz_getir, posta_iscisi_getir, rehber_getir
+from onay_akisi import onay_anahtarlari
+from sayfalar.ortak import izinliler_tablosu
+from talepler import onay_kuyrugu, onay_kuyrugu_sayisi, talepleri_sonuclandir
+
+
+# Değişiklik akışında bu sayfayı yenileyen konular.
+def konular(user):
+    return {f"talepler/onayci/{k}" for k in onay_anahtarlari(user)}
+
+
+# ---------------------------------------------------
+# YÖNETİCİ ONAY EKRANI
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    rehber = rehber_getir(havuz)
+    posta_iscisi = posta_iscisi_getir(havuz)
+
+    st.header("⏳ Onayınızı Bekleyen Personel Talepleri")
+    anahtarlar = onay_anahtarlari(user)
+    if len(anahtarlar) > 1:
+        st.caption("İK onay adımındaki talepler de bu listede.")
+
+    # Sonuçlandırılan talepler kuyruktan düştüğü için imleç yığını her işlemden sonra sıfırlanır.
+    if st.session_state.get("onay_kuyruk_sahibi") != user.email:
+        st.session_state["onay_kuyruk_sahibi"] = user.email
+        st.session_state["onay_imlecler"] = [None]
+    imlecler = st.session_state["onay_imlecler"]
+
+    toplam = onay_kuyrugu_sayisi(havuz, anahtarlar)
+    kuyruk, sonraki = onay_kuyrugu(havuz, anahtarlar, imlecler[-1], boyut=25)
+
+    if kuyruk.empty and len(imlecler) == 1:
+        st.info("Şu an onayınızı bekleyen bir talep bulunmuyor.")
+    else:
+        secim = st.dataframe(
+            kuyruk,
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="multi-row",
+            key=f"onay_tablosu_{len(imlecler)}",
+        )
+        secilen_satirlar = kuyruk.iloc[secim.selection.rows]
+        secilen_idler = secilen_satirlar["id"].tolist()
+
+        n_col1, n_col2, n_col3 = st.columns([1, 2, 1])
+        if n_col1.button("◀ Önceki", disabled=len(imlecler) == 1, key="onay_onceki"):
+            imlecler.pop()
+            st.rerun()
+        n_col2.caption(f"Sayfa {len(imlecler)} — toplam {toplam} bekleyen talep, {len(secilen_idler)} seçili")
+        if n_col3.button("Sonraki ▶", disabled=sonraki is None, key="onay_sonraki"):
+            imlecler.append(sonraki)
+            st.rerun()
+
+        o_col, r_col = st.columns(2)
+        onayla = o_col.button("✅ Seçilenleri Onayla", disabled=not secilen_idler)
+        reddet = r_col.button("❌ Seçilenleri Reddet", disabled=not secilen_idler)
+
+        if onayla or reddet:
+            islenen = talepleri_sonuclandir(
+                havuz, anahtarlar, list(zip(secilen_satirlar["id"], secilen_satirlar["baslangic"])), onayla=onayla,
+                onaylayan=f"{user.ad_soyad} ({user.meslek})"
+            )
+            posta_iscisi.uyandir()
+            st.session_state["onay_imlecler"] = [None]
+            st.session_state["onay_sonucu"] = (
+                f"{len(islenen)} talep {'onaylandı' if onayla else 'reddedildi'}."
+                + (" Zinciri devam edenler sonraki onaycıya geçti." if onayla else "")
+            )
+            st.rerun()
+
+        # ---------------------------------------------------
+        # 📅 SEÇİLEN TALEBİN EKİBE ETKİSİ
+        # ---------------------------------------------------
+        if secilen_idler:
+            talep = kuyruk[kuyruk["id"] == secilen_idler[0]].iloc[0]
+            st.markdown("---")
+            st.subheader(f"📅 {talep['ad_soyad']} ({talep['departman'] or '-'}) için ekip durumu")
+            if len(secilen_idler) > 1:
+                st.caption("Birden fazla talep seçili; ilk seçilen gösteriliyor.")
+
+            kadro = rehber.tablo().groupby("departman").size()
+            etki, matris = talep_etkisi(havuz, talep, kadro)
+
+            m1, m2 = st.columns(2)
+            talep_gunleri = etki.loc[str(talep["baslangic"]):str(talep["bitis"])]
+            m1.metric("Talep günlerinde en çok izinli", int(talep_gunleri["talep ile"].max()))
+            if talep_gunleri["talep ile kapsama"].notna().any():
+                m2.metric("En düşük kapsama (onaylanırsa)", f"{talep_gunleri['talep ile kapsama'].min():.0%}")
+
+            st.bar_chart(etki[["izinli", "talep ile"]], stack=False)
+            if not matris.empty:
+                st.dataframe(izinliler_tablosu(matris), use_container_width=True, hide_index=True)
+            else:
+                st.caption("Bu günlerde departmanda onaylı izinli kimse yok.")
+
+    if "onay_sonucu" in st.session_state:
+        st.success(st.session_state.pop("onay_sonucu"))
+
+    # ---------------------------------------------------
+    # 📬 BİLDİRİM TERCİHİ
+    # ---------------------------------------------------
+    with st.expander("📬 Yeni talep bildirimlerim"):
+        mevcut = politika_getir(havuz, user.email)
+        secilen = st.radio(
+            "Gönderim", list(POLITIKALAR), index=list(POLITIKALAR).index(mevcut),
+            format_func=POLITIKALAR.get, horizontal=True, key="bildirim_politikam",
+        )
+        if secilen != mevcut and st.button("💾 Kaydet", key="bildirim_politikam_kaydet"):
+            politikalari_ayarla(havuz, [(user.email, secilen)])
+            posta_iscisi.uyandir()
+            st.success("Bildirim tercihiniz kaydedildi.")
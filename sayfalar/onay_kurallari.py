@@ -0,0 +1,87 @@
+import pandas as pd
+import streamlit as st
+
+from kaynaklar import havuz_getir, rehber_getir
+from onay_akisi import IK_ADIMI, kural_bul, kurallar, kurallari_kaydet, zincir_kur, zincir_metni
+from personel import Kullanici
+from talepler import IZIN_TURLERI
+
+TUM_TURLER = "Tüm türler"
+
+
+# ---------------------------------------------------
+# ONAY KURALLARI (İK)
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    rehber = rehber_getir(havuz)
+
+    st.header("🪜 Onay Kuralları")
+    st.caption(
+        "Talep türüne ve iş günü sayısına göre kaç yönetici kademesinin onaylayacağını ve sonda İK onayı "
+        "gerekip gerekmediğini belirler. Türe özel kural genel kurala, aynı grupta en yüksek eşik düşüğüne "
+        f"üstün gelir. Uyan kural yoksa yalnızca doğrudan onaycı onaylar. Onaycısı olmayan talepler "
+        f"{IK_ADIMI}'ya düşer. Değişiklik yalnızca yeni taleplere uygulanır."
+    )
+
+    tablo = kurallar(havuz)
+    tablo["tip"] = tablo["tip"].fillna(TUM_TURLER)
+
+    duzenlenen = st.data_editor(
+        tablo,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "tip": st.column_config.SelectboxColumn(
+                "İzin Türü", options=[TUM_TURLER, *IZIN_TURLERI], default=TUM_TURLER, required=True
+            ),
+            "en_az_gun": st.column_config.NumberColumn(
+                "En Az İş Günü", min_value=0, step=0.5, default=0, required=True
+            ),
+            "seviye": st.column_config.NumberColumn(
+                "Yönetici Kademesi", min_value=1, max_value=10, step=1, default=1, required=True
+            ),
+            "ik_onayi": st.column_config.CheckboxColumn("Sonda İK Onayı", default=False),
+        },
+        key="onay_kurallari_editor",
+    )
+
+    if st.button("💾 Kuralları Kaydet"):
+        # Tamamen boş satırlar atlanır; eksik kademe kurallari_kaydet'te hata verir.
+        secilen = duzenlenen.dropna(how="all")
+        kayitlar = [
+            (None if pd.isna(tip) or tip == TUM_TURLER else tip, gun, seviye, bool(ik) if pd.notna(ik) else False)
+            for tip, gun, seviye, ik in secilen[["tip", "en_az_gun", "seviye", "ik_onayi"]].itertuples(index=False)
+        ]
+        try:
+            kurallari_kaydet(havuz, kayitlar)
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+        st.success("Onay kuralları kaydedildi.")
+        st.rerun()
+
+    # ---------------------------------------------------
+    # 🔍 ZİNCİR ÖNİZLEME
+    # ---------------------------------------------------
+    st.markdown("---")
+    st.subheader("Zincir Önizleme")
+    st.caption("Kaydedilmiş kurallara ve güncel organizasyon ağacına göre kurulacak onay sırası.")
+
+    p_col1, p_col2, p_col3 = st.columns([2, 2, 1])
+    sicil = p_col1.text_input("Sicil", key="onay_onizleme_sicil").strip()
+    tip = p_col2.selectbox("İzin Türü", IZIN_TURLERI, key="onay_onizleme_tip")
+    gun = p_col3.number_input("İş günü", min_value=0.0, value=1.0, step=0.5, key="onay_onizleme_gun")
+
+    if sicil:
+        kayit = rehber.sicil_ile(sicil)
+        if kayit is None:
+            st.warning("Bu sicille personel bulunamadı.")
+            return
+        with havuz.imlec() as c:
+            seviye, ik_onayi = kural_bul(c, tip, gun)
+        zincir = zincir_kur(rehber, Kullanici(**kayit), seviye, ik_onayi)
+        st.write(f"**{kayit['ad_soyad']}** · {seviye} kademe{' + İK' if ik_onayi else ''}")
+        st.markdown(zincir_metni(zincir))
+
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+import pandas as pd
+import streamlit as st
+
+
+# ---------------------------------------------------
+# İNDİRME DOSYALARI (OTURUM BAŞINA GEÇİCİ DOSYA)
+# ---------------------------------------------------
+def gecici_dosya(anahtar, sonek):
+    # Aynı anahtarla üretilmiş önceki dosya silinir, yeni dosyanın yolu döner.
+    eski = st.session_state.pop(anahtar, None)
+    if eski and os.path.exists(eski):
+        os.remove(eski)
+    fd, yol = tempfile.mkstemp(suffix=sonek)
+    os.close(fd)
+    st.session_state[anahtar] = yol
+    return yol
+
+
+def hazir_dosya_indir(anahtar, etiket, dosya_adi, mime):
+    yol = st.session_state.get(anahtar)
+    if yol and os.path.exists(yol):
+        with open(yol, "rb") as f:
+            st.download_button(label=etiket, data=f, file_name=dosya_adi, mime=mime)
+
+
+def tumu_ise_bos(deger):
+    return None if deger == "Tümü" else deger
+
+
+def izinliler_tablosu(matris):
+    # Gün -> o gün izinli olanlar (kişi x gün matrisinden).
+    return pd.DataFrame({
+        "Gün": matris.columns.date,
+        "İzinli": matris.sum(axis=0).to_numpy(),
+        "Kimler": [", ".join(matris.index[matris[g]]) for g in matris.columns],
+    })
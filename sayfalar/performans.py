@@ -0,0 +1,80 @@
+import pandas as pd
+import streamlit as st
+
+from kaynaklar import (
+    degisiklik_dinleyicisi_getir, havuz_getir, pdf_onbellegi_getir, posta_iscisi_getir, rehber_getir,
+)
+from olcum import DEFTER, OLCUM_ACIK
+
+
+# ---------------------------------------------------
+# PERFORMANS (İK)
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    rehber = rehber_getir(havuz)
+    posta_iscisi = posta_iscisi_getir(havuz)
+    pdf_onbellegi = pdf_onbellegi_getir()
+    dinleyici = degisiklik_dinleyicisi_getir(havuz)
+
+    st.header("⏱️ Performans")
+
+    if not OLCUM_ACIK:
+        st.info("Ölçüm kapalı. Açmak için OLCUM=1 ortam değişkeniyle yeniden başlatın.")
+        st.stop()
+
+    def ek_metrikler():
+        ek = {}
+        for onek, istatistik in (
+            ("izin_havuz_", havuz.istatistik()),
+            ("izin_personel_onbellegi_", rehber.istatistik()),
+            ("izin_pdf_onbellegi_", pdf_onbellegi.istatistik()),
+            ("izin_posta_", posta_iscisi.istatistik()),
+            ("izin_degisiklik_", dinleyici.istatistik()),
+        ):
+            for ad, deger in istatistik.items():
+                ek[onek + ad] = deger
+        return ek
+
+    st.caption(f"Yavaş sorgu eşiği: {DEFTER.yavas_esik * 1000:.0f} ms. "
+               "Değerler süreç başladığından ya da son sıfırlamadan beri birikir.")
+
+    d_col1, d_col2, d_col3 = st.columns(3)
+    d_col1.download_button("📄 JSON", DEFTER.json(ek_metrikler()),
+                           file_name="performans.json", mime="application/json")
+    d_col2.download_button("📊 Prometheus", DEFTER.prometheus(ek_metrikler()),
+                           file_name="performans.prom", mime="text/plain")
+    if d_col3.button("🧹 Sıfırla"):
+        DEFTER.sifirla()
+        st.rerun()
+
+    st.subheader("İşlem süreleri")
+    islemler = DEFTER.islemler()
+    if islemler:
+        st.dataframe(pd.DataFrame.from_dict(islemler, orient="index"), use_container_width=True)
+
+    st.subheader("En çok zaman harcayan sorgular")
+    sorgular = DEFTER.sorgular()
+    if sorgular:
+        st.dataframe(pd.DataFrame(sorgular), use_container_width=True, hide_index=True)
+
+    st.subheader("Yavaş sorgular")
+    yavas = DEFTER.yavas_sorgular()
+    if yavas:
+        df_yavas = pd.DataFrame(yavas)
+        df_yavas["zaman"] = pd.to_datetime(df_yavas["zaman"], unit="s")
+        st.dataframe(df_yavas, use_container_width=True, hide_index=True)
+    else:
+        st.caption("Eşiği aşan sorgu yok.")
+
+    st.subheader("Son çalıştırmalar")
+    izler = DEFTER.izler()
+    if izler:
+        ozet = pd.DataFrame([{k: v for k, v in iz.items() if k != "adimlar"} for iz in izler])
+        ozet["zaman"] = pd.to_datetime(ozet["zaman"], unit="s")
+        st.dataframe(ozet, use_container_width=True)
+        secilen = st.selectbox(
+            "İz", range(len(izler)),
+            format_func=lambda i: f"{ozet['zaman'][i]:%H:%M:%S} · {izler[i]['etiket']} · {izler[i]['sure_ms']:.0f} ms",
+        )
+        st.dataframe(pd.DataFrame(izler[secilen]["adimlar"]), use_container_width=True, hide_index=True)
@@ -0,0 +1,145 @@
+from datetime import date
+
+import pandas as pd
+import psycopg2.errors
+import streamlit as st
+
+from arama import EN_KISA_ARAMA
+from guvenlik import sifre_hashle
+from kaynaklar import havuz_getir, rehber_getir
+from personel import personel_ara
+from personel_aktarimi import FormatHatasi, personel_aktar
+
+
+# Değişiklik akışında bu sayfayı yenileyen konular.
+def konular(user):
+    return {"personellers"}
+
+
+# ---------------------------------------------------
+# PERSONEL YÖNETİMİ (İK)
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    rehber = rehber_getir(havuz)
+
+    st.header("👥 Personel Yönetimi (İK)")
+
+    # ---------------------------------------------------
+    # 🔎 PERSONEL ARAMA (indeksli, sayfalı; tablo belleğe alınmaz)
+    # ---------------------------------------------------
+    st.subheader("Personel Ara")
+    aranan = st.text_input("Ad, sicil, departman ya da e-posta", key="personel_ara",
+                           placeholder="ör. ayse, K000123, bilgi islem").strip()
+    if 0 < len(aranan) < EN_KISA_ARAMA:
+        st.caption(f"Arama en az {EN_KISA_ARAMA} karakterle başlar.")
+        aranan = ""
+
+    # Her sayfanın başlangıç imleci yığında tutulur; arama değişince başa dönülür.
+    if st.session_state.get("personel_ara_imza") != aranan:
+        st.session_state["personel_ara_imza"] = aranan
+        st.session_state["personel_ara_imlecler"] = [None]
+    imlecler = st.session_state["personel_ara_imlecler"]
+
+    df_p, sonraki = personel_ara(havuz, aranan, imlecler[-1])
+    if df_p.empty:
+        st.info("Aramaya uyan personel yok." if aranan else "Sistemde henüz personel kaydı yok.")
+    else:
+        st.dataframe(df_p, use_container_width=True, hide_index=True)
+
+    n_col1, n_col2, n_col3 = st.columns([1, 2, 1])
+    if n_col1.button("◀ Önceki", key="personel_onceki", disabled=len(imlecler) == 1):
+        imlecler.pop()
+        st.rerun()
+    n_col2.caption(f"Sayfa {len(imlecler)}" + (" — en ilgili sonuçlar önce" if aranan else ""))
+    if n_col3.button("Sonraki ▶", key="personel_sonraki", disabled=sonraki is None):
+        imlecler.append(sonraki)
+        st.rerun()
+
+    st.markdown("---")
+    st.subheader("Yeni Personel Ekle")
+
+    with st.form("personel_ekle"):
+        col1, col2 = st.columns(2)
+        sicil = col1.text_input("Sicil")
+        ad_soyad = col2.text_input("Ad Soyad")
+
+        col3, col4 = st.columns(2)
+        sifre = col3.text_input("Şifre")
+        rol_sec = col4.selectbox("Rol", ["Personel", "Yönetici", "İK"])
+
+        meslek = st.text_input("Meslek")
+        departman = st.text_input("Departman")
+        email = st.text_input("Email")
+        onayci_email = st.text_input("Onaycı Email")
+        cep_tel = st.text_input("Cep Telefonu")
+        ise_giris = st.date_input("İşe Giriş Tarihi", value=None, min_value=date(1970, 1, 1))
+
+        if st.form_submit_button("Kaydet"):
+            if not sicil.strip():
+                st.error("Sicil numarası boş bırakılamaz.")
+                st.stop()
+
+            try:
+                with havuz.imlec() as c:
+                    c.execute(
+                        """
+                        INSERT INTO personellers (sicil, ad_soyad, sifre, meslek, departman,
+                                                  email, onayci_email, rol, cep_telefonu, ise_giris)
+                        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                        """,
+                        (sicil.strip(), ad_soyad, sifre_hashle(sifre), meslek, departman, email, onayci_email, rol_sec,
+                         cep_tel, ise_giris)
+                    )
+            except psycopg2.errors.UniqueViolation:
+                st.error("Bu sicil numarası zaten kayıtlı.")
+                st.stop()
+            rehber.gecersiz_kil()
+            st.success("Personel başarıyla eklendi!")
+            st.rerun()
+
+    st.markdown("---")
+    st.subheader("Personel Sil")
+
+    # Seçenekler yukarıdaki aramanın bu sayfasıdır; aynı adlı iki kişi sicille ayrılır.
+    if df_p.empty:
+        st.info("Silinecek personeli yukarıdan arayın.")
+    else:
+        adlar = dict(zip(df_p["sicil"], df_p["ad_soyad"]))
+        silinecek = st.selectbox("Silinecek Personeli Seçin", list(adlar),
+                                 format_func=lambda s: f"{adlar[s]} ({s})")
+
+        if st.button("❌ Personeli Sil"):
+            with havuz.imlec() as c:
+                c.execute("DELETE FROM personellers WHERE sicil=%s", (silinecek,))
+            rehber.gecersiz_kil()
+            st.success(f"{adlar[silinecek]} başarıyla silindi!")
+            st.rerun()
+
+    st.markdown("---")
+    st.subheader("Excel'den Personel İçe Aktar")
+
+    st.info("Excel formatı şu sütunları içermelidir: Sicil, Ad Soyad, Sifre, Meslek, Departman, Email, Onayci_Email, Rol, Cep_Telefonu. "
+            "İsteğe bağlı Ise_Giris sütunu izin hakkı hesabında kullanılır. "
+            "Mevcut siciller güncellenir (şifre hariç), yeni siciller eklenir.")
+
+    uploaded_file = st.file_uploader("Personel Excel Dosyası Yükle", type=["xlsx"])
+
+    if uploaded_file is not None and st.button("📤 İçe Aktar"):
+        try:
+            rapor = personel_aktar(havuz, uploaded_file)
+        except FormatHatasi as e:
+            st.error(f"Excel formatı hatalı. Lütfen belirtilen sütun adlarını birebir kullanın. ({e})")
+        except Exception as e:
+            st.error(f"Excel içe aktarılırken hata: {e}")
+        else:
+            rehber.gecersiz_kil()
+            st.success(
+                f"{rapor.eklenen} personel eklendi, {rapor.guncellenen} personel güncellendi, "
+                f"{rapor.reddedilen} satır reddedildi."
+            )
+            if rapor.hatalar:
+                st.dataframe(
+                    pd.DataFrame(rapor.hatalar, columns=["Excel Satırı", "Sicil", "Sebep"]),
+                    use_container_width=True
+                )
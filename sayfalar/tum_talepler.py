@@ -0,0 +1,214 @@
+import os
+from datetime import date
+
+import streamlit as st
+
+from arama import EN_KISA_ARAMA, trigram_var
+from arsiv import arsiv_oku, arsivlenmis_yillar
+from bordro import aylik_bordro, bordro_csv_yaz, bordro_parquet_yaz
+from disa_aktarim import DISA_AKTARIM_KOLONLARI, talepleri_csv_yaz, talepleri_excel_yaz
+from kaynaklar import (
+    degisiklik_dinleyicisi_getir, havuz_getir, rehber_getir, takvim_deposu_getir, talep_sayisi_getir,
+)
+from pdf_formu import toplu_pdf_zip
+from sayfalar.ortak import gecici_dosya, hazir_dosya_indir, tumu_ise_bos
+from talepler import DURUMLAR, ILGI, ILGI_ADAY, IZIN_TURLERI, TalepFiltresi, talep_sil, talep_sayfasi
+
+
+# Değişiklik akışında bu sayfayı yenileyen konular.
+def konular(user):
+    return {"talepler"}
+
+
+# ---------------------------------------------------
+# İK GENEL TAKİP
+# ---------------------------------------------------
+def goster(user):
+    havuz = havuz_getir()
+    rehber = rehber_getir(havuz)
+
+    st.header("📊 Şirket Geneli Tüm İzin Hareketleri")
+
+    # ---------------------------------------------------
+    # 🔎 FİLTRE (SQL'e itilir)
+    # ---------------------------------------------------
+    departmanlar = sorted(d for d in rehber.tablo()["departman"].dropna().unique() if d)
+    f_ara = st.text_input("🔎 Ara (ad, sicil, departman, izin nedeni)", key="ik_ara",
+                          placeholder="ör. mehmet kaya, K000123, satış").strip()
+    if 0 < len(f_ara) < EN_KISA_ARAMA:
+        st.caption(f"Arama en az {EN_KISA_ARAMA} karakterle başlar.")
+        f_ara = ""
+    f_col1, f_col2, f_col3, f_col4, f_col5 = st.columns(5)
+    f_bas = f_col1.date_input("Başlangıç", value=None, key="ik_bas")
+    f_bit = f_col2.date_input("Bitiş", value=None, key="ik_bit")
+    f_dep = f_col3.selectbox("Departman", ["Tümü"] + departmanlar, key="ik_dep")
+    f_durum = f_col4.selectbox("Durum", ["Tümü"] + DURUMLAR, key="ik_durum")
+    f_tip = f_col5.selectbox("İzin Türü", ["Tümü"] + IZIN_TURLERI, key="ik_tip")
+
+    s_col1, s_col2, s_col3, s_col4 = st.columns([2, 1, 1, 1])
+    f_personel = s_col1.text_input("Personel (sicil / ad)", key="ik_personel")
+    siralamalar = {"ID": "id", "Başlangıç": "baslangic", "Ad Soyad": "ad_soyad"}
+    if f_ara:
+        siralamalar = {"İlgililik": ILGI, **siralamalar}
+    siralama = siralamalar[s_col2.selectbox("Sırala", list(siralamalar), key="ik_sirala")]
+    if siralama == ILGI:
+        st.caption(f"İlgililik, aramaya uyan en yeni {ILGI_ADAY} talep içinde sıralanır.")
+    azalan = s_col3.selectbox("Yön", ["Azalan", "Artan"], key="ik_yon") == "Azalan"
+    boyut = s_col4.selectbox("Sayfa boyutu", [25, 50, 100, 200], index=1, key="ik_boyut")
+
+    filtre = TalepFiltresi(
+        baslangic=f_bas,
+        bitis=f_bit,
+        departman=tumu_ise_bos(f_dep),
+        durum=tumu_ise_bos(f_durum),
+        tip=tumu_ise_bos(f_tip),
+        personel=f_personel.strip() or None,
+        arama=f_ara or None,
+        bulanik=bool(f_ara) and trigram_var(havuz),
+    )
+
+    # ---------------------------------------------------
+    # 📄 SAYFALI TABLO (keyset; OFFSET yok)
+    # ---------------------------------------------------
+    # Her sayfanın başlangıç imleci yığında tutulur; filtre/sıralama değişince başa dönülür.
+    imza = (filtre, siralama, azalan, boyut)
+    if st.session_state.get("ik_grid_imza") != imza:
+        st.session_state["ik_grid_imza"] = imza
+        st.session_state["ik_grid_imlecler"] = [None]
+    imlecler = st.session_state["ik_grid_imlecler"]
+
+    df_sayfa, sonraki = talep_sayfasi(havuz, filtre, siralama, azalan, imlecler[-1], boyut)
+    toplam = talep_sayisi_getir(filtre, degisiklik_dinleyicisi_getir(havuz).surum("talepler"))
+    # İlgililik sıralaması yalnızca en yeni ILGI_ADAY eşleşmeyi sayfalar; sayfa sayısı da ona göre.
+    gezilebilir = min(toplam, ILGI_ADAY) if siralama == ILGI else toplam
+    sayfa_sayisi = max(1, -(-gezilebilir // boyut))
+
+    st.dataframe(df_sayfa, use_container_width=True, hide_index=True)
+
+    n_col1, n_col2, n_col3 = st.columns([1, 2, 1])
+    if n_col1.button("◀ Önceki", disabled=len(imlecler) == 1):
+        imlecler.pop()
+        st.rerun()
+    sayac = f"Sayfa {len(imlecler)} / {sayfa_sayisi} — toplam {toplam} talep"
+    if gezilebilir < toplam:
+        sayac += f" (en yeni {ILGI_ADAY} sıralandı)"
+    n_col2.caption(sayac)
+    if n_col3.button("Sonraki ▶", disabled=sonraki is None):
+        imlecler.append(sonraki)
+        st.rerun()
+
+    # ---------------------------------------------------
+    # 📥 EXCEL / CSV (yalnızca istenince üretilir)
+    # ---------------------------------------------------
+    with st.expander("📥 Filtrelenmiş Talepleri Dışa Aktar (Excel / CSV)"):
+        bicim = st.radio("Biçim", ["Excel", "CSV"], horizontal=True, key="disa_bicim")
+
+        if st.button("Dosyayı Hazırla"):
+            with st.spinner("Dosya hazırlanıyor..."):
+                if bicim == "Excel":
+                    yol = gecici_dosya("talep_disa_aktarim", ".xlsx")
+                    adet = talepleri_excel_yaz(havuz, yol, filtre)
+                else:
+                    yol = gecici_dosya("talep_disa_aktarim", ".csv")
+                    with open(yol, "wb") as f:
+                        adet = talepleri_csv_yaz(havuz, f, filtre)
+            st.session_state["talep_disa_bicim"] = bicim
+            st.success(f"{adet} talep dışa aktarıldı.")
+
+        if st.session_state.get("talep_disa_bicim") == "CSV":
+            hazir_dosya_indir("talep_disa_aktarim", "📥 CSV İndir", "tum_talepler.csv", "text/csv")
+        else:
+            hazir_dosya_indir(
+                "talep_disa_aktarim", "📥 Excel Olarak İndir", "tum_talepler.xlsx",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+
+    # ---------------------------------------------------
+    # 🧾 AYLIK BORDRO İZİN DÖKÜMÜ
+    # ---------------------------------------------------
+    with st.expander("🧾 Aylık Bordro İzin Dökümü (CSV / Parquet)"):
+        st.caption("Seçilen ayda onaylı izinlerin sicil ve izin türü başına iş günü toplamı. "
+                   "Ay sınırını aşan izinlerin yalnızca bu aya düşen günleri sayılır; yukarıdaki filtre uygulanmaz.")
+        bugun = date.today()
+        b_col1, b_col2, b_col3 = st.columns(3)
+        b_yil = b_col1.number_input("Yıl", min_value=2000, max_value=2100, value=bugun.year, step=1, key="bordro_yil")
+        b_ay = b_col2.selectbox("Ay", list(range(1, 13)), index=bugun.month - 1, key="bordro_ay")
+        b_bicim = b_col3.radio("Biçim", ["CSV", "Parquet"], horizontal=True, key="bordro_bicim")
+
+        if st.button("Dökümü Hazırla"):
+            with st.spinner("İş günleri hesaplanıyor..."):
+                tablo = aylik_bordro(havuz, takvim_deposu_getir(havuz).takvim(), int(b_yil), b_ay)
+                yol = gecici_dosya("bordro_dokumu", ".csv" if b_bicim == "CSV" else ".parquet")
+                with open(yol, "wb") as f:
+                    (bordro_csv_yaz if b_bicim == "CSV" else bordro_parquet_yaz)(tablo, f)
+            st.session_state["bordro_dokumu_adi"] = f"bordro_izin_{int(b_yil)}_{b_ay:02d}.{b_bicim.lower()}"
+            st.success(f"{len(tablo)} personelin izin günleri yazıldı.")
+
+        dosya_adi = st.session_state.get("bordro_dokumu_adi", "")
+        if dosya_adi.endswith(".csv"):
+            hazir_dosya_indir("bordro_dokumu", "📥 CSV İndir", dosya_adi, "text/csv")
+        else:
+            hazir_dosya_indir("bordro_dokumu", "📥 Parquet İndir", dosya_adi, "application/vnd.apache.parquet")
+
+    # ---------------------------------------------------
+    # 🗄️ ARŞİVLENMİŞ YILLAR (Parquet, yalnızca istenince okunur)
+    # ---------------------------------------------------
+    arsiv = arsivlenmis_yillar(havuz)
+    if not arsiv.empty:
+        with st.expander("🗄️ Arşivlenmiş Yıllar"):
+            st.caption("Bu yılların talepleri tablodan arşiv dosyasına taşındı; "
+                       "yukarıdaki liste ve dışa aktarım onları içermez. Aynı filtre burada da uygulanır.")
+            dosyalar = dict(zip(arsiv["yil"], arsiv["dosya"]))
+            yil = st.selectbox("Yıl", list(dosyalar), index=len(dosyalar) - 1, key="arsiv_yil")
+
+            if st.button("Arşivde Ara"):
+                if not os.path.exists(dosyalar[yil]):
+                    st.error(f"Arşiv dosyası bulunamadı: {dosyalar[yil]}")
+                    st.stop()
+                basliklar = {k.split(".", 1)[1]: b for k, b in DISA_AKTARIM_KOLONLARI}
+                df_arsiv = arsiv_oku(dosyalar[yil], filtre)[list(basliklar)].rename(columns=basliklar)
+                st.session_state["arsiv_sonucu"] = ((yil, filtre), df_arsiv)
+
+            # Yıl ya da filtre değişince eski sonuç gösterilmez.
+            sonuc = st.session_state.get("arsiv_sonucu")
+            if sonuc is not None and sonuc[0] == (yil, filtre):
+                df_arsiv = sonuc[1]
+                st.caption(f"{len(df_arsiv)} talep")
+                st.dataframe(df_arsiv, use_container_width=True, hide_index=True)
+                st.download_button(
+                    "📥 CSV İndir", df_arsiv.to_csv(index=False).encode("utf-8-sig"),
+                    file_name=f"arsiv_talepler_{yil}.csv", mime="text/csv"
+                )
+
+    # ---------------------------------------------------
+    # 📦 TOPLU PDF (ZIP)
+    # ---------------------------------------------------
+    with st.expander("📦 Onaylı İzin Formlarını Toplu İndir (ZIP)"):
+        st.caption("Yukarıdaki filtreye uyan onaylı talepler için form üretilir.")
+
+        if st.button("ZIP Oluştur"):
+            cubuk = st.progress(0.0, text="PDF'ler hazırlanıyor...")
+
+            def _ilerleme(yazilan, toplam):
+                cubuk.progress(yazilan / toplam if toplam else 1.0, text=f"{yazilan} / {toplam} form")
+
+            yol = gecici_dosya("toplu_pdf_zip", ".zip")
+            with open(yol, "wb") as f:
+                adet = toplu_pdf_zip(havuz, f, filtre, ilerleme=_ilerleme)
+            st.success(f"{adet} form ZIP dosyasına eklendi.")
+
+        hazir_dosya_indir("toplu_pdf_zip", "📥 ZIP İndir", "onayli_izin_formlari.zip", "application/zip")
+
+    sil_id = st.number_input("Silinecek izin ID", min_value=1, step=1)
+    if st.button("❌ Bu İzni Sil"):
+        talep_sil(havuz, sil_id)
+        degisiklik_dinleyicisi_getir(havuz).surum_artir("talepler")
+        st.success("İzin silindi!")
+        st.rerun()
+    if st.button("⚠️ Tüm İzin Taleplerini Sil"):
+        with havuz.imlec() as c:
+            c.execute("DELETE FROM talepler")
+        degisiklik_dinleyicisi_getir(havuz).surum_artir("talepler")
+        st.session_state.pop("ik_grid_imza", None)
+        st.success("Tüm izin talepleri silindi!")
+        st.rerun()
@@ -0,0 +1,421 @@
+import os
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+
+from arama import TALEP_BELGESI, arama_kosulu, skor_ifadesi
+from arsiv import arsiv_oku, arsivlenmis_yillar
+from bildirim import bildirimleri_ekle
+from onay_akisi import alicilar, kural_bul, zincir_kur
+
+IZIN_TURLERI = [
+    "Yıllık İzin", "Mazeret İzni", "Ücretsiz İzin", "Raporlu İzin",
+    "Doğum İzni", "Babalık İzni", "Evlenme İzni", "Cenaze İzni"
+]
+
+DURUMLAR = ["Beklemede", "Onaylandı", "Reddedildi"]
+
+
+# ---------------------------------------------------
+# TALEP FİLTRESİ (SQL'E İTİLİR)
+# ---------------------------------------------------
+@dataclass(frozen=True)
+class TalepFiltresi:
+    # baslangic/bitis: talebin bu aralıkla kesişmesi yeterlidir.
+    baslangic: date | None = None
+    bitis: date | None = None
+    departman: str | None = None
+    durum: str | None = None
+    tip: str | None = None
+    sicil: str | None = None
+    # Sicil ile birebir ya da ad soyadın başıyla eşleşir.
+    personel: str | None = None
+    # Ad, sicil, departman ve nedende kelime ön eki araması (arama.py); bulanık ise adda trigram.
+    arama: str | None = None
+    bulanik: bool = False
+
+    def sql(self, t="t"):
+        """(WHERE koşulu, parametreler) döndürür; koşul yoksa 'TRUE'."""
+        kosul, params = [], []
+        if self.baslangic is not None:
+            kosul.append(f"{t}.bitis >= %s")
+            params.append(self.baslangic)
+        if self.bitis is not None:
+            kosul.append(f"{t}.baslangic <= %s")
+            params.append(self.bitis)
+        for kolon in ("departman", "durum", "tip", "sicil"):
+            deger = getattr(self, kolon)
+            if deger:
+                kosul.append(f"{t}.{kolon} = %s")
+                params.append(deger)
+        if self.personel:
+            desen = self.personel.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            kosul.append(f"({t}.sicil = %s OR {t}.ad_soyad LIKE %s)")
+            params.extend([self.personel, desen])
+        if self.arama:
+            k, p = arama_kosulu(TALEP_BELGESI.format(t=t), f"{t}.ad_soyad", self.arama, self.bulanik)
+            kosul.append(k)
+            params.extend(p)
+        return (" AND ".join(kosul) or "TRUE"), params
+
+
+# ---------------------------------------------------
+# TARİH ÇAKIŞMASI
+# ---------------------------------------------------
+# Kural veritabanında (migrasyon 8) uygulanır ve ihlalde ExclusionViolation fırlatılır;
+# bu sorgu yalnızca kullanıcıya hangi talebin çakıştığını göstermek içindir.
+def cakisan_talepler(havuz, sicil, baslangic, bitis, haric_id=None):
+    with havuz.imlec() as c:
+        c.execute("""
+            SELECT id, tip, baslangic, bitis, durum
+            FROM talepler
+            WHERE sicil = %s
+              AND donem && daterange(%s, %s, '[]')
+              AND baslangic <= %s
+              AND durum IS DISTINCT FROM 'Reddedildi'
+              AND id IS DISTINCT FROM %s
+            ORDER BY baslangic
+        """, (sicil, baslangic, bitis, bitis, haric_id))
+        return c.fetchall()
+
+
+def cakisma_mesaji(cakisanlar):
+    satirlar = [f"#{i} {tip}: {bas} → {bit} ({durum})" for i, tip, bas, bit, durum in cakisanlar]
+    return "Bu tarihler mevcut izin talebinizle çakışıyor:  \n" + "  \n".join(satirlar)
+
+
+# talepler başlangıç yılına göre bölümlüdür (arsiv.py); bölümü olmayan bir yıla düşen
+# talep CheckViolation ile reddedilir.
+BOLUM_YOK_MESAJI = ("Bu başlangıç tarihi için talep kaydedilemiyor: o yıl henüz açılmamış "
+                    "ya da arşivlenmiş. Lütfen İK ile iletişime geçin.")
+
+
+# ---------------------------------------------------
+# KİŞİSEL GEÇMİŞ (İZİNLERİM)
+# ---------------------------------------------------
+KENDI_KOLONLARI = [
+    "id", "surum", "ad_soyad", "tip", "baslangic", "bitis", "gun_sayisi", "neden",
+    "durum", "onaylayan", "onay_tarihi", "guncellendi", "onay_zinciri", "onay_adimi",
+]
+
+_KENDI_SIRASI = "COALESCE(baslangic, DATE '9999-12-31')"
+
+
+class SurumCakismasi(Exception):
+    """Talep okunduktan sonra başkası tarafından değiştirilmiş ya da silinmiş."""
+
+
+def kendi_talepleri(havuz, sicil, sonra=None, boyut=20):
+    """Personelin taleplerinden, en yeni başlangıçtan geriye bir sayfa ve sonraki imleci döndürür.
+
+    İmleç son satırın (sıra tarihi, id) çiftidir; sayfa maliyeti geçmişin uzunluğundan bağımsızdır.
+    Tabloda kalan tüm yıllar okunur; arşivlenmiş yıllar için kendi_arsiv_talepleri.
+    """
+    kosul, params = "", [sicil]
+    if sonra is not None:
+        kosul = f"AND ({_KENDI_SIRASI}, id) < (%s, %s)"
+        params += list(sonra)
+
+    with havuz.imlec() as c:
+        c.execute(f"""
+            SELECT {", ".join(KENDI_KOLONLARI)}, {_KENDI_SIRASI}
+            FROM talepler
+            WHERE sicil = %s {kosul}
+            ORDER BY {_KENDI_SIRASI} DESC, id DESC
+            LIMIT %s
+        """, params + [boyut + 1])
+        satirlar = c.fetchall()
+
+    sonraki = None
+    if len(satirlar) > boyut:
+        satirlar = satirlar[:boyut]
+        sonraki = (satirlar[-1][-1], satirlar[-1][0])
+    return pd.DataFrame([s[:-1] for s in satirlar], columns=KENDI_KOLONLARI), sonraki
+
+
+def kendi_yil_sayilari(havuz, sicil):
+    """{yıl: talep sayısı}; başlangıcı olmayan talepler None yılında sayılır."""
+    with havuz.imlec() as c:
+        c.execute("""
+            SELECT extract(year FROM baslangic)::int, count(*)
+            FROM talepler
+            WHERE sicil = %s
+            GROUP BY 1
+        """, (sicil,))
+        return dict(c.fetchall())
+
+
+def kendi_arsiv_talepleri(havuz, sicil):
+    """Personelin arşivlenmiş yıllardaki talepleri (en yeni başlangıç önce); dosyası olmayan yıl atlanır."""
+    filtre = TalepFiltresi(sicil=sicil)
+    parcalar = [arsiv_oku(dosya, filtre)[KENDI_KOLONLARI]
+                for dosya in arsivlenmis_yillar(havuz)["dosya"] if os.path.exists(dosya)]
+    if not parcalar:
+        return pd.DataFrame(columns=KENDI_KOLONLARI)
+    return (pd.concat(parcalar, ignore_index=True)
+            .sort_values(["baslangic", "id"], ascending=False).reset_index(drop=True))
+
+
+def talep_olustur(havuz, rehber, kullanici, tip, baslangic, bitis, neden, gun_sayisi):
+    """Yeni talebi onay zinciriyle ekler ve ilk onaycının bildirimini aynı işlemde kuyruğa yazar; id döndürür.
+
+    Çakışan tarihlerde veritabanı ExclusionViolation fırlatır.
+    """
+    with havuz.imlec() as c:
+        zincir = zincir_kur(rehber, kullanici, *kural_bul(c, tip, gun_sayisi))
+        c.execute("""
+            INSERT INTO talepler (sicil, ad_soyad, departman, meslek, tip, baslangic, bitis, neden,
+                                  gun_sayisi, durum, onay_zinciri, onay_adimi, bekleyen_onayci)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,'Beklemede',%s,1,%s)
+            RETURNING id
+        """, (
+            kullanici.sicil,
+            kullanici.ad_soyad,
+            kullanici.departman,
+            kullanici.meslek,
+            tip,
+            baslangic,
+            bitis,
+            neden,
+            gun_sayisi,
+            zincir,
+            zincir[0]
+        ))
+        talep_id = c.fetchone()[0]
+
+        bildirimleri_ekle(c, [
+            (alici, "Yeni İzin Talebi", f"{kullanici.ad_soyad} tarafından yeni bir izin talebi oluşturuldu.")
+            for alici in alicilar(c, zincir[0])
+        ])
+    return talep_id
+
+
+def talep_guncelle(havuz, talep_id, mevcut_baslangic, surum, tip, baslangic, bitis, neden, gun_sayisi):
+    """Talep hâlâ bekliyor ve okunduğu sürümdeyse günceller, yeni sürümü döndürür; değilse SurumCakismasi.
+
+    Karar verilmiş talep değiştirilemez; yoksa onaylı izin yeniden onaysız kayardı.
+    mevcut_baslangic okunan satırınkidir; birincil anahtarın parçası olduğundan sorgu tek bölüme iner.
+    """
+    with havuz.imlec() as c:
+        c.execute("""
+            UPDATE talepler
+            SET tip=%s, baslangic=%s, bitis=%s, neden=%s, gun_sayisi=%s
+            WHERE id=%s AND baslangic=%s AND surum=%s AND durum = 'Beklemede'
+            RETURNING surum
+        """, (tip, baslangic, bitis, neden, gun_sayisi, int(talep_id), mevcut_baslangic, int(surum)))
+        satir = c.fetchone()
+    if satir is None:
+        raise SurumCakismasi(talep_id)
+    return satir[0]
+
+
+def talep_sil(havuz, talep_id, surum=None, mevcut_baslangic=None):
+    """İK silmesi koşulsuzdur. Personel yolunda (surum verilirse) yalnızca o sürümdeki bekleyen
+    talep silinir, değilse SurumCakismasi. mevcut_baslangic verilirse yalnızca o bölüme inilir."""
+    kosul, params = "id=%s", [int(talep_id)]
+    if mevcut_baslangic is not None:
+        kosul += " AND baslangic=%s"
+        params.append(mevcut_baslangic)
+    with havuz.imlec() as c:
+        if surum is None:
+            c.execute(f"DELETE FROM talepler WHERE {kosul}", params)
+        else:
+            c.execute(f"DELETE FROM talepler WHERE {kosul} AND surum=%s AND durum = 'Beklemede'",
+                      params + [int(surum)])
+            if c.rowcount == 0:
+                raise SurumCakismasi(talep_id)
+        return c.rowcount
+
+
+# ---------------------------------------------------
+# KEYSET SAYFALAMA
+# ---------------------------------------------------
+# Sıralama ifadeleri migrasyon 6'daki (ifade, id) indeksleriyle birebir aynıdır;
+# NULL değerler sabit bir uca çekilir ki satır karşılaştırması her zaman tanımlı olsun.
+SIRALAMALAR = {
+    "id": "t.id",
+    "baslangic": "COALESCE(t.baslangic, DATE '9999-12-31')",
+    "ad_soyad": "COALESCE(t.ad_soyad, '')",
+}
+# "ilgi" yalnızca filtrede arama metni varken anlamlıdır; ifadesi metne göre kurulur. Skor satır
+# başına pahalı olduğundan yalnızca en yeni ILGI_ADAY eşleşme puanlanır ("kıyas" gibi geniş bir
+# arama yüz binlerce talebe uyabilir).
+ILGI = "ilgi"
+ILGI_ADAY = 1000
+
+GRID_KOLONLARI = [
+    "id", "sicil", "ad_soyad", "departman", "meslek", "tip",
+    "baslangic", "bitis", "gun_sayisi", "neden", "durum", "onaylayan", "onay_tarihi",
+]
+
+
+def talep_sayfasi(havuz, filtre, siralama="id", azalan=True, sonra=None, boyut=50):
+    """Bir sayfa talep ve sonraki sayfanın imlecini döndürür (son sayfada None).
+
+    `sonra`, önceki sayfanın son satırının (sıralama değeri, id) ikilisidir;
+    sorgu OFFSET kullanmaz, her sayfa indeksten doğrudan okunur.
+    """
+    kaynak, kaynak_params = "talepler t", []
+    kosul, params = filtre.sql("t")
+    if siralama != ILGI:
+        ifade, ifade_params = SIRALAMALAR[siralama], []
+    elif filtre.arama:
+        ifade, ifade_params = skor_ifadesi("t.ad_soyad", filtre.arama, filtre.bulanik)
+        kaynak = f"(SELECT * FROM talepler t WHERE {kosul} ORDER BY t.id DESC LIMIT %s) t"
+        kaynak_params, kosul, params = params + [ILGI_ADAY], "TRUE", []
+    else:
+        ifade, ifade_params = SIRALAMALAR["id"], []
+    yon, karsilastirma = ("DESC", "<") if azalan else ("ASC", ">")
+
+    if sonra is not None:
+        kosul += f" AND ({ifade}, t.id) {karsilastirma} (%s, %s)"
+        params = params + ifade_params + list(sonra)
+
+    kolonlar = ", ".join(f"t.{k}" for k in GRID_KOLONLARI)
+    with havuz.imlec() as c:
+        c.execute(f"""
+            SELECT {kolonlar}, {ifade} AS _sira
+            FROM {kaynak}
+            WHERE {kosul}
+            ORDER BY _sira {yon}, t.id {yon}
+            LIMIT %s
+        """, ifade_params + kaynak_params + params + [boyut + 1])
+        satirlar = c.fetchall()
+
+    sonraki = None
+    if len(satirlar) > boyut:
+        satirlar = satirlar[:boyut]
+        son = satirlar[-1]
+        sonraki = (son[-1], son[0])
+
+    df = pd.DataFrame([s[:-1] for s in satirlar], columns=GRID_KOLONLARI)
+    return df, sonraki
+
+
+def talep_sayisi(havuz, filtre):
+    kosul, params = filtre.sql("t")
+    with havuz.imlec() as c:
+        c.execute(f"SELECT count(*) FROM talepler t WHERE {kosul}", params)
+        return c.fetchone()[0]
+
+
+# ---------------------------------------------------
+# ONAY KUYRUĞU
+# ---------------------------------------------------
+KUYRUK_KOLONLARI = [
+    "id", "sicil", "ad_soyad", "departman", "tip", "baslangic", "bitis", "gun_sayisi", "neden", "asama",
+]
+_KUYRUK_IFADELERI = {"asama": "t.onay_adimi || '/' || cardinality(t.onay_zinciri)"}
+
+# Sırası gelen onaycı talepte tutulur (migrasyon 16); kuyruk, zincir ne kadar uzun olursa olsun
+# talepler_bekleyen_onayci_idx üzerinde tek bir okumadır. Tarih sınırı konmaz: bekleyen talep hangi
+# yılda olursa olsun kuyrukta görünmelidir, her bölümün dar kısmi indeksine inmek ucuzdur.
+_KUYRUK_KAYNAGI = """
+    FROM talepler t
+    WHERE t.bekleyen_onayci = ANY(%s) AND t.durum = 'Beklemede'
+"""
+
+
+def onay_kuyrugu(havuz, onaycilar, sonra=None, boyut=25):
+    """Sırası bu onaycılarda olan bekleyen taleplerden bir sayfa ve sonraki imleci (son id) döndürür.
+
+    `onaycilar` onay_akisi.onay_anahtarlari(kullanici) listesidir.
+    """
+    kolonlar = ", ".join(_KUYRUK_IFADELERI.get(k, f"t.{k}") for k in KUYRUK_KOLONLARI)
+    kosul, params = "", [list(onaycilar)]
+    if sonra is not None:
+        kosul = "AND t.id > %s"
+        params.append(sonra)
+
+    with havuz.imlec() as c:
+        c.execute(f"""
+            SELECT {kolonlar}
+            {_KUYRUK_KAYNAGI} {kosul}
+            ORDER BY t.id
+            LIMIT %s
+        """, params + [boyut + 1])
+        satirlar = c.fetchall()
+
+    sonraki = None
+    if len(satirlar) > boyut:
+        satirlar = satirlar[:boyut]
+        sonraki = satirlar[-1][0]
+    return pd.DataFrame(satirlar, columns=KUYRUK_KOLONLARI), sonraki
+
+
+def onay_kuyrugu_sayisi(havuz, onaycilar):
+    with havuz.imlec() as c:
+        c.execute(f"SELECT count(*) {_KUYRUK_KAYNAGI}", (list(onaycilar),))
+        return c.fetchone()[0]
+
+
+def talepleri_sonuclandir(havuz, onaycilar, secilenler, onayla, onaylayan=None, tarih=None):
+    """Seçilen (id, baslangic) taleplerde sırası bu onaycılarda olan adımı tek işlemde onaylar ya da reddeder.
+
+    Onaylanan adım zincirin sonuncusuysa talep onaylanır ve personele bildirim gider; değilse
+    talep sonraki onaycıya geçer ve ona bildirim gider. Ret hangi adımda olursa olsun talebi
+    kapatır. Yalnızca hâlâ bekleyen ve sırası bu onaycılarda olan talepler güncellenir;
+    güncellenen id listesi döner.
+    """
+    if not secilenler:
+        return []
+    tarih = tarih or date.today()
+    # baslangic listesi yalnızca bölüm budaması içindir; id zaten tekildir.
+    kosul = ("t.id = ANY(%s) AND t.baslangic = ANY(%s) "
+             "AND t.durum = 'Beklemede' AND t.bekleyen_onayci = ANY(%s)")
+    kosul_params = [[int(i) for i, _ in secilenler], sorted({b for _, b in secilenler}), list(onaycilar)]
+    # Her adımın kararı onay_notu'na bir satır olarak eklenir.
+    not_ifadesi = ("concat_ws(E'\\n', t.onay_notu, "
+                   "%s || ' (' || t.onay_adimi || '/' || cardinality(t.onay_zinciri) || ').')")
+    kisi_emaili = "(SELECT p.email FROM personellers p WHERE p.sicil = t.sicil LIMIT 1)"
+
+    with havuz.imlec() as c:
+        if not onayla:
+            c.execute(f"""
+                UPDATE talepler t
+                SET durum = 'Reddedildi', bekleyen_onayci = NULL, onay_notu = {not_ifadesi}
+                WHERE {kosul}
+                RETURNING t.id, t.ad_soyad, {kisi_emaili}
+            """, [f"{onaylayan} tarafından {tarih} tarihinde reddedildi"] + kosul_params)
+            guncellenen = c.fetchall()
+            bildirimleri_ekle(c, [
+                (email, "İzniniz Reddedildi", f"Sayın {ad_soyad}, izniniz reddedilmiştir.")
+                for _, ad_soyad, email in guncellenen
+            ])
+            return [talep_id for talep_id, _, _ in guncellenen]
+
+        onay_notu = f"{onaylayan} tarafından {tarih} tarihinde onaylandı"
+        # Önce son adımlar: aynı kişi sonraki adımın da onaycısıysa talep tek tıkta iki adım ilerlemez.
+        c.execute(f"""
+            UPDATE talepler t
+            SET durum = 'Onaylandı', bekleyen_onayci = NULL, onay_notu = {not_ifadesi},
+                onaylayan = %s, onay_tarihi = %s
+            WHERE {kosul} AND t.onay_adimi >= cardinality(t.onay_zinciri)
+            RETURNING t.id, t.ad_soyad, {kisi_emaili}
+        """, [onay_notu, onaylayan, tarih] + kosul_params)
+        biten = c.fetchall()
+
+        c.execute(f"""
+            UPDATE talepler t
+            SET onay_adimi = t.onay_adimi + 1, bekleyen_onayci = t.onay_zinciri[t.onay_adimi + 1],
+                onay_notu = {not_ifadesi}
+            WHERE {kosul} AND t.onay_adimi < cardinality(t.onay_zinciri)
+            RETURNING t.id, t.ad_soyad, t.bekleyen_onayci
+        """, [onay_notu] + kosul_params)
+        ilerleyen = c.fetchall()
+
+        bildirimler = [
+            (email, "İzniniz Onaylandı", f"Sayın {ad_soyad}, izniniz onaylanmıştır.")
+            for _, ad_soyad, email in biten
+        ]
+        for onayci in {o for _, _, o in ilerleyen}:
+            adlar = [ad_soyad for _, ad_soyad, o in ilerleyen if o == onayci]
+            bildirimler += [
+                (alici, "Yeni İzin Talebi", f"{ad_soyad} adlı personelin izin talebi önceki onaydan geçti, "
+                                            "onayınızı bekliyor.")
+                for alici in alicilar(c, onayci) for ad_soyad in adlar
+            ]
+        bildirimleri_ekle(c, bildirimler)
+
+    return [talep_id for talep_id, _, _ in biten + ilerleyen]
@@ -0,0 +1,76 @@
+"""Testlerin ortak veritabanı fikstürü.
+
+DB_* ortam değişkenleri yerel bir PostgreSQL'i göstermelidir; testler TEST_DB_NAME
+(varsayılan izin_test) veritabanını açıp migrasyonları uygular ve sonunda siler; migrasyon
+testleri ayrıca <TEST_DB_NAME>_bos veritabanını kullanır.
+PostgreSQL'e ulaşılamazsa atlanır. Depo kökünden:
+
+    python -m pytest -q tests
+"""
+import os
+from contextlib import contextmanager
+
+import psycopg2
+import pytest
+from dotenv import load_dotenv
+from psycopg2 import sql
+
+from migrasyon import migrasyonlari_uygula
+from veritabani import BaglantiHavuzu
+
+load_dotenv()
+
+
+def _baglan(dbname):
+    return psycopg2.connect(
+        dbname=dbname,
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT", "5432"),
+        sslmode=os.getenv("DB_SSLMODE", "require"),
+        connect_timeout=5,
+    )
+
+
+def _yonetim(komut):
+    conn = _baglan(os.getenv("TEST_YONETIM_DB", "postgres"))
+    conn.autocommit = True
+    try:
+        with conn.cursor() as c:
+            c.execute(komut)
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _gecici_veritabani(ad):
+    # Veritabanı baştan açılır, sonunda silinir; migrasyon uygulanmaz.
+    if ad == os.getenv("DB_NAME"):
+        pytest.skip(f"Test veritabanı ({ad}) uygulama veritabanıyla aynı")
+    try:
+        _yonetim(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(ad)))
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL'e ulaşılamadı: {e}")
+    _yonetim(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(ad)))
+
+    h = BaglantiHavuzu(lambda: _baglan(ad), min_boyut=1, max_boyut=2)
+    try:
+        yield h
+    finally:
+        h.kapat()
+        _yonetim(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(ad)))
+
+
+@pytest.fixture(scope="session")
+def havuz():
+    with _gecici_veritabani(os.getenv("TEST_DB_NAME", "izin_test")) as h:
+        migrasyonlari_uygula(h)
+        yield h
+
+
+@pytest.fixture
+def bos_havuz():
+    """Migrasyon uygulanmamış, her test için yeniden açılan boş veritabanı."""
+    with _gecici_veritabani(os.getenv("TEST_DB_NAME", "izin_test") + "_bos") as h:
+        yield h
@@ -0,0 +1,300 @@
+"""PostaIscisi'nin bildirim_kutusu durum geçişleri, süreç içi bir SMTP sunucusuna karşı.
+
+Veritabanı fikstürü (havuz) conftest.py'dedir.
+"""
+import socketserver
+import threading
+from email import message_from_string
+from email.header import decode_header, make_header
+
+import pytest
+
+from bildirim import PostaIscisi, SmtpBaglantisi
+
+
+# ---------------------------------------------------
+# SÜREÇ İÇİ SMTP SUNUCUSU
+# ---------------------------------------------------
+class _SmtpIsleyici(socketserver.StreamRequestHandler):
+    def _yaz(self, satir):
+        self.wfile.write(f"{satir}\r\n".encode())
+
+    def handle(self):
+        sunucu = self.server
+        alicilar = []
+        self._yaz("220 localhost ESMTP test")
+        while satir := self.rfile.readline():
+            komut = satir.decode().strip()
+            ust = komut.upper()
+            if ust.startswith(("EHLO", "HELO")):
+                self._yaz("250 localhost")
+            elif ust.startswith("MAIL FROM"):
+                alicilar = []
+                self._yaz("250 OK")
+            elif ust.startswith("RCPT TO"):
+                alici = komut.split(":", 1)[1].strip().strip("<>")
+                if alici in sunucu.reddedilen:
+                    self._yaz("550 5.1.1 Mailbox unavailable")
+                else:
+                    alicilar.append(alici)
+                    self._yaz("250 OK")
+            elif ust == "DATA":
+                self._yaz("354 End data with <CR><LF>.<CR><LF>")
+                govde = []
+                while (s := self.rfile.readline().decode()) not in (".\r\n", ""):
+                    govde.append(s[1:] if s.startswith("..") else s)
+                if any(a in sunucu.gecici_hata for a in alicilar):
+                    self._yaz("451 4.3.0 Try again later")
+                else:
+                    with sunucu.kilit:
+                        sunucu.gelenler += [(a, message_from_string("".join(govde))) for a in alicilar]
+                    self._yaz("250 OK")
+            elif ust in ("NOOP", "RSET"):
+                self._yaz("250 OK")
+            elif ust == "QUIT":
+                self._yaz("221 Bye")
+                return
+            else:
+                self._yaz("502 Command not implemented")
+
+
+class _SmtpSunucusu(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SmtpIsleyici)
+        self.kilit = threading.Lock()
+        self.gelenler = []
+        self.reddedilen = set()
+        self.gecici_hata = set()
+
+    def konular(self, alici):
+        with self.kilit:
+            return [str(make_header(decode_header(m["Subject"]))) for a, m in self.gelenler if a == alici]
+
+
+# ---------------------------------------------------
+# FİKSTÜRLER
+# ---------------------------------------------------
+@pytest.fixture
+def sunucu():
+    s = _SmtpSunucusu()
+    threading.Thread(target=s.serve_forever, daemon=True).start()
+    yield s
+    s.shutdown()
+    s.server_close()
+
+
+@pytest.fixture
+def isci(havuz, sunucu):
+    with havuz.imlec() as c:
+        c.execute("TRUNCATE bildirim_kutusu, bildirim_tercihleri")
+    smtp = SmtpBaglantisi("127.0.0.1", sunucu.server_address[1], gonderen="ik@ornek.com",
+                          starttls=False, zaman_asimi=5.0)
+    yield PostaIscisi(havuz, smtp, max_deneme=3, taban_gecikme=60.0)
+    smtp.kapat()
+
+
+def _ekle(havuz, alici, konu="Konu", icerik="İçerik", once_dk=0):
+    with havuz.imlec() as c:
+        c.execute("""
+            INSERT INTO bildirim_kutusu (alici, konu, icerik, olusturuldu)
+            VALUES (%s, %s, %s, now() - make_interval(mins => %s))
+            RETURNING id
+        """, (alici, konu, icerik, once_dk))
+        return c.fetchone()[0]
+
+
+def _durum(havuz, bid):
+    """(durum, deneme, son_hata, geri_cekilme_sn, ozet_grubu)"""
+    with havuz.imlec() as c:
+        c.execute("""
+            SELECT durum, deneme, son_hata, round(extract(epoch FROM sonraki_deneme - now())), ozet_grubu
+            FROM bildirim_kutusu WHERE id = %s
+        """, (bid,))
+        return c.fetchone()
+
+
+def _vadesini_getir(havuz):
+    with havuz.imlec() as c:
+        c.execute("UPDATE bildirim_kutusu SET sonraki_deneme = now() WHERE durum = 'bekliyor'")
+
+
+# ---------------------------------------------------
+# ANINDA GÖNDERİM
+# ---------------------------------------------------
+def test_gonderim_ve_reddedilen_alici(havuz, sunucu, isci):
+    sunucu.reddedilen.add("yok@ornek.com")
+    iyi = _ekle(havuz, "ali@ornek.com", konu="İzin talebiniz onaylandı")
+    kotu = _ekle(havuz, "yok@ornek.com")
+
+    assert isci.parti_isle() == 2
+
+    assert _durum(havuz, iyi)[:3] == ("gonderildi", 1, None)
+    # Reddedilen alıcı kalıcı hatadır, deneme hakkı beklenmeden ölü kuyruğa düşer.
+    durum, deneme, hata, _, _ = _durum(havuz, kotu)
+    assert (durum, deneme) == ("olu", 1)
+    assert "550" in hata
+    assert sunucu.konular("ali@ornek.com") == ["İzin talebiniz onaylandı"]
+    assert sunucu.konular("yok@ornek.com") == []
+
+    s = isci.istatistik()
+    assert (s["gonderilen"], s["olu"], s["hata"], s["parti"]) == (1, 1, 0, 1)
+    # Gönderilen ya da ölü kayıtlar tekrar seçilmez.
+    assert isci.parti_isle() == 0
+
+
+def test_gecici_hata_geri_cekilme_ve_basari(havuz, sunucu, isci):
+    sunucu.gecici_hata.add("ali@ornek.com")
+    bid = _ekle(havuz, "ali@ornek.com")
+
+    assert isci.parti_isle() == 1
+    durum, deneme, hata, gecikme, _ = _durum(havuz, bid)
+    assert (durum, deneme) == ("bekliyor", 1)
+    assert "451" in hata
+    assert 55 <= gecikme <= 60
+
+    # Geri çekilme süresi dolmadan kayıt seçilmez.
+    assert isci.parti_isle() == 0
+
+    sunucu.gecici_hata.clear()
+    _vadesini_getir(havuz)
+    assert isci.parti_isle() == 1
+    assert _durum(havuz, bid)[:3] == ("gonderildi", 2, None)
+    assert len(sunucu.konular("ali@ornek.com")) == 1
+
+
+def test_gecici_hata_deneme_bitince_olu(havuz, sunucu, isci):
+    sunucu.gecici_hata.add("ali@ornek.com")
+    bid = _ekle(havuz, "ali@ornek.com")
+
+    isci.parti_isle()
+    _vadesini_getir(havuz)
+    isci.parti_isle()
+    durum, deneme, _, gecikme, _ = _durum(havuz, bid)
+    # Üstel geri çekilme: taban_gecikme * 2 ** deneme.
+    assert (durum, deneme) == ("bekliyor", 2)
+    assert 115 <= gecikme <= 120
+
+    _vadesini_getir(havuz)
+    isci.parti_isle()
+    durum, deneme, hata, _, _ = _durum(havuz, bid)
+    assert (durum, deneme) == ("olu", 3)
+    assert "451" in hata
+    assert isci.istatistik()["olu"] == 1
+    assert sunucu.konular("ali@ornek.com") == []
+
+
+def test_erisilemeyen_sunucu_partiyi_keser(havuz, sunucu, isci):
+    # Dinleyeni olmayan port: bağlantı reddedilir.
+    port = sunucu.server_address[1]
+    sunucu.shutdown()
+    sunucu.server_close()
+    isci._smtp = SmtpBaglantisi("127.0.0.1", port, starttls=False, zaman_asimi=5.0)
+    ilk, *digerleri = [_ekle(havuz, f"kisi{i}@ornek.com") for i in range(3)]
+
+    # İlk hatada parti kesilir; denenmemiş kayıtlar dokunulmadan hemen bırakılır.
+    assert isci.parti_isle() == 1
+    durum, deneme, _, gecikme, _ = _durum(havuz, ilk)
+    assert (durum, deneme) == ("bekliyor", 1) and gecikme > 0
+    for bid in digerleri:
+        durum, deneme, hata, gecikme, _ = _durum(havuz, bid)
+        assert (durum, deneme, hata) == ("bekliyor", 0, None) and gecikme <= 0
+
+
+def test_gonderim_islem_disinda(havuz, sunucu, isci):
+    acik_islemler = []
+
+    class _Gozcu(SmtpBaglantisi):
+        def gonder(self, alici, konu, icerik):
+            # Gönderim sırasında bildirim_kutusu satırı kilitli ya da işlem açık kalmamalı.
+            conn = havuz.al()
+            try:
+                with conn.cursor() as c:
+                    c.execute("""
+                        SELECT count(*) FROM pg_stat_activity
+                        WHERE datname = current_database() AND state LIKE 'idle in transaction%%'
+                    """)
+                    acik_islemler.append(c.fetchone()[0])
+                    c.execute("SELECT id FROM bildirim_kutusu WHERE durum = 'bekliyor' FOR UPDATE NOWAIT")
+                conn.rollback()
+            finally:
+                havuz.birak(conn)
+            super().gonder(alici, konu, icerik)
+
+    isci._smtp = _Gozcu("127.0.0.1", sunucu.server_address[1], gonderen="ik@ornek.com", starttls=False)
+    with havuz.imlec() as c:
+        c.execute("INSERT INTO bildirim_tercihleri (alici, politika) VALUES ('veli@ornek.com', 'saatlik')")
+    _ekle(havuz, "ali@ornek.com")
+    _ekle(havuz, "veli@ornek.com", once_dk=120)
+
+    assert isci.parti_isle() == 1
+    assert isci.ozetleri_isle() == 1
+    assert acik_islemler == [0, 0]
+    isci._smtp.kapat()
+
+
+# ---------------------------------------------------
+# ÖZET GÖNDERİMİ
+# ---------------------------------------------------
+def test_ozet_tek_eposta(havuz, sunucu, isci):
+    with havuz.imlec() as c:
+        c.execute("INSERT INTO bildirim_tercihleri (alici, politika) VALUES ('veli@ornek.com', 'saatlik')")
+    idler = [_ekle(havuz, "veli@ornek.com", konu=f"Bildirim {i}", once_dk=120) for i in range(3)]
+    yeni = _ekle(havuz, "veli@ornek.com", konu="Yeni")
+
+    # Özet politikalı alıcı anında gönderim partisine girmez.
+    assert isci.parti_isle() == 0
+
+    assert isci.ozetleri_isle() == 1
+    # Vadesi ilk bildirime göre hesaplanır; bekleyen tüm bildirimler aynı özete girer.
+    for bid in idler + [yeni]:
+        assert _durum(havuz, bid)[:3] == ("gonderildi", 1, None)
+        assert _durum(havuz, bid)[4] == idler[0]
+    assert sunucu.konular("veli@ornek.com") == ["İzin Bildirim Özeti (4)"]
+
+    s = isci.istatistik()
+    assert (s["ozet"], s["ozetlenen"], s["gonderilen"]) == (1, 4, 4)
+    assert isci.ozetleri_isle() == 0
+
+
+def test_ozet_vadesi_gelmeden_gitmez(havuz, sunucu, isci):
+    with havuz.imlec() as c:
+        c.execute("INSERT INTO bildirim_tercihleri (alici, politika) VALUES ('veli@ornek.com', 'gunluk')")
+    bid = _ekle(havuz, "veli@ornek.com")
+
+    assert isci.ozetleri_isle() == 0
+    assert _durum(havuz, bid)[:2] == ("bekliyor", 0)
+    assert sunucu.konular("veli@ornek.com") == []
+
+
+def test_ozet_gecici_hata_ve_olu(havuz, sunucu, isci):
+    with havuz.imlec() as c:
+        c.execute("INSERT INTO bildirim_tercihleri (alici, politika) VALUES ('veli@ornek.com', 'saatlik')")
+    sunucu.gecici_hata.add("veli@ornek.com")
+    idler = [_ekle(havuz, "veli@ornek.com", once_dk=120) for _ in range(2)]
+
+    assert isci.ozetleri_isle() == 0
+    for bid in idler:
+        durum, deneme, hata, gecikme, _ = _durum(havuz, bid)
+        assert (durum, deneme) == ("bekliyor", 1)
+        assert "451" in hata and 55 <= gecikme <= 60
+
+    for _ in range(2):
+        _vadesini_getir(havuz)
+        isci.ozetleri_isle()
+    assert [_durum(havuz, bid)[:2] for bid in idler] == [("olu", 3), ("olu", 3)]
+    assert isci.istatistik()["olu"] == 2
+
+
+def test_ozet_reddedilen_alici_olu(havuz, sunucu, isci):
+    with havuz.imlec() as c:
+        c.execute("INSERT INTO bildirim_tercihleri (alici, politika) VALUES ('yok@ornek.com', 'saatlik')")
+    sunucu.reddedilen.add("yok@ornek.com")
+    bid = _ekle(havuz, "yok@ornek.com", once_dk=120)
+
+    assert isci.ozetleri_isle() == 0
+    durum, deneme, hata, _, _ = _durum(havuz, bid)
+    assert (durum, deneme) == ("olu", 1)
+    assert "550" in hata
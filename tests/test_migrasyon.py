@@ -0,0 +1,100 @@
+"""migrasyon.py: ilk sürümün (metin tarihler, onay_notu) verisiyle tüm migrasyonların uygulanması.
+
+Her test boş bir veritabanına ilk tabloları ve eski uygulamanın yazdığı biçimde satırları koyar
+(bos_havuz fikstürü conftest.py'dedir).
+"""
+from datetime import date
+
+import pytest
+
+from migrasyon import MIGRASYONLAR, migrasyonlari_uygula
+
+
+# ---------------------------------------------------
+# YARDIMCILAR
+# ---------------------------------------------------
+def _eski_sema(havuz, personeller, talepler=()):
+    # sema_surumleri olmadan, migrasyon 1'in tablolarıyla: eski uygulamanın bıraktığı veritabanı.
+    _, _, adimlar = MIGRASYONLAR[0]
+    with havuz.imlec() as c:
+        for adim in adimlar:
+            c.execute(adim)
+        c.executemany("""
+            INSERT INTO personellers (sicil, ad_soyad, sifre, meslek, departman, email, onayci_email, rol)
+            VALUES (%s, %s, 'x', %s, 'Satış', %s, %s, %s)
+        """, personeller)
+        c.executemany("""
+            INSERT INTO talepler (ad_soyad, departman, meslek, tip, baslangic, bitis, neden, durum, onay_notu)
+            VALUES (%s, 'Satış', 'Uzman', 'Yıllık İzin', %s, %s, 'tatil', %s, %s)
+        """, talepler)
+
+
+def _kolon_tipi(c, tablo, kolon):
+    c.execute("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s
+    """, (tablo, kolon))
+    return c.fetchone()[0]
+
+
+ONAY_NOTU = "Ali Veli (Müdür) tarafından 2025-03-01 tarihinde onaylandı."
+
+
+# ---------------------------------------------------
+# TESTLER
+# ---------------------------------------------------
+def test_eski_veri_donusturulur(bos_havuz):
+    _eski_sema(bos_havuz, [
+        (" 1001 ", "Ali Veli", "Müdür", "ali@ornek.com", None, "Yönetici"),
+        ("1002", "Ayşe Yılmaz", "Uzman", "ayse@ornek.com", "ali@ornek.com", "Personel"),
+    ], [
+        ("Ayşe Yılmaz", " 2025-03-03 ", "2025-03-05 ", "Onaylandı", ONAY_NOTU),
+        ("Ayşe Yılmaz", "2025-06-02", "", "Beklemede", None),
+        ("Ali Veli", "2025-04-07", "2025-04-07", "Reddedildi", "Uygun değil."),
+    ])
+
+    uygulanan = migrasyonlari_uygula(bos_havuz)
+    assert uygulanan == sorted(m[0] for m in MIGRASYONLAR)
+
+    with bos_havuz.imlec() as c:
+        assert _kolon_tipi(c, "talepler", "baslangic") == "date"
+        assert _kolon_tipi(c, "talepler", "bitis") == "date"
+
+        c.execute("SELECT sicil FROM personellers ORDER BY sicil")
+        assert [r[0] for r in c.fetchall()] == ["1001", "1002"]
+        c.execute("""
+            SELECT 1 FROM pg_constraint
+            WHERE conrelid = 'personellers'::regclass AND contype = 'p'
+        """)
+        assert c.fetchone() is not None
+
+        c.execute("SELECT sicil, baslangic, bitis, durum, onaylayan, onay_tarihi FROM talepler ORDER BY id")
+        assert c.fetchall() == [
+            ("1002", date(2025, 3, 3), date(2025, 3, 5), "Onaylandı", "Ali Veli (Müdür)", date(2025, 3, 1)),
+            ("1002", date(2025, 6, 2), None, "Beklemede", None, None),
+            ("1001", date(2025, 4, 7), date(2025, 4, 7), "Reddedildi", None, None),
+        ]
+
+
+@pytest.mark.parametrize("siciller, beklenen", [
+    (["1001", " 1001"], "1001:"),
+    (["", None], "(boş):"),
+])
+def test_bos_ya_da_tekrar_eden_sicil_migrasyonu_durdurur(bos_havuz, siciller, beklenen):
+    _eski_sema(bos_havuz, [
+        (sicil, f"Kişi {i}", "Uzman", f"k{i}@ornek.com", None, "Personel") for i, sicil in enumerate(siciller)
+    ], [
+        ("Kişi 0", "2025-03-03", "2025-03-05", "Beklemede", None),
+    ])
+
+    with pytest.raises(RuntimeError, match="Sicili boş ya da birden fazla") as hata:
+        migrasyonlari_uygula(bos_havuz)
+    assert beklenen in str(hata.value)
+
+    # Sürüm 2 bütünüyle geri alınır: siciller kırpılmamış, tarihler hâlâ metin.
+    with bos_havuz.imlec() as c:
+        c.execute("SELECT surum FROM sema_surumleri ORDER BY surum")
+        assert [r[0] for r in c.fetchall()] == [1]
+        c.execute("SELECT sicil FROM personellers ORDER BY ad_soyad")
+        assert [r[0] for r in c.fetchall()] == siciller
+        assert _kolon_tipi(c, "talepler", "baslangic") == "text"
@@ -0,0 +1,237 @@
+"""talepler.py: çakışma kuralı, sürüm denetimli düzenleme/silme ve çok adımlı onay zinciri.
+
+Veritabanı fikstürü (havuz) conftest.py'dedir.
+"""
+from datetime import date
+
+import psycopg2.errors
+import pytest
+
+from onay_akisi import IK_ADIMI, kurallari_kaydet, onay_anahtarlari
+from personel import Kullanici, PersonelRehberi
+from talepler import (
+    SurumCakismasi, cakisan_talepler, onay_kuyrugu, onay_kuyrugu_sayisi, talep_guncelle, talep_olustur, talep_sil,
+    talepleri_sonuclandir,
+)
+
+YIL = date.today().year
+
+
+# ---------------------------------------------------
+# FİKSTÜRLER
+# ---------------------------------------------------
+# Personel → Yönetici → Direktör; İK rolündeki kişi İK adımının onaycısıdır.
+KADRO = [
+    ("P1", "Pınar Bir", "p1@ornek.com", "y1@ornek.com", "Personel"),
+    ("Y1", "Yavuz Bir", "y1@ornek.com", "y2@ornek.com", "Yönetici"),
+    ("Y2", "Yasemin İki", "y2@ornek.com", None, "Yönetici"),
+    ("IK", "İlker Kaya", "ik@ornek.com", None, "İK"),
+]
+
+
+@pytest.fixture
+def kisiler(havuz):
+    with havuz.imlec() as c:
+        for tablo in ("talepler", "bildirim_kutusu", "onay_kurallari", "personellers"):
+            c.execute(f"DELETE FROM {tablo}")
+        c.executemany("""
+            INSERT INTO personellers (sicil, ad_soyad, email, onayci_email, rol, departman, meslek)
+            VALUES (%s, %s, %s, %s, %s, 'IT', 'Mühendis')
+        """, KADRO)
+    rehber = PersonelRehberi(havuz)
+    return rehber, {sicil: Kullanici(**rehber.sicil_ile(sicil)) for sicil, *_ in KADRO}
+
+
+def _talep(havuz, kisiler, bas, bit, sicil="P1", tip="Yıllık İzin"):
+    rehber, kullanicilar = kisiler
+    return talep_olustur(havuz, rehber, kullanicilar[sicil], tip, bas, bit, "test", (bit - bas).days + 1)
+
+
+def _satir(havuz, talep_id):
+    with havuz.imlec(sozluk=True) as c:
+        c.execute("SELECT * FROM talepler WHERE id = %s", (talep_id,))
+        return c.fetchone()
+
+
+# ---------------------------------------------------
+# ÇAKIŞMA KURALI (user-012)
+# ---------------------------------------------------
+def test_cakisan_talep_eklenemez(havuz, kisiler):
+    ilk = _talep(havuz, kisiler, date(YIL, 3, 2), date(YIL, 3, 6))
+
+    with pytest.raises(psycopg2.errors.ExclusionViolation):
+        _talep(havuz, kisiler, date(YIL, 3, 6), date(YIL, 3, 9))
+    assert [r[0] for r in cakisan_talepler(havuz, "P1", date(YIL, 3, 6), date(YIL, 3, 9))] == [ilk]
+
+    # Bitişik aralık ve başka personel çakışmaz.
+    _talep(havuz, kisiler, date(YIL, 3, 7), date(YIL, 3, 8))
+    _talep(havuz, kisiler, date(YIL, 3, 2), date(YIL, 3, 6), sicil="Y1")
+
+    # Reddedilen talep yerini boşaltır.
+    with havuz.imlec() as c:
+        c.execute("UPDATE talepler SET durum = 'Reddedildi' WHERE id = %s", (ilk,))
+    _talep(havuz, kisiler, date(YIL, 3, 3), date(YIL, 3, 4))
+
+
+@pytest.mark.parametrize("once, sonra", [
+    ((date(YIL, 12, 28), date(YIL + 1, 1, 5)), (date(YIL + 1, 1, 2), date(YIL + 1, 1, 3))),
+    ((date(YIL + 1, 1, 2), date(YIL + 1, 1, 3)), (date(YIL, 12, 28), date(YIL + 1, 1, 5))),
+])
+def test_yil_bolumleri_arasinda_cakisma(havuz, kisiler, once, sonra):
+    # Talepler farklı yıl bölümlerine düşer; kural bölümler arasında da geçerlidir.
+    _talep(havuz, kisiler, *once)
+    with pytest.raises(psycopg2.errors.ExclusionViolation):
+        _talep(havuz, kisiler, *sonra)
+
+
+def test_duzenlemede_cakisma(havuz, kisiler):
+    duzenlenen = _talep(havuz, kisiler, date(YIL, 6, 1), date(YIL, 6, 3))
+    _talep(havuz, kisiler, date(YIL, 6, 10), date(YIL, 6, 12))
+    _talep(havuz, kisiler, date(YIL + 1, 1, 10), date(YIL + 1, 1, 12))
+    satir = _satir(havuz, duzenlenen)
+
+    def duzenle(bas, bit):
+        return talep_guncelle(havuz, duzenlenen, satir["baslangic"], satir["surum"],
+                              "Yıllık İzin", bas, bit, "test", (bit - bas).days + 1)
+
+    with pytest.raises(psycopg2.errors.ExclusionViolation):
+        duzenle(date(YIL, 6, 2), date(YIL, 6, 11))
+    # Satır başka yılın bölümüne taşınırken de denetlenir.
+    with pytest.raises(psycopg2.errors.ExclusionViolation):
+        duzenle(date(YIL + 1, 1, 8), date(YIL + 1, 1, 10))
+    assert _satir(havuz, duzenlenen)["baslangic"] == date(YIL, 6, 1)
+
+    # Talebin kendi eski aralığı çakışma sayılmaz.
+    assert duzenle(date(YIL, 6, 2), date(YIL, 6, 4)) == satir["surum"] + 1
+
+
+# ---------------------------------------------------
+# SÜRÜM DENETİMLİ DÜZENLEME / SİLME (user-021)
+# ---------------------------------------------------
+def _duzenle(havuz, satir, surum, bitis):
+    return talep_guncelle(havuz, satir["id"], satir["baslangic"], surum, satir["tip"],
+                          satir["baslangic"], bitis, "yeni neden", 2)
+
+
+def test_eski_surumle_duzenleme_ve_silme(havuz, kisiler):
+    talep_id = _talep(havuz, kisiler, date(YIL, 4, 6), date(YIL, 4, 7))
+    satir = _satir(havuz, talep_id)
+    eski = satir["surum"]
+
+    yeni = _duzenle(havuz, satir, eski, date(YIL, 4, 8))
+    assert yeni == eski + 1
+
+    # Sayfayı eski sürümle açık tutan ikinci sekme ne düzenleyebilir ne silebilir.
+    with pytest.raises(SurumCakismasi):
+        _duzenle(havuz, satir, eski, date(YIL, 4, 9))
+    with pytest.raises(SurumCakismasi):
+        talep_sil(havuz, talep_id, eski, mevcut_baslangic=satir["baslangic"])
+    assert _satir(havuz, talep_id)["bitis"] == date(YIL, 4, 8)
+
+    assert talep_sil(havuz, talep_id, yeni, mevcut_baslangic=satir["baslangic"]) == 1
+    assert _satir(havuz, talep_id) is None
+    # Silinmiş talep de çakışma olarak bildirilir.
+    with pytest.raises(SurumCakismasi):
+        _duzenle(havuz, satir, yeni, date(YIL, 4, 9))
+
+
+@pytest.mark.parametrize("onayla", [True, False])
+def test_karar_verilmis_talep_degistirilemez(havuz, kisiler, onayla):
+    talep_id = _talep(havuz, kisiler, date(YIL, 5, 4), date(YIL, 5, 5))
+    satir = _satir(havuz, talep_id)
+    assert talepleri_sonuclandir(havuz, ["y1@ornek.com"], [(talep_id, satir["baslangic"])], onayla,
+                                 "Yavuz Bir") == [talep_id]
+    karar = _satir(havuz, talep_id)
+    assert karar["durum"] == ("Onaylandı" if onayla else "Reddedildi")
+
+    # Güncel sürümle bile: karar verilmiş talep personel tarafından değiştirilemez.
+    with pytest.raises(SurumCakismasi):
+        _duzenle(havuz, karar, karar["surum"], date(YIL, 5, 8))
+    with pytest.raises(SurumCakismasi):
+        talep_sil(havuz, talep_id, karar["surum"], mevcut_baslangic=karar["baslangic"])
+    assert _satir(havuz, talep_id) == karar
+
+    # İK silmesi (sürümsüz) koşulsuzdur.
+    assert talep_sil(havuz, talep_id) == 1
+
+
+# ---------------------------------------------------
+# ÇOK ADIMLI ONAY ZİNCİRİ (user-024)
+# ---------------------------------------------------
+@pytest.fixture
+def zincirli_talep(havuz, kisiler):
+    """İki yönetici kademesi + İK: P1 → y1 → y2 → İK."""
+    kurallari_kaydet(havuz, [(None, 0, 2, True)])
+    talep_id = _talep(havuz, kisiler, date(YIL, 7, 6), date(YIL, 7, 10))
+    return talep_id, date(YIL, 7, 6)
+
+
+def _bildirimler(havuz):
+    with havuz.imlec() as c:
+        c.execute("SELECT alici, konu FROM bildirim_kutusu ORDER BY id")
+        sonuc = c.fetchall()
+        c.execute("DELETE FROM bildirim_kutusu")
+    return sonuc
+
+
+def _kuyruk_idleri(havuz, onaycilar):
+    return onay_kuyrugu(havuz, onaycilar)[0]["id"].tolist()
+
+
+def test_zincir_adim_adim_onaylanir(havuz, kisiler, zincirli_talep):
+    talep_id, bas = zincirli_talep
+    ik = onay_anahtarlari(kisiler[1]["IK"])
+    satir = _satir(havuz, talep_id)
+    assert (satir["onay_zinciri"], satir["onay_adimi"]) == (["y1@ornek.com", "y2@ornek.com", IK_ADIMI], 1)
+    assert _bildirimler(havuz) == [("y1@ornek.com", "Yeni İzin Talebi")]
+
+    # Sırası gelmeyen onaycı karar veremez ve talebi kuyruğunda görmez.
+    assert _kuyruk_idleri(havuz, ["y2@ornek.com"]) == []
+    assert talepleri_sonuclandir(havuz, ["y2@ornek.com"], [(talep_id, bas)], True, "Yasemin İki") == []
+
+    assert talepleri_sonuclandir(havuz, ["y1@ornek.com"], [(talep_id, bas)], True, "Yavuz Bir") == [talep_id]
+    satir = _satir(havuz, talep_id)
+    assert (satir["durum"], satir["onay_adimi"], satir["bekleyen_onayci"]) == ("Beklemede", 2, "y2@ornek.com")
+    assert _bildirimler(havuz) == [("y2@ornek.com", "Yeni İzin Talebi")]
+    assert _kuyruk_idleri(havuz, ["y1@ornek.com"]) == []
+    assert _kuyruk_idleri(havuz, ["y2@ornek.com"]) == [talep_id]
+
+    assert talepleri_sonuclandir(havuz, ["y2@ornek.com"], [(talep_id, bas)], True, "Yasemin İki") == [talep_id]
+    satir = _satir(havuz, talep_id)
+    assert (satir["onay_adimi"], satir["bekleyen_onayci"]) == (3, IK_ADIMI)
+    # İK adımı rolü İK olan herkese bildirilir.
+    assert _bildirimler(havuz) == [("ik@ornek.com", "Yeni İzin Talebi")]
+    assert onay_kuyrugu_sayisi(havuz, ik) == 1
+
+    assert talepleri_sonuclandir(havuz, ik, [(talep_id, bas)], True, "İlker Kaya", tarih=date(YIL, 6, 1)) \
+        == [talep_id]
+    satir = _satir(havuz, talep_id)
+    assert (satir["durum"], satir["onay_adimi"], satir["bekleyen_onayci"]) == ("Onaylandı", 3, None)
+    assert (satir["onaylayan"], satir["onay_tarihi"]) == ("İlker Kaya", date(YIL, 6, 1))
+    assert satir["onay_notu"].splitlines() == [
+        f"Yavuz Bir tarafından {date.today()} tarihinde onaylandı (1/3).",
+        f"Yasemin İki tarafından {date.today()} tarihinde onaylandı (2/3).",
+        f"İlker Kaya tarafından {date(YIL, 6, 1)} tarihinde onaylandı (3/3).",
+    ]
+    assert _bildirimler(havuz) == [("p1@ornek.com", "İzniniz Onaylandı")]
+
+    # Sonuçlanan talep tekrar onaylanamaz.
+    assert talepleri_sonuclandir(havuz, ik, [(talep_id, bas)], True, "İlker Kaya") == []
+
+
+def test_zincir_ikinci_adimda_reddedilir(havuz, kisiler, zincirli_talep):
+    talep_id, bas = zincirli_talep
+    talepleri_sonuclandir(havuz, ["y1@ornek.com"], [(talep_id, bas)], True, "Yavuz Bir")
+    _bildirimler(havuz)
+
+    assert talepleri_sonuclandir(havuz, ["y2@ornek.com"], [(talep_id, bas)], False, "Yasemin İki") == [talep_id]
+    satir = _satir(havuz, talep_id)
+    assert (satir["durum"], satir["onay_adimi"], satir["bekleyen_onayci"]) == ("Reddedildi", 2, None)
+    assert satir["onaylayan"] is None
+    assert satir["onay_notu"].splitlines()[-1] == f"Yasemin İki tarafından {date.today()} tarihinde reddedildi (2/3)."
+    assert _bildirimler(havuz) == [("p1@ornek.com", "İzniniz Reddedildi")]
+
+    # Reddedilen talep sonraki adımlara geçmez.
+    ik = onay_anahtarlari(kisiler[1]["IK"])
+    assert _kuyruk_idleri(havuz, ["y2@ornek.com"]) == [] and _kuyruk_idleri(havuz, ik) == []
+    assert talepleri_sonuclandir(havuz, ik, [(talep_id, bas)], True, "İlker Kaya") == []
@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+import psycopg2
+import psycopg2.extras
+
+from olcum import DEFTER, OLCUM_ACIK, OlcumluImlec, OlcumluSozlukImlec
+
+
+# ---------------------------------------------------
+# BAĞLANTI OLUŞTURMA
+# ---------------------------------------------------
+def get_db():
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT", "5432"),
+        sslmode=os.getenv("DB_SSLMODE", "require"),
+    )
+
+
+class HavuzZamanAsimi(Exception):
+    pass
+
+
+# ---------------------------------------------------
+# BAĞLANTI HAVUZU
+# ---------------------------------------------------
+class BaglantiHavuzu:
+    """Süreç genelinde paylaşılan, iş parçacığı güvenli PostgreSQL bağlantı havuzu.
+
+    Her istek `baglanti()` / `imlec()` ile bir bağlantı ödünç alır ve blok
+    bitince geri verir. Blok hatasız biterse commit, hata olursa rollback yapılır.
+    """
+
+    def __init__(self, baglanti_fabrikasi=get_db, min_boyut=1, max_boyut=10,
+                 bekleme_suresi=30.0, saglik_kontrol_suresi=30.0):
+        if min_boyut > max_boyut:
+            raise ValueError("min_boyut, max_boyut değerinden büyük olamaz")
+
+        self._fabrika = baglanti_fabrikasi
+        self.min_boyut = min_boyut
+        self.max_boyut = max_boyut
+        self.bekleme_suresi = bekleme_suresi
+        self.saglik_kontrol_suresi = saglik_kontrol_suresi
+
+        self._kilit = threading.Lock()
+        self._slotlar = threading.BoundedSemaphore(max_boyut)
+        self._bos = deque()  # (bağlantı, son kullanım zamanı)
+        self._aktif = 0
+
+        self._sayac = {
+            "checkout": 0,
+            "toplam_bekleme": 0.0,
+            "max_bekleme": 0.0,
+            "zaman_asimi": 0,
+            "olusturulan": 0,
+            "atilan": 0,
+            "saglik_hatasi": 0,
+        }
+
+        for _ in range(min_boyut):
+            self._bos.append((self._yeni_baglanti(), time.monotonic()))
+
+    @classmethod
+    def ortamdan(cls, baglanti_fabrikasi=get_db):
+        return cls(
+            baglanti_fabrikasi,
+            min_boyut=int(os.getenv("DB_POOL_MIN", "1")),
+            max_boyut=int(os.getenv("DB_POOL_MAX", "10")),
+            bekleme_suresi=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            saglik_kontrol_suresi=float(os.getenv("DB_POOL_HEALTHCHECK", "30")),
+        )
+
+    def _yeni_baglanti(self):
+        conn = self._fabrika()
+        if OLCUM_ACIK:
+            # İsimli (sunucu taraflı) imleçler dahil bu bağlantıdaki tüm imleçler ölçülür.
+            conn.cursor_factory = OlcumluImlec
+        with self._kilit:
+            self._sayac["olusturulan"] += 1
+        return conn
+
+    def _at(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._kilit:
+            self._sayac["atilan"] += 1
+
+    def _saglikli_mi(self, conn, son_kullanim):
+        if conn.closed:
+            return False
+        if time.monotonic() - son_kullanim < self.saglik_kontrol_suresi:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            with self._kilit:
+                self._sayac["saglik_hatasi"] += 1
+            return False
+
+    # ---------------------------------------------------
+    # ÖDÜNÇ AL / GERİ VER
+    # ---------------------------------------------------
+    def al(self):
+        baslangic = time.monotonic()
+        if not self._slotlar.acquire(timeout=self.bekleme_suresi):
+            with self._kilit:
+                self._sayac["zaman_asimi"] += 1
+            raise HavuzZamanAsimi(
+                f"{self.bekleme_suresi:.0f} sn içinde boş veritabanı bağlantısı bulunamadı"
+            )
+
+        try:
+            conn = None
+            while conn is None:
+                with self._kilit:
+                    aday = self._bos.pop() if self._bos else None
+                if aday is None:
+                    conn = self._yeni_baglanti()
+                elif self._saglikli_mi(*aday):
+                    conn = aday[0]
+                else:
+                    self._at(aday[0])
+        except Exception:
+            self._slotlar.release()
+            raise
+
+        bekleme = time.monotonic() - baslangic
+        if OLCUM_ACIK:
+            DEFTER.kaydet("db.havuz_bekleme", bekleme)
+        with self._kilit:
+            self._aktif += 1
+            self._sayac["checkout"] += 1
+            self._sayac["toplam_bekleme"] += bekleme
+            self._sayac["max_bekleme"] = max(self._sayac["max_bekleme"], bekleme)
+        return conn
+
+    def birak(self, conn, bozuk=False):
+        try:
+            if not bozuk and not conn.closed:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                with self._kilit:
+                    self._bos.append((conn, time.monotonic()))
+            else:
+                self._at(conn)
+        except Exception:
+            self._at(conn)
+        finally:
+            with self._kilit:
+                self._aktif -= 1
+            self._slotlar.release()
+
+    # ---------------------------------------------------
+    # İŞLEM (TRANSACTION) KAPSAMI
+    # ---------------------------------------------------
+    @contextmanager
+    def baglanti(self):
+        conn = self.al()
+        bozuk = False
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                bozuk = True
+            bozuk = bozuk or bool(conn.closed)
+            raise
+        finally:
+            self.birak(conn, bozuk=bozuk)
+
+    @contextmanager
+    def imlec(self, sozluk=False):
+        if sozluk:
+            factory = OlcumluSozlukImlec if OLCUM_ACIK else psycopg2.extras.RealDictCursor
+        else:
+            factory = None
+        with self.baglanti() as conn:
+            with conn.cursor(cursor_factory=factory) as cur:
+                yield cur
+
+    def sorgu_df(self, sql, params=None):
+        with self.imlec() as c:
+            c.execute(sql, params)
+            return pd.DataFrame(c.fetchall(), columns=[d[0] for d in c.description])
+
+    def istatistik(self):
+        with self._kilit:
+            s = dict(self._sayac)
+            s["aktif"] = self._aktif
+            s["bos"] = len(self._bos)
+        s["min_boyut"] = self.min_boyut
+        s["max_boyut"] = self.max_boyut
+        s["ort_bekleme"] = s["toplam_bekleme"] / s["checkout"] if s["checkout"] else 0.0
+        return s
+
+    def kapat(self):
+        with self._kilit:
+            bostakiler = list(self._bos)
+            self._bos.clear()
+        for conn, _ in bostakiler:
+            self._at(conn)